@@ -5,8 +5,12 @@ from fastapi import APIRouter
 from app.api.v1.endpoints import auth
 from app.api.v1.endpoints import news
 from app.api.v1.endpoints import bookmarks
+from app.api.v1.endpoints import images
+from app.api.v1.endpoints import metrics
 api_router = APIRouter(prefix="/api/v1")
 
 api_router.include_router(auth.router)
 api_router.include_router(news.router)
 api_router.include_router(bookmarks.router)
+api_router.include_router(images.router)
+api_router.include_router(metrics.router)
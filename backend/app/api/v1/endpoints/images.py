@@ -0,0 +1,66 @@
+"""Image proxy endpoints."""
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import Response
+
+from app.core.thumbnails import image_digest
+from app.services.images import (
+    THUMBNAIL_MEDIA_TYPE,
+    ImageFetchError,
+    ThumbnailService,
+)
+from app.services.registry import get_thumbnail_service
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+# Thumbnails are immutable: a digest always names the same image
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{digest}")
+async def get_thumbnail(
+    digest: str,
+    url: str,
+    request: Request,
+    thumbnails: ThumbnailService = Depends(get_thumbnail_service),
+) -> Response:
+    """Get the thumbnail of an article image.
+
+    Paths come from the thumbnail_url of articles. They are signed, so
+    the proxy only fetches images the API handed out, and need no
+    authentication; browsers load them directly.
+
+    Args:
+        digest: Signed digest of the image URL.
+        url: Remote image URL.
+        request: The current request.
+        thumbnails: Shared thumbnail service.
+
+    Returns:
+        Response: The JPEG thumbnail, or 304 if the client has it.
+
+    Raises:
+        HTTPException: 404 if the digest does not match the URL, 502 if
+            the image cannot be fetched or decoded.
+    """
+    if not hmac.compare_digest(digest, image_digest(url)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found",
+        )
+    headers = {
+        "Cache-Control": THUMBNAIL_CACHE_CONTROL,
+        "ETag": f'"{digest}"',
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                        headers=headers)
+    try:
+        data = await thumbnails.thumbnail(url, digest)
+    except ImageFetchError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=str(e),
+        )
+    return Response(data, media_type=THUMBNAIL_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,76 @@
+"""Runtime metrics endpoints."""
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, Response
+
+from app.core.cache import Cache
+from app.services.aggregator import NewsAggregator
+from app.services.enrichment import ArticleEnricher
+from app.services.ingestion import IncrementalIngester
+from app.services.news import NewsService
+from app.services.personalization import FeedRanker
+from app.services.prefetch import SearchPagePrefetcher
+from app.services.related import RelatedArticlesIndex
+from app.services.trending import TrendingEngine
+from app.services.registry import (
+    get_article_enricher,
+    get_feed_ranker,
+    get_ingester,
+    get_news_aggregator,
+    get_news_service,
+    get_related_index,
+    get_response_cache,
+    get_search_prefetcher,
+    get_trending_engine,
+)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics(
+    response: Response,
+    news_service: NewsService = Depends(get_news_service),
+    aggregator: NewsAggregator = Depends(get_news_aggregator),
+    search_prefetcher: SearchPagePrefetcher = Depends(get_search_prefetcher),
+    article_enricher: Optional[ArticleEnricher] = Depends(
+        get_article_enricher
+    ),
+    trending: TrendingEngine = Depends(get_trending_engine),
+    feed_ranker: FeedRanker = Depends(get_feed_ranker),
+    related: RelatedArticlesIndex = Depends(get_related_index),
+    ingester: IncrementalIngester = Depends(get_ingester),
+    cache: Cache = Depends(get_response_cache),
+) -> Dict[str, Any]:
+    """Get runtime metrics of the upstream news pipeline.
+
+    Args:
+        response: Outgoing response, marked as not cacheable.
+        news_service: Shared news service.
+        aggregator: Shared news aggregator.
+        search_prefetcher: Shared search page prefetcher.
+        article_enricher: Shared article enricher, if enabled.
+        trending: Shared trending engine.
+        feed_ranker: Shared feed ranker.
+        related: Shared related articles index.
+        ingester: Shared incremental ingester.
+        cache: Response cache of this worker.
+
+    Returns:
+        Dict[str, Any]: Metrics keyed by component.
+    """
+    response.headers["Cache-Control"] = "no-store"
+    metrics = {
+        "news": news_service.metrics(),
+        "sources": aggregator.stats(),
+        "search_prefetch": search_prefetcher.stats(),
+        "trending": trending.stats(),
+        "feed": feed_ranker.stats(),
+        "related": related.stats(),
+        "ingestion": ingester.stats(),
+        "cache": cache.stats(),
+    }
+    if aggregator.dedup is not None:
+        metrics["dedup"] = aggregator.dedup.stats()
+    if article_enricher is not None:
+        metrics["extraction"] = article_enricher.stats()
+    return metrics
@@ -1,17 +1,105 @@
 """News endpoints."""
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import math
+from typing import Any, List, Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cursor import decode_cursor, encode_cursor
+from app.core.middleware import CachedResponse
 from app.db.session import get_session
-from app.models.schemas import NewsArticle, NewsSearchParams
+from app.models.schemas import (
+    ARTICLE_LIST_ADAPTER,
+    ArticleContent,
+    HeadlinesBatch,
+    HeadlinesBatchError,
+    NewsArticle,
+    NewsSearchParams,
+    TrendingTopics,
+)
 from app.services.auth import get_current_user
-from app.services.news import NewsService
+from app.services.aggregator import NewsAggregator
+from app.services.article_store import ArticleStore
+from app.services.news import (
+    NewsRequestError,
+    NewsService,
+    NewsUnavailableError,
+)
+from app.services.personalization import FeedRanker
+from app.services.prefetch import HeadlinePrefetcher, SearchPagePrefetcher
+from app.services.related import RelatedArticlesIndex
+from app.services.registry import (
+    get_article_store,
+    get_feed_ranker,
+    get_headline_prefetcher,
+    get_news_aggregator,
+    get_news_service,
+    get_related_index,
+    get_search_prefetcher,
+    get_trending_engine,
+)
+from app.services.trending import TrendingEngine
 from app.db.models import User
 from fastapi import Query
 
 router = APIRouter(prefix="/news", tags=["news"])
 
+# Upper bound on the combinations one batch request may fan out to
+MAX_BATCH_COMBINATIONS = 50
+
+
+def _upstream_error(error: Exception) -> HTTPException:
+    """Map a news service error to an HTTP exception.
+
+    Args:
+        error: Error raised while fetching news.
+
+    Returns:
+        HTTPException: 503 with Retry-After when NewsAPI must not be
+        called right now (budget exhausted or circuit open), 400 when
+        NewsAPI rejected the request, 500 otherwise.
+    """
+    if isinstance(error, NewsRequestError):
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(error),
+        )
+    if isinstance(error, NewsUnavailableError):
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(error),
+            headers={"Retry-After": str(math.ceil(error.retry_after))},
+        )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=str(error),
+    )
+
+
+def _articles_response(articles: List[NewsArticle]) -> Response:
+    """Serialize articles that were validated when they were built.
+
+    Returning a Response makes FastAPI skip validating them again
+    against the response model.
+
+    Args:
+        articles: Articles to return.
+
+    Returns:
+        Response: JSON response with the articles.
+    """
+    return Response(
+        content=ARTICLE_LIST_ADAPTER.dump_json(articles),
+        media_type="application/json",
+    )
+
 
 @router.get("/search", response_model=List[NewsArticle])
 async def search_news(
@@ -20,47 +108,101 @@ async def search_news(
     language: str = "en",
     page_size: int = 10,
     page: int = 1,
+    cursor: str | None = None,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
-) -> List[NewsArticle]:
+    aggregator: NewsAggregator = Depends(get_news_aggregator),
+    search_prefetcher: SearchPagePrefetcher = Depends(get_search_prefetcher),
+    news_service: NewsService = Depends(get_news_service),
+) -> Response:
     """Search for news articles.
 
+    Pages that are not the last carry an X-Next-Cursor header. Passing
+    it back as cursor returns the next page, which is prefetched in the
+    background in the meantime. The cursor also records whether the
+    query is answered from the local index, so all its pages are.
+
     Args:
         query: Search query.
         category: News category.
         language: Language code.
         page_size: Number of articles per page.
         page: Page number.
+        cursor: Cursor of a page, replacing every other parameter.
         current_user: Current authenticated user.
         session: Database session.
+        aggregator: Shared aggregator over every news source.
+        search_prefetcher: Shared prefetcher of search pages.
+        news_service: Shared NewsAPI service, planning local searches.
 
     Returns:
-        List[NewsArticle]: List of news articles.
+        Response: JSON list of news articles.
     """
-    try:
-        params = NewsSearchParams(
-            query=query,
-            category=category,
-            language=language,
-            page_size=page_size,
-            page=page,
+    params = await news_service.plan_search(_search_params(
+        cursor,
+        query=query,
+        category=category,
+        language=language,
+        page_size=page_size,
+        page=page,
+    ))
+
+    page = search_prefetcher.lookup(params)
+    if page is None:
+        try:
+            page = await aggregator.search_page(params)
+        except Exception as e:
+            raise _upstream_error(e)
+
+    response = _articles_response(page.articles)
+    if page.has_next:
+        next_params = params.model_copy(update={"page": params.page + 1})
+        search_prefetcher.schedule(next_params)
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            next_params.model_dump()
         )
+    return response
+
+
+def prefetch_cached_next_page(
+    request: Request,
+    cached: CachedResponse,
+) -> None:
+    """Prefetch the next page of a search served from the cache.
+
+    Cache hits skip search_news, so the response cache runs this hook
+    to schedule the prefetch of the page its X-Next-Cursor points to.
+
+    Args:
+        request: The search request.
+        cached: Its cached response.
+    """
+    for name, value in cached.headers:
+        if name.lower() == b"x-next-cursor":
+            params = NewsSearchParams(**decode_cursor(value.decode()))
+            get_search_prefetcher(request).schedule(params)
+            return
+
+
+def _search_params(
+    cursor: Optional[str],
+    **fields: Any,
+) -> NewsSearchParams:
+    """Build search parameters from a cursor or from query fields.
+
+    Raises:
+        HTTPException: 422 if the cursor or the fields are invalid.
+    """
+    try:
+        if cursor is not None:
+            return NewsSearchParams(**decode_cursor(cursor))
+        return NewsSearchParams(**fields)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=e.errors() if hasattr(e, 'errors') else str(e),
         )
 
-    try:
-        async with NewsService() as news_service:
-            articles = await news_service.search_articles(params)
-            return articles
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        )
-
 
 @router.get("/headlines", response_model=List[NewsArticle])
 async def get_headlines(
@@ -69,29 +211,250 @@ async def get_headlines(
     page_size: int = Query(default=10, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
-) -> List[NewsArticle]:
+    aggregator: NewsAggregator = Depends(get_news_aggregator),
+    prefetcher: HeadlinePrefetcher = Depends(get_headline_prefetcher),
+) -> Response:
     """Get top headlines.
 
+    Headlines are served from the prefetched snapshot when available;
+    only combinations that were never prefetched go upstream.
+
     Args:
         category: News category.
         country: Country code.
         page_size: Number of articles to return.
         current_user: Current authenticated user.
         session: Database session.
+        aggregator: Shared aggregator over every news source.
+        prefetcher: Shared headline prefetcher.
 
     Returns:
-        List[NewsArticle]: List of news articles.
+        Response: JSON list of news articles.
     """
     try:
-        async with NewsService() as news_service:
-            articles = await news_service.get_top_headlines(
-                category=category,
-                country=country,
-                page_size=page_size,
-            )
-            return articles
+        articles = await _resolve_headlines(
+            aggregator, prefetcher, category, country, page_size,
+        )
     except Exception as e:
+        raise _upstream_error(e)
+    return _articles_response(articles)
+
+
+@router.get("/headlines/batch", response_model=HeadlinesBatch)
+async def get_headlines_batch(
+    categories: List[str] = Query(...),
+    countries: List[str] = Query(default=["us"]),
+    page_size: int = Query(default=10, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    aggregator: NewsAggregator = Depends(get_news_aggregator),
+    prefetcher: HeadlinePrefetcher = Depends(get_headline_prefetcher),
+) -> Response:
+    """Get top headlines for several categories and countries at once.
+
+    Every (country, category) combination is resolved concurrently,
+    from the prefetched snapshot when possible. A failing combination
+    is reported under errors without failing the others.
+
+    Args:
+        categories: News categories.
+        countries: Country codes.
+        page_size: Number of articles per combination.
+        current_user: Current authenticated user.
+        session: Database session.
+        aggregator: Shared aggregator over every news source.
+        prefetcher: Shared headline prefetcher.
+
+    Returns:
+        Response: Headlines and errors keyed by "country:category".
+
+    Raises:
+        HTTPException: 422 if too many combinations are requested.
+    """
+    combinations = [
+        (category, country)
+        for country in dict.fromkeys(countries)
+        for category in dict.fromkeys(categories)
+    ]
+    if len(combinations) > MAX_BATCH_COMBINATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=(
+                f"At most {MAX_BATCH_COMBINATIONS} category and country "
+                f"combinations can be requested at once"
+            ),
+        )
+
+    outcomes = await asyncio.gather(
+        *(
+            _resolve_headlines(
+                aggregator, prefetcher, category, country, page_size,
+            )
+            for category, country in combinations
+        ),
+        return_exceptions=True,
+    )
+    results = {}
+    errors = {}
+    for (category, country), outcome in zip(combinations, outcomes):
+        key = f"{country}:{category}"
+        if isinstance(outcome, Exception):
+            errors[key] = _batch_error(outcome)
+        else:
+            results[key] = outcome
+    batch = HeadlinesBatch.model_construct(results=results, errors=errors)
+    return Response(
+        content=batch.model_dump_json(),
+        media_type="application/json",
+    )
+
+
+async def _resolve_headlines(
+    aggregator: NewsAggregator,
+    prefetcher: HeadlinePrefetcher,
+    category: Optional[str],
+    country: str,
+    page_size: int,
+) -> List[NewsArticle]:
+    """Get headlines from the snapshot, or from the sources otherwise."""
+    articles = prefetcher.lookup(category, country, page_size)
+    if articles is not None:
+        return articles
+    return await aggregator.get_top_headlines(
+        category=category,
+        country=country,
+        page_size=page_size,
+    )
+
+
+def _batch_error(error: Exception) -> HeadlinesBatchError:
+    """Describe the failure of one combination of a batch."""
+    http_error = _upstream_error(error)
+    retry_after = (http_error.headers or {}).get("Retry-After")
+    return HeadlinesBatchError(
+        status_code=http_error.status_code,
+        detail=http_error.detail,
+        retry_after=int(retry_after) if retry_after else None,
+    )
+
+
+@router.get("/trending", response_model=TrendingTopics)
+async def get_trending(
+    window: str = "1h",
+    limit: int = Query(default=10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    trending: TrendingEngine = Depends(get_trending_engine),
+) -> TrendingTopics:
+    """Get the trending terms and entities of recent articles.
+
+    Args:
+        window: Time window, "1h" or "24h".
+        limit: Maximum number of terms and of entities.
+        current_user: Current authenticated user.
+        trending: Shared trending engine.
+
+    Returns:
+        TrendingTopics: Top terms and entities of the window.
+
+    Raises:
+        HTTPException: 422 if the window is unknown.
+    """
+    if window not in trending.windows:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown window, expected one of {trending.windows}",
+        )
+    return trending.top(window, limit)
+
+
+@router.get("/feed", response_model=List[NewsArticle])
+async def get_feed(
+    category: str | None = None,
+    page_size: int = Query(default=20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    feed_ranker: FeedRanker = Depends(get_feed_ranker),
+) -> Response:
+    """Get recent articles ranked by the bookmark history of the user.
+
+    The feed differs per user, so the response is not cached.
+
+    Args:
+        category: Only rank articles of this category, if given.
+        page_size: Number of articles to return.
+        current_user: Current authenticated user.
+        feed_ranker: Shared feed ranker.
+
+    Returns:
+        Response: JSON list of news articles, best match first.
+    """
+    articles = await feed_ranker.feed(
+        current_user.id, limit=page_size, category=category,
+    )
+    response = _articles_response(articles)
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@router.get("/articles/{article_id}", response_model=ArticleContent)
+async def get_article(
+    article_id: str,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    article_store: ArticleStore = Depends(get_article_store),
+) -> ArticleContent:
+    """Get a stored article with its full text, for the reader view.
+
+    Until its text has been extracted, the article is returned without
+    a body and the response is not cached.
+
+    Args:
+        article_id: Article identifier.
+        response: Outgoing response.
+        current_user: Current authenticated user.
+        article_store: Shared article store.
+
+    Returns:
+        ArticleContent: The article.
+
+    Raises:
+        HTTPException: 404 if the article is not stored.
+    """
+    article = await article_store.get_content(article_id)
+    if article is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Article not found",
+        )
+    if article.body is None:
+        response.headers["Cache-Control"] = "no-store"
+    return article
+
+
+@router.get("/{article_id}/related", response_model=List[NewsArticle])
+async def get_related(
+    article_id: str,
+    limit: int = Query(default=10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    related: RelatedArticlesIndex = Depends(get_related_index),
+) -> Response:
+    """Get the stored articles most similar to a stored article.
+
+    Args:
+        article_id: Article identifier.
+        limit: Maximum number of articles.
+        current_user: Current authenticated user.
+        related: Shared related articles index.
+
+    Returns:
+        Response: JSON list of news articles, most similar first.
+
+    Raises:
+        HTTPException: 404 if the article is not stored.
+    """
+    articles = await related.related(article_id, limit)
+    if articles is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Article not found",
         )
+    return _articles_response(articles)
@@ -1,27 +1,152 @@
-"""Cache implementation."""
-from typing import Optional
+"""Cache implementation.
 
-from cachetools import TTLCache
+The cache stores raw bytes in a backend. The memory backend is local to
+the process; the SQLite and Redis backends in app.core.cache_backends
+are shared by every worker that points at the same file or server, so
+one worker warms the cache for all of them.
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, NamedTuple, Optional
+
+from cachetools import TLRUCache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    """A cached value with its storage time and lifetime."""
+    value: bytes
+    stored_at: float
+    ttl: float
+
+
+class CacheBackendError(Exception):
+    """Raised when a cache backend cannot be read or written."""
+
+
+def _entry_expiry(key: str, entry: CacheEntry, now: float) -> float:
+    """Get the expiry time of a cache entry."""
+    return now + entry.ttl
+
+
+class CacheBackend(ABC):
+    """Storage of cache entries."""
+
+    name: str = "backend"
+
+    @abstractmethod
+    def now(self) -> float:
+        """Get the current time of the clock entries are stored with.
+
+        Returns:
+            float: Current time in seconds.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry that has not expired.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None if missing.
+
+        Raises:
+            CacheBackendError: If the backend cannot be read.
+        """
+
+    @abstractmethod
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, replacing any previous one.
+
+        Args:
+            key: Cache key.
+            entry: Entry to store, expiring ttl seconds after stored_at.
+
+        Raises:
+            CacheBackendError: If the backend cannot be written.
+        """
+
+    async def close(self) -> None:
+        """Release the resources of the backend."""
+
+
+class MemoryBackend(CacheBackend):
+    """Cache entries held in the memory of the process."""
+
+    name = "memory"
+
+    def __init__(self, max_size: int = 1000) -> None:
+        """Initialize the backend.
+
+        Args:
+            max_size: Maximum number of entries.
+        """
+        self.storage = TLRUCache(maxsize=max_size, ttu=_entry_expiry)
+
+    def now(self) -> float:
+        """Get the current time of the monotonic cache clock.
+
+        Returns:
+            float: Current time in seconds.
+        """
+        return self.storage.timer()
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry that has not expired.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None if missing.
+        """
+        return self.storage.get(key)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used if full.
+
+        Args:
+            key: Cache key.
+            entry: Entry to store.
+        """
+        self.storage[key] = entry
 
 
 class Cache:
-    """Cache for API responses."""
+    """Cache for API responses.
+
+    Backend failures are logged and treated as misses, so an outage of
+    a shared backend only costs upstream requests.
+    """
 
     def __init__(
         self,
         max_size: int = 1000,
         ttl: int = 300,
+        backend: Optional[CacheBackend] = None,
     ) -> None:
         """Initialize the cache.
 
         Args:
-            max_size: Maximum number of items in the cache.
-            ttl: Time to live in seconds.
+            max_size: Maximum number of items of the default backend.
+            ttl: Default time to live in seconds.
+            backend: Storage of the entries, in memory by default.
         """
-        self.cache_storage = TTLCache(
-            maxsize=max_size,
-            ttl=ttl,
-        )
+        self.ttl = ttl
+        self.backend = backend or MemoryBackend(max_size)
+        self._counts = {"hits": 0, "misses": 0, "errors": 0}
+
+    async def _entry(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry from the backend, or None if it fails."""
+        try:
+            return await self.backend.get(key)
+        except CacheBackendError as e:
+            self._counts["errors"] += 1
+            logger.warning("Cache read failed for %s: %s", key, e)
+            return None
 
     async def get(self, key: str) -> Optional[bytes]:
         """Get a value from the cache.
@@ -32,13 +157,80 @@ class Cache:
         Returns:
             Optional[bytes]: Cached value if found, None otherwise.
         """
-        return self.cache_storage.get(key)
+        entry = await self.get_entry(key)
+        return entry.value if entry else None
+
+    async def get_entry(self, key: str) -> Optional[CacheEntry]:
+        """Get a value from the cache with its storage time.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[CacheEntry]: Cached entry if found, None otherwise.
+        """
+        entry = await self._entry(key)
+        self._counts["hits" if entry else "misses"] += 1
+        return entry
 
-    async def set(self, key: str, value: bytes) -> None:
+    def entry_age(self, entry: CacheEntry) -> float:
+        """Get how long ago an entry was cached.
+
+        Args:
+            entry: Entry read from this cache.
+
+        Returns:
+            float: Age in seconds.
+        """
+        return self.backend.now() - entry.stored_at
+
+    async def age(self, key: str) -> Optional[float]:
+        """Get how long ago a value was cached.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[float]: Age in seconds if found, None otherwise.
+        """
+        entry = await self._entry(key)
+        if entry is None:
+            return None
+        return self.entry_age(entry)
+
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        ttl: Optional[float] = None,
+    ) -> None:
         """Set a value in the cache.
 
         Args:
             key: Cache key.
             value: Value to cache.
+            ttl: Time to live in seconds, defaults to the cache TTL.
+        """
+        entry = CacheEntry(
+            value=value,
+            stored_at=self.backend.now(),
+            ttl=self.ttl if ttl is None else ttl,
+        )
+        try:
+            await self.backend.set(key, entry)
+        except CacheBackendError as e:
+            self._counts["errors"] += 1
+            logger.warning("Cache write failed for %s: %s", key, e)
+
+    async def close(self) -> None:
+        """Close the backend of the cache."""
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters.
+
+        Returns:
+            Dict[str, Any]: Backend name, hits, misses and backend
+            errors of this worker.
         """
-        self.cache_storage[key] = value
+        return {"backend": self.backend.name, **self._counts}
@@ -0,0 +1,381 @@
+"""Cache backends shared by the workers of the application.
+
+SQLiteBackend keeps the entries in one database file, shared by the
+workers of a host. RedisBackend keeps them in a Redis server, or any
+server speaking its protocol, shared by every host pointing at it.
+Both stamp entries with the wall clock, which workers agree on.
+"""
+import asyncio
+import sqlite3
+import struct
+import time
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, List, Optional, Union
+from urllib.parse import unquote, urlsplit
+
+import aiosqlite
+
+from app.core.cache import (
+    CacheBackend,
+    CacheBackendError,
+    CacheEntry,
+    MemoryBackend,
+)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS cache_entries (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        stored_at REAL NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_cache_entries_stored_at"
+    " ON cache_entries (stored_at)",
+)
+
+
+class SQLiteBackend(CacheBackend):
+    """Cache entries in a SQLite database file shared by local workers.
+
+    The database runs in WAL mode, so reads never wait for a write.
+    Every prune_interval writes, expired entries are deleted and only
+    the newest max_size entries are kept.
+    """
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        max_size: int = 1000,
+        timeout: float = 1.0,
+        prune_interval: int = 100,
+    ) -> None:
+        """Initialize the backend.
+
+        The database file and its directory are created on first use.
+
+        Args:
+            path: Path of the database file.
+            max_size: Entries kept when pruning.
+            timeout: Seconds to wait for a lock held by another worker.
+            prune_interval: Writes of this worker between two prunings.
+        """
+        self.path = Path(path)
+        self.max_size = max_size
+        self.timeout = timeout
+        self.prune_interval = prune_interval
+        self._db: Optional[aiosqlite.Connection] = None
+        self._lock = asyncio.Lock()
+        self._writes = 0
+
+    def now(self) -> float:
+        """Get the current wall clock time.
+
+        Returns:
+            float: Seconds since the epoch.
+        """
+        return time.time()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        """Open the database on first use."""
+        async with self._lock:
+            if self._db is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                db = await aiosqlite.connect(self.path, timeout=self.timeout)
+                await db.execute("PRAGMA journal_mode=WAL")
+                await db.execute("PRAGMA synchronous=NORMAL")
+                for statement in _SCHEMA:
+                    await db.execute(statement)
+                await db.commit()
+                self._db = db
+            return self._db
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry that has not expired.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None if missing.
+
+        Raises:
+            CacheBackendError: If the database cannot be read.
+        """
+        try:
+            db = await self._connection()
+            async with db.execute(
+                "SELECT value, stored_at, expires_at FROM cache_entries"
+                " WHERE key = ? AND expires_at > ?",
+                (key, self.now()),
+            ) as cursor:
+                row = await cursor.fetchone()
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+        if row is None:
+            return None
+        value, stored_at, expires_at = row
+        return CacheEntry(value, stored_at, expires_at - stored_at)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, pruning the database now and then.
+
+        Args:
+            key: Cache key.
+            entry: Entry to store.
+
+        Raises:
+            CacheBackendError: If the database cannot be written.
+        """
+        try:
+            db = await self._connection()
+            await db.execute(
+                "INSERT OR REPLACE INTO cache_entries"
+                " (key, value, stored_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, entry.value, entry.stored_at,
+                 entry.stored_at + entry.ttl),
+            )
+            self._writes += 1
+            if self._writes % self.prune_interval == 0:
+                await self._prune(db)
+            await db.commit()
+        except sqlite3.Error as e:
+            raise CacheBackendError(str(e)) from e
+
+    async def _prune(self, db: aiosqlite.Connection) -> None:
+        """Delete expired entries and all but the newest max_size."""
+        await db.execute(
+            "DELETE FROM cache_entries WHERE expires_at <= ?", (self.now(),),
+        )
+        await db.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            " SELECT key FROM cache_entries"
+            " ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,),
+        )
+
+    async def close(self) -> None:
+        """Close the database connection."""
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+
+# Stored in front of every value in Redis: storage time and lifetime
+_REDIS_HEADER = struct.Struct("!dd")
+
+RespValue = Union[None, int, bytes, List[Any]]
+
+
+class RedisBackend(CacheBackend):
+    """Cache entries in a Redis server shared by all workers.
+
+    Speaks the Redis serialization protocol over one connection per
+    worker, reconnecting after failures. Entries expire in Redis
+    itself; bounding memory is left to the maxmemory policy of the
+    server.
+    """
+
+    name = "redis"
+
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        prefix: str = "news-aggregator:",
+        timeout: float = 1.0,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            url: Server URL, redis://[:password@]host[:port][/db].
+            prefix: Prefix of the keys written by the application.
+            timeout: Seconds to wait for a connection or a reply.
+        """
+        parts = urlsplit(url)
+        if parts.scheme != "redis":
+            raise ValueError(f"Unsupported Redis URL: {url}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.strip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    def now(self) -> float:
+        """Get the current wall clock time.
+
+        Returns:
+            float: Seconds since the epoch.
+        """
+        return time.time()
+
+    async def _connect(self) -> None:
+        """Open the connection, then authenticate and select the db."""
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port,
+        )
+        if self.password is not None:
+            await self._send("AUTH", self.password)
+        if self.db:
+            await self._send("SELECT", str(self.db))
+
+    async def _send(self, *args: Union[str, bytes]) -> RespValue:
+        """Write a command on the connection and read its reply."""
+        chunks = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg.encode() if isinstance(arg, str) else arg
+            chunks.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(chunks))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self) -> RespValue:
+        """Read one reply from the connection."""
+        line = await self._reader.readuntil(b"\r\n")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise CacheBackendError(payload.decode(errors="replace"))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(payload)
+            if count < 0:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise CacheBackendError(f"Unexpected reply: {line!r}")
+
+    async def _command(self, *args: Union[str, bytes]) -> RespValue:
+        """Run a command, connecting first if needed.
+
+        Raises:
+            CacheBackendError: If the server is unreachable, too slow or
+                replies with an error.
+        """
+        async with self._lock:
+            try:
+                return await asyncio.wait_for(
+                    self._run(*args), timeout=self.timeout,
+                )
+            except (OSError, asyncio.TimeoutError,
+                    asyncio.IncompleteReadError) as e:
+                self._disconnect()
+                raise CacheBackendError(
+                    f"Redis command {args[0]} failed: {e!r}"
+                ) from e
+            except asyncio.CancelledError:
+                # The reply may still arrive and would be read as the
+                # reply of the next command
+                self._disconnect()
+                raise
+
+    async def _run(self, *args: Union[str, bytes]) -> RespValue:
+        """Connect if needed and send a command."""
+        if self._writer is None:
+            try:
+                await self._connect()
+            except CacheBackendError:
+                self._disconnect()
+                raise
+        return await self._send(*args)
+
+    def _disconnect(self) -> None:
+        """Drop the connection, which is reopened on the next command."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry that has not expired.
+
+        Values too short to hold the entry header are deleted and read
+        as missing.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Optional[CacheEntry]: The entry, or None if missing.
+
+        Raises:
+            CacheBackendError: If the server cannot be read.
+        """
+        data = await self._command("GET", self.prefix + key)
+        if data is None:
+            return None
+        if len(data) < _REDIS_HEADER.size:
+            # Not written by this backend, or truncated
+            await self._command("DEL", self.prefix + key)
+            return None
+        stored_at, ttl = _REDIS_HEADER.unpack_from(data)
+        return CacheEntry(data[_REDIS_HEADER.size:], stored_at, ttl)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, expiring in Redis after its lifetime.
+
+        Args:
+            key: Cache key.
+            entry: Entry to store.
+
+        Raises:
+            CacheBackendError: If the server cannot be written.
+        """
+        data = _REDIS_HEADER.pack(entry.stored_at, entry.ttl) + entry.value
+        expiry = max(1, int(entry.ttl * 1000))
+        await self._command(
+            "SET", self.prefix + key, data, "PX", str(expiry),
+        )
+
+    async def close(self) -> None:
+        """Close the connection."""
+        async with self._lock:
+            writer = self._writer
+            self._disconnect()
+        if writer is not None:
+            with suppress(OSError):
+                await writer.wait_closed()
+
+
+def create_cache_backend(
+    kind: str,
+    max_size: int = 1000,
+    sqlite_path: str = ".cache/responses.db",
+    redis_url: str = "redis://localhost:6379/0",
+    timeout: float = 1.0,
+) -> CacheBackend:
+    """Create the cache backend selected in the settings.
+
+    Args:
+        kind: One of memory, sqlite or redis.
+        max_size: Maximum number of entries, for memory and sqlite.
+        sqlite_path: Database file of the sqlite backend.
+        redis_url: Server URL of the redis backend.
+        timeout: Seconds the shared backends wait before failing.
+
+    Returns:
+        CacheBackend: The backend.
+
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    if kind == "memory":
+        return MemoryBackend(max_size)
+    if kind == "sqlite":
+        return SQLiteBackend(sqlite_path, max_size=max_size, timeout=timeout)
+    if kind == "redis":
+        return RedisBackend(redis_url, timeout=timeout)
+    raise ValueError(f"Unknown cache backend: {kind}")
@@ -0,0 +1,178 @@
+"""Circuit breaker for calls to unreliable upstream services."""
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitState(str, Enum):
+    """State of a circuit breaker."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Exception raised when the circuit rejects a call."""
+
+    def __init__(self, retry_after: float) -> None:
+        """Initialize the error.
+
+        Args:
+            retry_after: Seconds until the circuit allows a trial call.
+        """
+        super().__init__("Upstream circuit is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Stops calling an upstream after consecutive failures or slow calls.
+
+    The circuit opens after failure_threshold consecutive failed or slow
+    calls. While open, calls are rejected. After reset_timeout, up to
+    half_open_max_calls trial calls are let through: one success closes
+    the circuit again, one failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        slow_call_threshold: float = 5.0,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the circuit breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit.
+            slow_call_threshold: Seconds after which a call counts as
+                a failure even if it succeeded.
+            reset_timeout: Seconds the circuit stays open.
+            half_open_max_calls: Trial calls allowed while half-open.
+            clock: Monotonic time source.
+        """
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._consecutive_failures = 0
+        self._trial_calls = 0
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Get the current state, moving from open to half-open on time."""
+        if (
+            self._state is CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._trial_calls = 0
+        return self._state
+
+    def allows_calls(self) -> bool:
+        """Check, without side effects, whether a call would be admitted.
+
+        Returns:
+            bool: True if a call would currently go through.
+        """
+        state = self.state
+        if state is CircuitState.OPEN:
+            return False
+        if state is CircuitState.HALF_OPEN:
+            return self._trial_calls < self.half_open_max_calls
+        return True
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[T]],
+        is_failure: Optional[Callable[[Exception], bool]] = None,
+    ) -> T:
+        """Run a call through the circuit.
+
+        Args:
+            func: Coroutine function performing the call.
+            is_failure: Tells whether an error raised by the call means
+                the upstream is failing. Other errors are raised as is
+                and count as an answer from the upstream. By default
+                every error is a failure.
+
+        Returns:
+            T: The call result.
+
+        Raises:
+            CircuitOpenError: If the circuit rejects the call.
+        """
+        self._admit()
+        started = self._clock()
+        try:
+            result = await func()
+        except Exception as e:
+            if is_failure is None or is_failure(e):
+                self._record_failure()
+            else:
+                self._record_success()
+            raise
+        if self._clock() - started > self.slow_call_threshold:
+            self._record_failure()
+        else:
+            self._record_success()
+        return result
+
+    def _admit(self) -> None:
+        """Admit a call or raise CircuitOpenError."""
+        if not self.allows_calls():
+            self._rejected += 1
+            raise CircuitOpenError(self.retry_after())
+        if self._state is CircuitState.HALF_OPEN:
+            self._trial_calls += 1
+
+    def retry_after(self) -> float:
+        """Get the seconds until a trial call may be admitted.
+
+        Returns:
+            float: Seconds to wait, at least one.
+        """
+        if self._state is not CircuitState.OPEN:
+            return 1.0
+        elapsed = self._clock() - self._opened_at
+        return max(self.reset_timeout - elapsed, 1.0)
+
+    def _record_success(self) -> None:
+        """Record a successful call."""
+        self._consecutive_failures = 0
+        self._state = CircuitState.CLOSED
+
+    def _record_failure(self) -> None:
+        """Record a failed or slow call."""
+        self._consecutive_failures += 1
+        if (
+            self._state is CircuitState.HALF_OPEN
+            or self._consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        """Open the circuit."""
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._times_opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the breaker state and counters.
+
+        Returns:
+            Dict[str, Any]: State, failures, openings and rejections.
+        """
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self._times_opened,
+            "rejected": self._rejected,
+        }
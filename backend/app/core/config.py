@@ -1,5 +1,5 @@
 """Configuration settings for the application."""
-from typing import List
+from typing import Dict, List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -30,6 +30,116 @@ class Settings(BaseSettings):
 
     # News API
     NEWS_API_KEY: str
+    NEWS_API_TIMEOUT: float = 10.0
+    NEWS_API_MAX_CONNECTIONS: int = 20
+    NEWS_API_MAX_KEEPALIVE: int = 10
+    NEWS_API_MAX_CONCURRENCY: int = 10
+
+    # Upstream quota budget
+    NEWS_API_RATE_PER_SECOND: float = 5.0
+    NEWS_API_BURST: int = 10
+    NEWS_API_DAILY_QUOTA: int = 1000
+    NEWS_API_INTERACTIVE_RESERVE: float = 0.2
+    NEWS_API_INTERACTIVE_MAX_WAIT: float = 1.0
+    NEWS_API_BACKGROUND_MAX_WAIT: float = 30.0
+
+    # Upstream circuit breaker
+    NEWS_API_BREAKER_FAILURE_THRESHOLD: int = 5
+    NEWS_API_BREAKER_SLOW_CALL: float = 5.0
+    NEWS_API_BREAKER_RESET_TIMEOUT: float = 30.0
+    NEWS_API_BREAKER_HALF_OPEN_CALLS: int = 1
+    NEWS_LAST_GOOD_MAX_SIZE: int = 500
+
+    # Multi-source aggregation: every source has its own deadline and
+    # the whole fan-out is bounded by the aggregation budget
+    NEWS_AGGREGATION_BUDGET: float = 4.0
+    NEWS_API_SOURCE_TIMEOUT: float = 4.0
+    RSS_SOURCE_TIMEOUT: float = 2.0
+    # Feed URLs mapped to the category of their articles (or null)
+    RSS_FEEDS: Dict[str, Optional[str]] = {}
+    RSS_FEED_TTL: int = 300
+
+    # Near-duplicate collapsing: articles whose shingles overlap at least
+    # NEWS_DEDUP_THRESHOLD (estimated Jaccard similarity) are one story
+    NEWS_DEDUP_ENABLED: bool = True
+    NEWS_DEDUP_THRESHOLD: float = 0.5
+    NEWS_DEDUP_INDEX_SIZE: int = 50_000
+
+    NEWS_CATEGORIES: List[str] = [
+        "business",
+        "entertainment",
+        "general",
+        "health",
+        "science",
+        "sports",
+        "technology",
+    ]
+    # Headline prefetching: one call per category (and "no category")
+    # and country every interval, from the background share of the daily
+    # quota. The defaults make 8 calls every 30 minutes, 384 a day of the
+    # 800 left to background calls. Snapshots older than the max age are
+    # not served.
+    HEADLINES_PREFETCH_ENABLED: bool = True
+    HEADLINES_PREFETCH_COUNTRIES: List[str] = ["us"]
+    HEADLINES_PREFETCH_INTERVAL: int = 1800
+    HEADLINES_PREFETCH_MAX_AGE: int = 3600
+    HEADLINES_PREFETCH_PAGE_SIZE: int = 100
+
+    # Incremental ingestion: every query (searched on /everything) and
+    # category (top headlines) only fetches articles newer than the
+    # persisted watermark of its feed
+    INGESTION_QUERIES: List[str] = []
+    INGESTION_CATEGORIES: List[str] = []
+    INGESTION_COUNTRY: str = "us"
+    INGESTION_LANGUAGE: str = "en"
+    INGESTION_INTERVAL: int = 300
+    INGESTION_PAGE_SIZE: int = 20
+    INGESTION_MAX_PAGES: int = 5
+
+    # Speculative prefetching of the next search page
+    NEWS_SEARCH_PREFETCH_TTL: int = 120
+    NEWS_SEARCH_PREFETCH_MAX_SIZE: int = 256
+    NEWS_SEARCH_PREFETCH_MAX_PAGE: int = 5
+    NEWS_SEARCH_PREFETCH_MAX_IN_FLIGHT: int = 2
+
+    # Worker processes for HTML parsing and image downscaling
+    PROCESS_POOL_WORKERS: int = 2
+
+    # Background extraction of the full text of stored articles
+    ARTICLE_EXTRACTION_ENABLED: bool = True
+    ARTICLE_EXTRACTION_BATCH_SIZE: int = 20
+    ARTICLE_EXTRACTION_INTERVAL: int = 60
+    ARTICLE_FETCH_TIMEOUT: float = 10.0
+    ARTICLE_FETCH_MAX_BYTES: int = 2_000_000
+
+    # Thumbnail proxy of article images
+    THUMBNAIL_CACHE_DIR: str = ".cache/thumbnails"
+    THUMBNAIL_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    THUMBNAIL_WIDTH: int = 480
+    THUMBNAIL_HEIGHT: int = 270
+    IMAGE_FETCH_TIMEOUT: float = 10.0
+    IMAGE_FETCH_MAX_BYTES: int = 10_000_000
+
+    # Trending terms of ingested articles
+    TRENDING_SKETCH_WIDTH: int = 2048
+    TRENDING_SKETCH_DEPTH: int = 4
+    TRENDING_CANDIDATES: int = 200
+
+    # Personalized feed ranked from bookmark history
+    FEED_CANDIDATES: int = 500
+    FEED_PROFILE_CACHE_SIZE: int = 1000
+    FEED_VECTOR_CACHE_SIZE: int = 10000
+
+    # Related articles index, about 1 KB of vectors per article
+    RELATED_MAX_ARTICLES: int = 50000
+    RELATED_WARM_ARTICLES: int = 10000
+    RELATED_DIMENSIONS: int = 256
+    RELATED_SHORTLIST: int = 1024
+
+    # Local full-text search over stored articles. A query is answered
+    # locally only while its newest match is younger than the max age
+    LOCAL_SEARCH_ENABLED: bool = True
+    LOCAL_SEARCH_MAX_AGE: int = 6 * 3600
 
     # Database
     DATABASE_URL: str
@@ -41,6 +151,21 @@ class Settings(BaseSettings):
     # Cache settings
     CACHE_MAX_SIZE: int = 1000
     CACHE_TTL: int = 300
+    # Response cache backend: memory (per worker), sqlite (shared by the
+    # workers of a host) or redis (shared by every host)
+    CACHE_BACKEND: str = "memory"
+    CACHE_SQLITE_PATH: str = ".cache/responses.db"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_BACKEND_TIMEOUT: float = 1.0
+    # Seconds a token that passed authentication is trusted on cache hits
+    CACHE_AUTHORIZE_TTL: int = 60
+
+    # Stale-while-revalidate for news routes: responses older than the
+    # soft TTL are served while refreshed, and evicted at the hard TTL
+    NEWS_SEARCH_CACHE_SOFT_TTL: int = 300
+    NEWS_SEARCH_CACHE_HARD_TTL: int = 1800
+    NEWS_HEADLINES_CACHE_SOFT_TTL: int = 120
+    NEWS_HEADLINES_CACHE_HARD_TTL: int = 900
 
     TESTING: bool
 
@@ -0,0 +1,82 @@
+"""Opaque, tamper-proof pagination cursors."""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+from typing import Any, Dict
+
+from app.core.config import settings
+
+# Bytes of the HMAC-SHA256 tag kept in a cursor
+SIGNATURE_SIZE = 16
+
+
+class InvalidCursorError(ValueError):
+    """Exception raised when a cursor is malformed or was tampered with."""
+    pass
+
+
+def _b64encode(data: bytes) -> str:
+    """Encode bytes as unpadded URL-safe base64."""
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    """Decode unpadded URL-safe base64."""
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes, key: str) -> bytes:
+    """Compute the signature of a cursor payload."""
+    return hmac.new(
+        key.encode(), payload, hashlib.sha256
+    ).digest()[:SIGNATURE_SIZE]
+
+
+def encode_cursor(state: Dict[str, Any], key: str = "") -> str:
+    """Encode query state into an opaque cursor.
+
+    Args:
+        state: JSON-serializable query state.
+        key: Signing key, defaults to the application secret key.
+
+    Returns:
+        str: URL-safe cursor.
+    """
+    payload = json.dumps(state, separators=(",", ":"),
+                         sort_keys=True).encode()
+    signature = _sign(payload, key or settings.SECRET_KEY)
+    return f"{_b64encode(payload)}.{_b64encode(signature)}"
+
+
+def decode_cursor(cursor: str, key: str = "") -> Dict[str, Any]:
+    """Decode a cursor made by encode_cursor.
+
+    Args:
+        cursor: Cursor to decode.
+        key: Signing key, defaults to the application secret key.
+
+    Returns:
+        Dict[str, Any]: The encoded query state.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or its signature
+            does not match.
+    """
+    try:
+        encoded_payload, encoded_signature = cursor.split(".")
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (ValueError, binascii.Error):
+        raise InvalidCursorError("Malformed cursor")
+    expected = _sign(payload, key or settings.SECRET_KEY)
+    if not hmac.compare_digest(signature, expected):
+        raise InvalidCursorError("Invalid cursor signature")
+    try:
+        state = json.loads(payload)
+    except ValueError:
+        raise InvalidCursorError("Malformed cursor")
+    if not isinstance(state, dict):
+        raise InvalidCursorError("Malformed cursor")
+    return state
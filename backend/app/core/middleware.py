@@ -1,12 +1,37 @@
 """Middleware for rate limiting and caching."""
+import asyncio
+import logging
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+from urllib.parse import parse_qsl, urlencode
+
+from cachetools import LRUCache, TTLCache
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-import json
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.rate_limiter import RateLimiter
 from app.core.cache import Cache
+from app.models.schemas import normalize_search_text
+
+logger = logging.getLogger(__name__)
+
+# Response headers that belong to the cached entity and are replayed
+REPLAYED_HEADERS = (b"content-type", b"x-next-cursor")
+
+# Scope key carrying the cache key of a request whose lookup missed
+_MISSED_KEY = "app.cache_key"
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
@@ -27,36 +52,387 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         return await call_next(request)
 
 
+class StaleWhileRevalidate(NamedTuple):
+    """Stale-while-revalidate policy of a route.
+
+    Entries younger than soft_ttl are fresh. Older entries are still
+    served, while one background request refreshes them, until they
+    reach hard_ttl and are evicted.
+    """
+    soft_ttl: int
+    hard_ttl: int
+
+
+class CacheKeySpec(NamedTuple):
+    """Query parameters of a route that matter for its cache key.
+
+    defaults maps parameters to the value the route assumes when they
+    are missing. text_params are free-text search parameters, compared
+    after normalize_search_text.
+    """
+    defaults: Dict[str, str] = {}
+    text_params: Tuple[str, ...] = ()
+
+
+def canonical_cache_key(
+    path: str,
+    query_string: str,
+    spec: Optional[CacheKeySpec] = None,
+) -> str:
+    """Build the cache key of a GET request.
+
+    Parameters are sorted, so their order does not matter. With a spec,
+    search text is normalized, blank search text is dropped and missing
+    parameters are filled in with their defaults, so equivalent requests
+    share one entry.
+
+    Args:
+        path: Request path.
+        query_string: Raw query string.
+        spec: Cache key spec of the route, if any.
+
+    Returns:
+        str: The cache key.
+    """
+    spec = spec or CacheKeySpec()
+    params = []
+    for name, value in parse_qsl(query_string, keep_blank_values=True):
+        if name in spec.text_params:
+            value = normalize_search_text(value)
+            if value is None:
+                continue
+        params.append((name, value))
+    present = {name for name, _ in params}
+    params.extend(
+        (name, value) for name, value in spec.defaults.items()
+        if name not in present
+    )
+    return f"{path}?{urlencode(sorted(params))}"
+
+
+class CachedResponse(NamedTuple):
+    """Raw body of a cached response with the headers replayed on hits.
+
+    Headers are raw (name, value) pairs, the content type included, so a
+    hit sends the stored bytes without decoding or rendering them.
+    """
+    body: bytes
+    headers: List[Tuple[bytes, bytes]]
+
+    def to_bytes(self) -> bytes:
+        """Encode the response for a cache backend.
+
+        Returns:
+            bytes: One "name: value" line per header and a blank line,
+            followed by the body.
+        """
+        head = b"".join(
+            name + b": " + value + b"\r\n" for name, value in self.headers
+        )
+        return head + b"\r\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        """Decode a response read from a cache backend.
+
+        Args:
+            data: Bytes written by to_bytes.
+
+        Returns:
+            CachedResponse: The cached response.
+        """
+        if data.startswith(b"\r\n"):
+            return cls(data[2:], [])
+        head, _, body = data.partition(b"\r\n\r\n")
+        headers = [
+            tuple(line.split(b": ", 1)) for line in head.split(b"\r\n")
+        ]
+        return cls(body, headers)
+
+    def to_response(self) -> Response:
+        """Build the response replaying the cached bytes verbatim.
+
+        Returns:
+            Response: The response, with its content length.
+        """
+        response = Response(content=self.body)
+        response.raw_headers.extend(self.headers)
+        return response
+
+
+def replayed_headers(headers: Headers) -> List[Tuple[bytes, bytes]]:
+    """Select the response headers to store with a cached body.
+
+    Args:
+        headers: Headers of the response.
+
+    Returns:
+        List[Tuple[bytes, bytes]]: The content type and the headers
+        listed in REPLAYED_HEADERS, as raw pairs.
+    """
+    return [
+        (name, value) for name, value in headers.raw
+        if name.lower() in REPLAYED_HEADERS
+    ]
+
+
+def is_cacheable(status_code: int, headers: Headers) -> bool:
+    """Check whether a response may be stored in the cache.
+
+    Only successful JSON responses are cached, unless they opt out with
+    Cache-Control: no-store. Other responses, such as files, are passed
+    through untouched.
+
+    Args:
+        status_code: Status code of the response.
+        headers: Headers of the response.
+
+    Returns:
+        bool: True if the response may be cached.
+    """
+    return (
+        status_code == 200
+        and headers.get("content-type", "").startswith("application/json")
+        and "no-store" not in headers.get("cache-control", "")
+    )
+
+
+async def read_body(response: Response) -> bytes:
+    """Read the whole body of a response.
+
+    Args:
+        response: A plain or streaming response.
+
+    Returns:
+        bytes: The response body.
+    """
+    if hasattr(response, "body"):
+        return response.body
+    chunks = [chunk async for chunk in response.body_iterator]
+    return b"".join(chunks)
+
+
 class CacheMiddleware(BaseHTTPMiddleware):
-    """Middleware for caching responses."""
+    """Middleware for caching responses of public routes.
+
+    Only the listed routes are cached, since entries are shared by every
+    user. A hit skips the route and its dependencies, so when the routes
+    require authentication, authorize must check the request before a
+    cached response is served; requests it rejects go to the route.
 
-    def __init__(self, app: ASGIApp, cache: Cache):
+    Hits are served straight from the ASGI call, and other routes pass
+    through untouched; only misses go through dispatch. Since hits skip
+    the route, work it starts for the next request, such as a prefetch,
+    is started by the hit hook of its path.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: Cache,
+        policies: Optional[Dict[str, StaleWhileRevalidate]] = None,
+        key_specs: Optional[Dict[str, CacheKeySpec]] = None,
+        paths: Iterable[str] = (),
+        authorize: Optional[Callable[[Request], Awaitable[bool]]] = None,
+        authorize_ttl: float = 0,
+        hit_hooks: Optional[
+            Dict[str, Callable[[Request, "CachedResponse"], None]]
+        ] = None,
+    ):
+        """Initialize the middleware.
+
+        Args:
+            app: The wrapped application.
+            cache: Response cache.
+            policies: Stale-while-revalidate policies by path.
+            key_specs: Cache key specs by path.
+            paths: Other paths to cache; routes with a policy or a key
+                spec are cached as well.
+            authorize: Check run on a request before serving it a hit.
+            authorize_ttl: Seconds the Authorization header of a request
+                authorize accepted is trusted without checking it again.
+            hit_hooks: Callbacks by path, run with the request and the
+                cached response on every hit.
+        """
         super().__init__(app)
         self.cache = cache
+        self.policies = policies or {}
+        self.key_specs = key_specs or {}
+        self.paths = set(paths) | set(self.policies) | set(self.key_specs)
+        self.authorize = authorize
+        self._authorized_credentials: Optional[TTLCache] = (
+            TTLCache(maxsize=10_000, ttl=authorize_ttl)
+            if authorize_ttl > 0 else None
+        )
+        self._cache_keys: LRUCache = LRUCache(maxsize=4096)
+        self.hit_hooks = hit_hooks or {}
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        """Serve hits directly and pass misses on to dispatch."""
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope, receive)
+        cache_key = self._cache_key(
+            scope["path"], scope["query_string"].decode("latin-1"),
+        )
+        response = await self._cached_response(request, cache_key)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+        await super().__call__(
+            {**scope, _MISSED_KEY: cache_key}, receive, send,
+        )
+
+    def _cache_key(self, path: str, query: str) -> str:
+        """Get the canonical cache key of a request, memoized."""
+        cache_key = self._cache_keys.get((path, query))
+        if cache_key is None:
+            cache_key = canonical_cache_key(
+                path, query, self.key_specs.get(path),
+            )
+            self._cache_keys[(path, query)] = cache_key
+        return cache_key
+
+    async def _authorized(self, request: Request) -> bool:
+        """Check whether a request may be served a cached response."""
+        if self.authorize is None:
+            return True
+        trusted = self._authorized_credentials
+        credentials = request.headers.get("authorization")
+        if trusted is not None and credentials in trusted:
+            return True
+        if not await self.authorize(request):
+            return False
+        if trusted is not None and credentials is not None:
+            trusted[credentials] = True
+        return True
+
+    async def _cached_response(
+        self,
+        request: Request,
+        cache_key: str,
+    ) -> Optional[Response]:
+        """Get the cached response of a request, if it may be served."""
+        entry = await self.cache.get_entry(cache_key)
+        if not entry or not await self._authorized(request):
+            return None
+        policy = self.policies.get(request.url.path)
+        if policy is not None:
+            self._revalidate_if_stale(
+                request, cache_key, policy, self.cache.entry_age(entry),
+            )
+        cached = CachedResponse.from_bytes(entry.value)
+        hook = self.hit_hooks.get(request.url.path)
+        if hook is not None:
+            try:
+                hook(request, cached)
+            except Exception as e:
+                logger.warning("Cache hit hook failed for %s: %s",
+                               cache_key, e)
+        return cached.to_response()
 
     async def dispatch(self, request: Request, call_next):
         """Dispatch the request with caching."""
-        # Only cache GET requests
-        if request.method != "GET":
+        # Only cache GET requests of public routes
+        if request.method != "GET" or request.url.path not in self.paths:
             return await call_next(request)
 
-        # Generate cache key
-        cache_key = f"{request.url.path}?{request.url.query}"
-        # Try to get from cache
-        cached_response = await self.cache.get(cache_key)
-        if cached_response:
-            return JSONResponse(
-                status_code=200,
-                content=json.loads(cached_response),
-            )
+        # Requests coming from __call__ were looked up already
+        if _MISSED_KEY in request.scope:
+            cache_key = request.scope[_MISSED_KEY]
+        else:
+            cache_key = self._cache_key(request.url.path, request.url.query)
+            response = await self._cached_response(request, cache_key)
+            if response is not None:
+                return response
+        policy = self.policies.get(request.url.path)
 
         # Process request
         response = await call_next(request)
 
-        # Cache successful responses
-        if response.status_code == 200:
-            # Handle streaming responses which don't have a body attribute
-            if hasattr(response, 'body'):
-                await self.cache.set(cache_key, response.body.decode())
+        if is_cacheable(response.status_code, response.headers):
+            body = await read_body(response)
+            ttl = policy.hard_ttl if policy is not None else None
+            cached = CachedResponse(body, replayed_headers(response.headers))
+            await self.cache.set(cache_key, cached.to_bytes(), ttl)
+            replay = Response(content=body, status_code=response.status_code)
+            # Keeps repeated headers, such as several Set-Cookie
+            replay.raw_headers = list(response.raw_headers)
+            return replay
 
         return response
+
+    def _revalidate_if_stale(
+        self,
+        request: Request,
+        cache_key: str,
+        policy: StaleWhileRevalidate,
+        age: float,
+    ) -> None:
+        """Start one background refresh if the entry is stale."""
+        if age < policy.soft_ttl:
+            return
+        if cache_key in self._refreshing:
+            return
+        self._refreshing.add(cache_key)
+        task = asyncio.create_task(
+            self._refresh(dict(request.scope), cache_key, policy)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(
+        self,
+        scope: Scope,
+        cache_key: str,
+        policy: StaleWhileRevalidate,
+    ) -> None:
+        """Replay a request through the app and re-cache its response."""
+        try:
+            status_code, headers, body = await self._replay(scope)
+            if is_cacheable(status_code, headers):
+                cached = CachedResponse(body, replayed_headers(headers))
+                await self.cache.set(
+                    cache_key, cached.to_bytes(), policy.hard_ttl,
+                )
+        except Exception as e:
+            logger.warning("Cache revalidation failed for %s: %s",
+                           cache_key, e)
+        finally:
+            self._refreshing.discard(cache_key)
+
+    async def _replay(self, scope: Scope) -> tuple:
+        """Run a GET request through the wrapped app.
+
+        Returns:
+            tuple: Status code, headers and body of the response.
+        """
+        status_code = 500
+        headers = Headers()
+        chunks = []
+
+        async def receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Message) -> None:
+            nonlocal status_code, headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = Headers(raw=message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status_code, headers, b"".join(chunks)
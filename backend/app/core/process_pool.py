@@ -0,0 +1,21 @@
+"""Worker process pool for CPU-heavy work off the event loop."""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def create_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Create a pool of worker processes.
+
+    Workers are spawned rather than forked, so they do not inherit the
+    event loop or the database threads of the API process.
+
+    Args:
+        max_workers: Number of worker processes.
+
+    Returns:
+        ProcessPoolExecutor: The pool; processes start on first use.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
@@ -0,0 +1,189 @@
+"""Quota-aware scheduling of upstream API calls."""
+import asyncio
+import time
+from datetime import datetime, timedelta, UTC
+from enum import Enum
+from typing import Any, Callable, Dict
+
+
+class Priority(str, Enum):
+    """Scheduling lane of an upstream call."""
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+class QuotaExceededError(Exception):
+    """Exception raised when a call would exceed the upstream budget."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        """Initialize the error.
+
+        Args:
+            message: Error message.
+            retry_after: Seconds after which a retry may succeed.
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _seconds_until_utc_midnight(now: float) -> float:
+    """Get the number of seconds until the next UTC midnight."""
+    current = datetime.fromtimestamp(now, UTC)
+    midnight = (current + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0,
+    )
+    return (midnight - current).total_seconds()
+
+
+class UpstreamScheduler:
+    """Token budget for upstream calls with two priority lanes.
+
+    Calls are limited by a per-second token bucket and a daily budget.
+    Background calls yield to waiting interactive calls and may not dip
+    into the share of the daily budget reserved for interactive calls.
+    A call that cannot be admitted within its lane's maximum wait fails
+    fast with QuotaExceededError instead of hanging.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float = 5.0,
+        burst: int = 10,
+        daily_budget: int = 1000,
+        interactive_reserve: float = 0.2,
+        interactive_max_wait: float = 1.0,
+        background_max_wait: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            rate_per_second: Sustained calls per second.
+            burst: Maximum calls admitted at once after idling.
+            daily_budget: Maximum calls per UTC day.
+            interactive_reserve: Fraction of the daily budget that only
+                interactive calls may use.
+            interactive_max_wait: Longest wait for an interactive call.
+            background_max_wait: Longest wait for a background call.
+            clock: Time source returning seconds since the epoch.
+        """
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.daily_budget = daily_budget
+        self.interactive_reserve = interactive_reserve
+        self.max_wait = {
+            Priority.INTERACTIVE: interactive_max_wait,
+            Priority.BACKGROUND: background_max_wait,
+        }
+        self._clock = clock
+        self._tokens = float(burst)
+        self._refilled_at = clock()
+        self._day = self._current_day()
+        self._used_today = 0
+        self._interactive_waiting = 0
+        self._rejected = {priority: 0 for priority in Priority}
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Wait until a call in the given lane may go upstream.
+
+        Args:
+            priority: Scheduling lane of the call.
+
+        Raises:
+            QuotaExceededError: If the call would exceed the budget.
+        """
+        deadline = self._clock() + self.max_wait[priority]
+        if priority is Priority.INTERACTIVE:
+            self._interactive_waiting += 1
+        try:
+            while True:
+                self._check_daily_budget(priority)
+                wait = self._try_take(priority)
+                if wait == 0:
+                    return
+                if self._clock() + wait > deadline:
+                    self._reject(priority, "Upstream rate limit reached",
+                                 wait)
+                await asyncio.sleep(wait)
+        finally:
+            if priority is Priority.INTERACTIVE:
+                self._interactive_waiting -= 1
+
+    def _try_take(self, priority: Priority) -> float:
+        """Take a token if allowed.
+
+        Returns:
+            float: 0 if a token was taken, else seconds to wait.
+        """
+        self._refill()
+        yields = (
+            priority is Priority.BACKGROUND and self._interactive_waiting
+        )
+        if self._tokens >= 1 and not yields:
+            self._tokens -= 1
+            self._used_today += 1
+            return 0
+        # Yielding background calls check back after one token interval
+        needed = 1 - self._tokens if self._tokens < 1 else 1
+        return needed / self.rate_per_second
+
+    @property
+    def background_budget(self) -> int:
+        """Calls per UTC day that background calls may use."""
+        return int(self.daily_budget * (1 - self.interactive_reserve))
+
+    def _refill(self) -> None:
+        """Add tokens earned since the last refill."""
+        now = self._clock()
+        earned = (now - self._refilled_at) * self.rate_per_second
+        self._tokens = min(self.burst, self._tokens + earned)
+        self._refilled_at = now
+
+    def _check_daily_budget(self, priority: Priority) -> None:
+        """Reject the call if the lane's share of the day is used up."""
+        day = self._current_day()
+        if day != self._day:
+            self._day = day
+            self._used_today = 0
+
+        limit = self.daily_budget
+        if priority is Priority.BACKGROUND:
+            limit = self.background_budget
+        if self._used_today >= limit:
+            self._reject(
+                priority,
+                "Daily upstream quota exhausted",
+                _seconds_until_utc_midnight(self._clock()),
+            )
+
+    def _reject(
+        self,
+        priority: Priority,
+        message: str,
+        retry_after: float,
+    ) -> None:
+        """Count and raise a rejection."""
+        self._rejected[priority] += 1
+        raise QuotaExceededError(message, retry_after)
+
+    def _current_day(self) -> str:
+        """Get the current UTC date."""
+        return datetime.fromtimestamp(self._clock(), UTC).date().isoformat()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the scheduler counters.
+
+        Returns:
+            Dict[str, Any]: Budget usage and rejections per lane.
+        """
+        self._refill()
+        return {
+            "daily_budget": self.daily_budget,
+            "used_today": self._used_today,
+            "tokens": round(self._tokens, 2),
+            "interactive_waiting": self._interactive_waiting,
+            "rejected": {
+                priority.value: count
+                for priority, count in self._rejected.items()
+            },
+        }
@@ -0,0 +1,59 @@
+"""Coalescing of identical concurrent calls."""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its result."""
+
+    def __init__(self) -> None:
+        """Initialize the single-flight group."""
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run func, or join the identical call already in flight.
+
+        The call runs in its own task, so a cancelled caller does not
+        cancel the call for the other callers waiting on it.
+
+        Args:
+            key: Key identifying identical calls.
+            func: Coroutine function performing the call.
+
+        Returns:
+            T: The result shared by every caller.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(
+                lambda done: self._forget(key, done)
+            )
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Remove a finished call and mark its exception as retrieved."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the single-flight counters.
+
+        Returns:
+            Dict[str, int]: Calls made, calls collapsed and calls in flight.
+        """
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._in_flight),
+        }
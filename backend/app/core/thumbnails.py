@@ -0,0 +1,37 @@
+"""Signed URLs of proxied article image thumbnails."""
+import hashlib
+import hmac
+from urllib.parse import urlencode
+
+from app.core.config import settings
+
+
+def image_digest(url: str, key: str = "") -> str:
+    """Compute the signed digest identifying an image URL.
+
+    Only URLs signed by the server can be proxied, so the image proxy
+    cannot be used to fetch arbitrary URLs.
+
+    Args:
+        url: Remote image URL.
+        key: Signing key, defaults to the application secret key.
+
+    Returns:
+        str: Hex digest of the URL.
+    """
+    return hmac.new(
+        (key or settings.SECRET_KEY).encode(), url.encode(), hashlib.sha256,
+    ).hexdigest()[:32]
+
+
+def thumbnail_path(url: str) -> str:
+    """Get the API path serving the thumbnail of an image.
+
+    Args:
+        url: Remote image URL.
+
+    Returns:
+        str: Path of the thumbnail, relative to the API host.
+    """
+    query = urlencode({"url": url})
+    return f"{settings.API_V1_STR}/images/{image_digest(url)}?{query}"
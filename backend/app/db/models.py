@@ -2,12 +2,14 @@
 from datetime import datetime, UTC
 
 from sqlalchemy import (
+    DDL,
     Column,
     DateTime,
     ForeignKey,
     Integer,
     String,
     Text,
+    event,
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.decl_api import declarative_base
@@ -55,3 +57,109 @@ class Bookmark(Base):
 
     # Relationships
     user = relationship("User", back_populates="bookmarks")
+
+
+class Article(Base):
+    """Article model for storing normalized news articles."""
+    __tablename__ = "articles"
+
+    # Stable hash of the article URL
+    id = Column(String(64), primary_key=True)
+    url = Column(Text, nullable=False)
+    title = Column(Text, nullable=False)
+    description = Column(Text, nullable=True)
+    source = Column(String(255), nullable=False)
+    author = Column(String(255), nullable=True)
+    category = Column(String(64), index=True, nullable=True)
+    language = Column(String(8), index=True, nullable=True)
+    image_url = Column(Text, nullable=True)
+    published_at = Column(DateTime, index=True, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    # Readable text of the article page, filled in by the enricher
+    body = Column(Text, nullable=True)
+    # When extraction was attempted, whether or not it found a body
+    extracted_at = Column(DateTime, index=True, nullable=True)
+
+
+class IngestionWatermark(Base):
+    """Newest article ingested from one upstream feed."""
+    __tablename__ = "ingestion_watermarks"
+
+    # Source, category, query, country and language of the feed
+    key = Column(String(512), primary_key=True)
+    published_at = Column(DateTime, nullable=False)
+    # JSON list of the URLs published at exactly published_at
+    urls = Column(Text, nullable=False, default="[]")
+    # JSON of the backlog still to ingest below published_at, if paging
+    # was cut off before reaching it
+    backlog = Column(Text, nullable=True)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC))
+
+
+# Full-text index over stored articles (SQLite FTS5, external content
+# table kept in sync by triggers). Rebuild it with
+# INSERT INTO articles_fts(articles_fts) VALUES ('rebuild') if rowids of
+# the articles table ever change, e.g. after a VACUUM.
+ARTICLES_FTS_CREATE = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title,
+        description,
+        body,
+        content='articles',
+        content_rowid='rowid',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_insert
+    AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, description, body)
+        VALUES (new.rowid, new.title, new.description, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_delete
+    AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(
+            articles_fts, rowid, title, description, body
+        )
+        VALUES ('delete', old.rowid, old.title, old.description, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_update
+    AFTER UPDATE ON articles BEGIN
+        INSERT INTO articles_fts(
+            articles_fts, rowid, title, description, body
+        )
+        VALUES ('delete', old.rowid, old.title, old.description, old.body);
+        INSERT INTO articles_fts(rowid, title, description, body)
+        VALUES (new.rowid, new.title, new.description, new.body);
+    END
+    """,
+)
+
+ARTICLES_FTS_DROP = (
+    "DROP TRIGGER IF EXISTS articles_fts_insert",
+    "DROP TRIGGER IF EXISTS articles_fts_delete",
+    "DROP TRIGGER IF EXISTS articles_fts_update",
+    "DROP TABLE IF EXISTS articles_fts",
+)
+
+for statement in ARTICLES_FTS_CREATE:
+    event.listen(
+        Article.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+
+for statement in ARTICLES_FTS_DROP:
+    event.listen(
+        Article.__table__,
+        "before_drop",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
@@ -5,9 +5,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
-from app.core.middleware import RateLimitMiddleware, CacheMiddleware
+from app.api.v1.endpoints.news import prefetch_cached_next_page
+from app.core.middleware import (
+    CacheKeySpec,
+    CacheMiddleware,
+    RateLimitMiddleware,
+    StaleWhileRevalidate,
+)
 from app.core.rate_limiter import RateLimiter
 from app.core.cache import Cache
+from app.core.cache_backends import create_cache_backend
+from app.services.auth import authenticate_request
+from app.services.registry import ServiceRegistry
 
 
 def create_application() -> FastAPI:
@@ -16,12 +25,27 @@ def create_application() -> FastAPI:
     Returns:
         FastAPI: Configured FastAPI application.
     """
+    cache = Cache(
+        max_size=settings.CACHE_MAX_SIZE,
+        ttl=settings.CACHE_TTL,
+        backend=create_cache_backend(
+            settings.CACHE_BACKEND,
+            max_size=settings.CACHE_MAX_SIZE,
+            sqlite_path=settings.CACHE_SQLITE_PATH,
+            redis_url=settings.CACHE_REDIS_URL,
+            timeout=settings.CACHE_BACKEND_TIMEOUT,
+        ),
+    )
+    # Upstream clients and services live for the whole process
+    registry = ServiceRegistry(cache=cache)
+
     app = FastAPI(
         title=settings.PROJECT_NAME,
         version=settings.VERSION,
         description=settings.DESCRIPTION,
         docs_url="/docs",
         redoc_url="/redoc",
+        lifespan=registry.lifespan,
     )
 
     # Set up CORS middleware
@@ -40,12 +64,45 @@ def create_application() -> FastAPI:
     )
     app.add_middleware(RateLimitMiddleware, rate_limiter=rate_limiter)
 
-    # Set up caching
-    cache = Cache(
-        max_size=settings.CACHE_MAX_SIZE,
-        ttl=settings.CACHE_TTL,
+    # Set up caching, with stale-while-revalidate on the news routes
+    news_prefix = f"{settings.API_V1_STR}/news"
+    policies = {
+        f"{news_prefix}/search": StaleWhileRevalidate(
+            soft_ttl=settings.NEWS_SEARCH_CACHE_SOFT_TTL,
+            hard_ttl=settings.NEWS_SEARCH_CACHE_HARD_TTL,
+        ),
+        f"{news_prefix}/headlines": StaleWhileRevalidate(
+            soft_ttl=settings.NEWS_HEADLINES_CACHE_SOFT_TTL,
+            hard_ttl=settings.NEWS_HEADLINES_CACHE_HARD_TTL,
+        ),
+    }
+    # Equivalent queries share one cache entry
+    key_specs = {
+        f"{news_prefix}/search": CacheKeySpec(
+            defaults={"language": "en", "page_size": "10", "page": "1"},
+            text_params=("query",),
+        ),
+        f"{news_prefix}/headlines": CacheKeySpec(
+            defaults={"country": "us", "page_size": "10"},
+        ),
+        f"{news_prefix}/headlines/batch": CacheKeySpec(
+            defaults={"countries": "us", "page_size": "10"},
+        ),
+        f"{news_prefix}/trending": CacheKeySpec(
+            defaults={"window": "1h", "limit": "10"},
+        ),
+    }
+    # Only these public routes are cached, and hits are served to
+    # authenticated users only
+    app.add_middleware(
+        CacheMiddleware,
+        cache=cache,
+        policies=policies,
+        key_specs=key_specs,
+        authorize=authenticate_request,
+        authorize_ttl=settings.CACHE_AUTHORIZE_TTL,
+        hit_hooks={f"{news_prefix}/search": prefetch_cached_next_page},
     )
-    app.add_middleware(CacheMiddleware, cache=cache)
 
     # Include API router
     app.include_router(api_router, prefix="")
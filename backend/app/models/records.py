@@ -0,0 +1,179 @@
+"""Compact in-memory representation of articles.
+
+Snapshots of articles held in memory for long, such as prefetched
+headlines, keep ArticleRecord objects instead of NewsArticle models: a
+record has no per-instance __dict__ or pydantic bookkeeping, shares one
+copy of the strings that repeat across articles (source, category and
+author) and stores its publication time as an integer. Records are
+converted back to NewsArticle only when they are served.
+"""
+import sys
+from datetime import UTC, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.models.schemas import ARTICLE_LIST_ADAPTER, NewsArticle
+
+# Stands for a missing publication time
+NO_TIMESTAMP = -1
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a repeated string, keeping None as is."""
+    return sys.intern(value) if value is not None else None
+
+
+def to_timestamp(value: Optional[datetime]) -> int:
+    """Convert a publication time to whole seconds since the epoch.
+
+    Naive datetimes are read as UTC.
+
+    Args:
+        value: Publication time, if known.
+
+    Returns:
+        int: Seconds since the epoch, or NO_TIMESTAMP.
+    """
+    if value is None:
+        return NO_TIMESTAMP
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=UTC)
+    return int(value.timestamp())
+
+
+class ArticleRecord:
+    """Slotted, read-only-by-convention copy of a NewsArticle."""
+
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "url",
+        "source",
+        "published_at",
+        "category",
+        "author",
+        "image_url",
+        "alternate_source_count",
+    )
+
+    def __init__(
+        self,
+        id: Optional[str],
+        title: str,
+        description: Optional[str],
+        url: str,
+        source: str,
+        published_at: int,
+        category: Optional[str],
+        author: Optional[str],
+        image_url: Optional[str],
+        alternate_source_count: int = 0,
+    ) -> None:
+        """Initialize the record.
+
+        Args:
+            id: Article identifier.
+            title: Article title.
+            description: Article description.
+            url: Article URL.
+            source: Source name, interned.
+            published_at: Seconds since the epoch, or NO_TIMESTAMP.
+            category: Category, interned.
+            author: Author, interned.
+            image_url: Image URL.
+            alternate_source_count: Number of other outlets of the story.
+        """
+        self.id = id
+        self.title = title
+        self.description = description
+        self.url = url
+        self.source = _intern(source)
+        self.published_at = published_at
+        self.category = _intern(category)
+        self.author = _intern(author)
+        self.image_url = image_url
+        self.alternate_source_count = alternate_source_count
+
+    @classmethod
+    def from_article(cls, article: NewsArticle) -> "ArticleRecord":
+        """Build the record of an article.
+
+        Args:
+            article: Article to copy.
+
+        Returns:
+            ArticleRecord: The record.
+        """
+        return cls(
+            article.id,
+            article.title,
+            article.description,
+            article.url,
+            article.source,
+            to_timestamp(article.published_at),
+            article.category,
+            article.author,
+            article.image_url,
+            article.alternate_source_count,
+        )
+
+    def fields(self) -> Dict[str, Any]:
+        """Get the NewsArticle fields of the record.
+
+        Publication times come back as UTC datetimes, to the second.
+
+        Returns:
+            Dict[str, Any]: Field values keyed by name.
+        """
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "url": self.url,
+            "source": self.source,
+            "published_at": (
+                datetime.fromtimestamp(self.published_at, UTC)
+                if self.published_at != NO_TIMESTAMP else None
+            ),
+            "category": self.category,
+            "author": self.author,
+            "image_url": self.image_url,
+            "alternate_source_count": self.alternate_source_count,
+        }
+
+    def to_article(self) -> NewsArticle:
+        """Convert the record back to a NewsArticle.
+
+        Returns:
+            NewsArticle: The article.
+        """
+        return NewsArticle(**self.fields())
+
+
+def to_records(articles: Iterable[NewsArticle]) -> List[ArticleRecord]:
+    """Build the records of articles.
+
+    Args:
+        articles: Articles to copy.
+
+    Returns:
+        List[ArticleRecord]: Records, in order.
+    """
+    return [ArticleRecord.from_article(article) for article in articles]
+
+
+def to_articles(records: Iterable[ArticleRecord]) -> List[NewsArticle]:
+    """Convert records back to articles, at the API boundary.
+
+    The articles are validated in one batch, which is faster than
+    building them one at a time.
+
+    Args:
+        records: Records to convert.
+
+    Returns:
+        List[NewsArticle]: Articles, in order.
+    """
+    return ARTICLE_LIST_ADAPTER.validate_python(
+        [record.fields() for record in records]
+    )
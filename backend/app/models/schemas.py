@@ -1,8 +1,21 @@
 """Pydantic models for request/response validation."""
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    TypeAdapter,
+    computed_field,
+    field_validator,
+)
+
+from app.core.thumbnails import thumbnail_path
+
+# Boolean operators of the upstream query syntax, which are case sensitive
+SEARCH_OPERATORS = frozenset({"AND", "OR", "NOT"})
 
 
 class UserBase(BaseModel):
@@ -61,9 +74,78 @@ class NewsArticle(BaseModel):
     category: Optional[str] = None
     author: Optional[str] = None
     image_url: Optional[str] = None
+    # Number of other outlets the same story was seen from
+    alternate_source_count: int = 0
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        """Path of the proxied thumbnail of the image, if any."""
+        if not self.image_url:
+            return None
+        return thumbnail_path(self.image_url)
+
+
+class ArticleContent(NewsArticle):
+    """News article with its extracted body text, for the reader view."""
+    body: Optional[str] = None
+
+
+# Validates and serializes whole article lists in a single call
+ARTICLE_LIST_ADAPTER = TypeAdapter(List[NewsArticle])
+
+
+class HeadlinesBatchError(BaseModel):
+    """Failure of one combination of a headlines batch."""
+    status_code: int
+    detail: str
+    retry_after: Optional[int] = None
+
+
+class HeadlinesBatch(BaseModel):
+    """Headlines of several categories and countries.
+
+    Both mappings are keyed by "country:category".
+    """
+    results: Dict[str, List[NewsArticle]] = {}
+    errors: Dict[str, HeadlinesBatchError] = {}
+
+
+def normalize_search_text(text: Optional[str]) -> Optional[str]:
+    """Normalize search text so that equivalent queries compare equal.
+
+    Whitespace is collapsed and words are lowercased, except the upstream
+    boolean operators. Upstream search is case insensitive, so the
+    normalized query matches the same articles.
+
+    Args:
+        text: Search text.
+
+    Returns:
+        Optional[str]: Normalized text, or None if the text is blank.
+    """
+    words = [
+        word if word in SEARCH_OPERATORS else word.lower()
+        for word in (text or "").split()
+    ]
+    return " ".join(words) or None
+
+
+class TrendingTerm(BaseModel):
+    """Term or entity with its estimated number of articles."""
+    term: str
+    count: int
+
+
+class TrendingTopics(BaseModel):
+    """Most frequent terms and entities of recent articles."""
+    window: str
+    generated_at: datetime
+    terms: List[TrendingTerm] = []
+    entities: List[TrendingTerm] = []
+
 
 class NewsSearchParams(BaseModel):
     """News search parameters model."""
@@ -72,3 +154,12 @@ class NewsSearchParams(BaseModel):
     language: str = "en"
     page_size: int = Field(default=10, ge=1, le=100)
     page: int = Field(default=1, ge=1)
+    # Whether NewsAPI searches are answered from the local index; decided
+    # on the first page and carried by the cursor to the next ones
+    local: Optional[bool] = None
+
+    @field_validator("query")
+    @classmethod
+    def _normalize_query(cls, query: Optional[str]) -> Optional[str]:
+        """Normalize the search text."""
+        return normalize_search_text(query)
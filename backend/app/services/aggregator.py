@@ -0,0 +1,243 @@
+"""Concurrent aggregation of news from several sources."""
+import asyncio
+import logging
+from collections import Counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from app.core.quota import Priority
+from app.models.schemas import NewsArticle, NewsSearchParams
+from app.services.article_store import article_id_for_url
+from app.services.dedup import NearDuplicateIndex
+from app.services.news import NewsServiceError
+from app.services.sources.base import NewsSource, recency_key
+
+logger = logging.getLogger(__name__)
+
+SourceCall = Callable[[NewsSource], Awaitable[List[NewsArticle]]]
+
+
+class ArticlePage(NamedTuple):
+    """A page of merged articles.
+
+    has_next is decided from what the sources returned, before merging
+    and collapsing: a page any source filled is not the last one, even
+    if near duplicates left fewer articles to show.
+    """
+    articles: List[NewsArticle]
+    has_next: bool
+
+
+def merge_articles(
+    batches: Sequence[List[NewsArticle]],
+) -> List[NewsArticle]:
+    """Merge article lists from several sources.
+
+    Articles are deduplicated by URL hash, keeping the copy from the
+    earliest batch. A single batch keeps its own order; several batches
+    are interleaved newest first.
+
+    Args:
+        batches: Article lists, in source priority order.
+
+    Returns:
+        List[NewsArticle]: Merged articles.
+    """
+    seen = set()
+    merged = []
+    for batch in batches:
+        for article in batch:
+            article_id = article.id or article_id_for_url(article.url)
+            if article_id not in seen:
+                seen.add(article_id)
+                merged.append(article)
+    if len(batches) > 1:
+        merged.sort(key=recency_key, reverse=True)
+    return merged
+
+
+class NewsAggregator:
+    """Fans requests out to every source and merges what comes back.
+
+    Each source has its own deadline, and the whole fan-out is bounded
+    by a latency budget: a slow or failing source only costs its own
+    results. Errors are raised only when no source answered. Near
+    duplicates, such as one wire story carried by several outlets, are
+    collapsed into their best ranked copy.
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[NewsSource],
+        budget: float = 5.0,
+        dedup: Optional[NearDuplicateIndex] = None,
+    ) -> None:
+        """Initialize the aggregator.
+
+        Args:
+            sources: Sources in priority order; earlier sources win
+                when the same article comes from several of them.
+            budget: Seconds the whole fan-out may take.
+            dedup: Optional index collapsing near-duplicate articles.
+        """
+        self.sources = list(sources)
+        self.budget = budget
+        self.dedup = dedup
+        self._outcomes: Dict[str, Counter] = {
+            source.name: Counter() for source in self.sources
+        }
+
+    async def search_articles(
+        self,
+        params: NewsSearchParams,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        """Search every source.
+
+        Args:
+            params: Search parameters.
+            priority: Scheduling lane of the request.
+
+        Returns:
+            List[NewsArticle]: At most page_size merged articles.
+        """
+        return (await self.search_page(params, priority)).articles
+
+    async def search_page(
+        self,
+        params: NewsSearchParams,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> ArticlePage:
+        """Search every source for one page of results.
+
+        Args:
+            params: Search parameters.
+            priority: Scheduling lane of the request.
+
+        Returns:
+            ArticlePage: At most page_size merged articles, and whether
+            a next page may exist.
+        """
+        return await self._fan_out(
+            lambda source: source.search_articles(params, priority),
+            params.page_size,
+        )
+
+    async def get_top_headlines(
+        self,
+        category: Optional[str] = None,
+        country: str = "us",
+        page_size: int = 10,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        """Get top headlines from every source.
+
+        Args:
+            category: News category.
+            country: Country code.
+            page_size: Number of articles to return.
+            priority: Scheduling lane of the request.
+
+        Returns:
+            List[NewsArticle]: At most page_size merged headlines.
+        """
+        page = await self._fan_out(
+            lambda source: source.get_top_headlines(
+                category=category,
+                country=country,
+                page_size=page_size,
+                priority=priority,
+            ),
+            page_size,
+        )
+        return page.articles
+
+    async def _fan_out(
+        self,
+        call: SourceCall,
+        limit: int,
+    ) -> ArticlePage:
+        """Call every source concurrently and merge the answers.
+
+        Raises:
+            NewsServiceError: If no source answered, the first error.
+        """
+        tasks = {
+            asyncio.create_task(self._ask(source, call)): source
+            for source in self.sources
+        }
+        done, pending = await asyncio.wait(tasks, timeout=self.budget)
+        for task in pending:
+            task.cancel()
+
+        batches = []
+        errors = []
+        for task, source in tasks.items():
+            outcome, result = self._outcome(task, done)
+            self._outcomes[source.name][outcome] += 1
+            if outcome == "ok":
+                batches.append(result)
+            elif result is not None:
+                errors.append(result)
+        if not batches:
+            if errors:
+                raise errors[0]
+            raise NewsServiceError("No news source answered in time")
+        articles = merge_articles(batches)
+        if self.dedup is not None:
+            articles = self.dedup.collapse(articles)
+        return ArticlePage(
+            articles[:limit],
+            any(len(batch) >= limit for batch in batches),
+        )
+
+    async def _ask(
+        self,
+        source: NewsSource,
+        call: SourceCall,
+    ) -> List[NewsArticle]:
+        """Call one source within its own deadline."""
+        return await asyncio.wait_for(call(source), source.timeout)
+
+    def _outcome(self, task: asyncio.Task, done: set) -> tuple:
+        """Classify a finished or abandoned source call.
+
+        Returns:
+            tuple: Outcome name and the articles or error, if any.
+        """
+        if task not in done:
+            return "timed_out", None
+        error = task.exception()
+        if isinstance(error, asyncio.TimeoutError):
+            return "timed_out", None
+        if error is not None:
+            logger.warning("News source failed: %s", error)
+            return "failed", error
+        return "ok", task.result()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get how often each source answered, failed or timed out.
+
+        Returns:
+            Dict[str, Any]: Outcome counts keyed by source name.
+        """
+        return {
+            name: {
+                outcome: counts[outcome]
+                for outcome in ("ok", "failed", "timed_out")
+            }
+            for name, counts in self._outcomes.items()
+        }
+
+    async def close(self) -> None:
+        """Close every source."""
+        for source in self.sources:
+            await source.close()
@@ -0,0 +1,363 @@
+"""Persistent local store of normalized news articles."""
+import asyncio
+import hashlib
+import logging
+from datetime import UTC, datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+)
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Article
+from app.db.session import async_session_factory
+from app.models.schemas import ArticleContent, NewsArticle
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement, kept well below SQLite's variable limit
+INGEST_BATCH_SIZE = 500
+
+
+def article_id_for_url(url: str) -> str:
+    """Compute the stable article identifier for a URL.
+
+    The scheme and host are lowercased and the fragment dropped, so the
+    same article linked slightly differently maps to the same id.
+
+    Args:
+        url: Article URL.
+
+    Returns:
+        str: Hex digest identifying the article.
+    """
+    parts = urlsplit(url.strip())
+    normalized = urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path,
+        parts.query,
+        "",
+    ))
+    return hashlib.sha256(normalized.encode()).hexdigest()[:32]
+
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert a datetime to naive UTC for storage."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def article_to_row(
+    article: NewsArticle,
+    language: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Convert a NewsArticle into an articles table row.
+
+    Args:
+        article: Article to convert.
+        language: Language of the article, if known.
+
+    Returns:
+        Dict[str, Any]: Column values.
+    """
+    return {
+        "id": article.id or article_id_for_url(article.url),
+        "url": article.url,
+        "title": article.title,
+        "description": article.description,
+        "source": article.source,
+        "author": article.author,
+        "category": article.category,
+        "language": language,
+        "image_url": article.image_url,
+        "published_at": _to_naive_utc(article.published_at),
+    }
+
+
+def row_to_article(row: Article) -> NewsArticle:
+    """Convert a stored Article row into a NewsArticle.
+
+    Args:
+        row: Stored article.
+
+    Returns:
+        NewsArticle: The article model.
+    """
+    published_at = row.published_at
+    if published_at is not None and published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=UTC)
+    return NewsArticle(
+        id=row.id,
+        title=row.title,
+        description=row.description,
+        url=row.url,
+        source=row.source,
+        published_at=published_at,
+        category=row.category,
+        author=row.author,
+        image_url=row.image_url,
+    )
+
+
+class ArticleStore:
+    """Store that keeps each article once, keyed by its URL hash."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = async_session_factory,
+        batch_size: int = INGEST_BATCH_SIZE,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            session_factory: Factory creating database sessions.
+            batch_size: Maximum rows per INSERT statement.
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self._pending: Set[asyncio.Task] = set()
+        self._listeners: List[Callable[[List[NewsArticle]], None]] = []
+
+    def add_listener(
+        self,
+        listener: Callable[[List[NewsArticle]], None],
+    ) -> None:
+        """Register a callback receiving every batch of new articles.
+
+        Args:
+            listener: Called with the articles each ingestion stored.
+        """
+        self._listeners.append(listener)
+
+    async def ingest(
+        self,
+        articles: Iterable[NewsArticle],
+        language: Optional[str] = None,
+    ) -> List[NewsArticle]:
+        """Store articles that are not stored yet.
+
+        Args:
+            articles: Articles to store.
+            language: Language of the articles, if known.
+
+        Returns:
+            List[NewsArticle]: The articles that were newly stored.
+        """
+        rows = {}
+        for article in articles:
+            row = article_to_row(article, language)
+            rows.setdefault(row["id"], (row, article))
+        if not rows:
+            return []
+
+        async with self.session_factory() as session:
+            # Skips most known rows; concurrent ingests are settled by
+            # the ids the insert itself returns
+            known = await self._existing_ids(session, list(rows))
+            new_rows = [
+                row for article_id, (row, _) in rows.items()
+                if article_id not in known
+            ]
+            inserted: Set[str] = set()
+            for start in range(0, len(new_rows), self.batch_size):
+                statement = sqlite_insert(Article).on_conflict_do_nothing(
+                    index_elements=["id"],
+                ).returning(Article.id)
+                result = await session.execute(
+                    statement,
+                    new_rows[start:start + self.batch_size],
+                )
+                inserted.update(result.scalars())
+            await session.commit()
+
+        stored = [
+            article for article_id, (_, article) in rows.items()
+            if article_id in inserted
+        ]
+        self._notify(stored)
+        return stored
+
+    def _notify(self, articles: List[NewsArticle]) -> None:
+        """Pass newly stored articles to every listener."""
+        if not articles:
+            return
+        for listener in self._listeners:
+            try:
+                listener(articles)
+            except Exception as e:
+                logger.warning("Article listener failed: %s", e)
+
+    async def _existing_ids(
+        self,
+        session: AsyncSession,
+        article_ids: List[str],
+    ) -> Set[str]:
+        """Get which of the given ids are already stored."""
+        known: Set[str] = set()
+        for start in range(0, len(article_ids), self.batch_size):
+            chunk = article_ids[start:start + self.batch_size]
+            result = await session.execute(
+                select(Article.id).where(Article.id.in_(chunk))
+            )
+            known.update(result.scalars())
+        return known
+
+    async def get(self, article_id: str) -> Optional[NewsArticle]:
+        """Get a stored article by id.
+
+        Args:
+            article_id: Article identifier.
+
+        Returns:
+            Optional[NewsArticle]: The article, or None if not stored.
+        """
+        async with self.session_factory() as session:
+            row = await session.get(Article, article_id)
+            return row_to_article(row) if row else None
+
+    async def get_many(self, article_ids: List[str]) -> List[NewsArticle]:
+        """Get stored articles by id.
+
+        Args:
+            article_ids: Article identifiers.
+
+        Returns:
+            List[NewsArticle]: The stored articles, in the given order.
+        """
+        rows = {}
+        async with self.session_factory() as session:
+            for start in range(0, len(article_ids), self.batch_size):
+                chunk = article_ids[start:start + self.batch_size]
+                result = await session.execute(
+                    select(Article).where(Article.id.in_(chunk))
+                )
+                rows.update((row.id, row) for row in result.scalars())
+        return [
+            row_to_article(rows[article_id]) for article_id in article_ids
+            if article_id in rows
+        ]
+
+    async def get_content(self, article_id: str) -> Optional[ArticleContent]:
+        """Get a stored article with its extracted body text.
+
+        Args:
+            article_id: Article identifier.
+
+        Returns:
+            Optional[ArticleContent]: The article, or None if not stored.
+        """
+        async with self.session_factory() as session:
+            row = await session.get(Article, article_id)
+            if row is None:
+                return None
+            return ArticleContent(
+                **row_to_article(row).model_dump(), body=row.body,
+            )
+
+    async def pending_extraction(self, limit: int) -> List[NewsArticle]:
+        """Get the newest articles whose text was never extracted.
+
+        Args:
+            limit: Maximum number of articles to return.
+
+        Returns:
+            List[NewsArticle]: Articles, most recently stored first.
+        """
+        statement = (
+            select(Article)
+            .where(Article.extracted_at.is_(None))
+            .order_by(Article.created_at.desc())
+            .limit(limit)
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(statement)
+            return [row_to_article(row) for row in result.scalars()]
+
+    async def save_bodies(self, bodies: Mapping[str, Optional[str]]) -> None:
+        """Store extracted body texts and mark the articles as attempted.
+
+        Args:
+            bodies: Body text per article id, None where none was found.
+        """
+        if not bodies:
+            return
+        extracted_at = _to_naive_utc(datetime.now(UTC))
+        rows = [
+            {"id": article_id, "body": body, "extracted_at": extracted_at}
+            for article_id, body in bodies.items()
+        ]
+        async with self.session_factory() as session:
+            for start in range(0, len(rows), self.batch_size):
+                await session.execute(
+                    update(Article), rows[start:start + self.batch_size],
+                )
+            await session.commit()
+
+    async def recent(
+        self,
+        category: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[NewsArticle]:
+        """Get the most recently published stored articles.
+
+        Args:
+            category: Only return articles of this category, if given.
+            limit: Maximum number of articles to return.
+
+        Returns:
+            List[NewsArticle]: Articles, newest first.
+        """
+        statement = select(Article)
+        if category is not None:
+            statement = statement.where(Article.category == category)
+        statement = statement.order_by(
+            Article.published_at.desc().nulls_last(),
+            Article.created_at.desc(),
+        ).limit(limit)
+        async with self.session_factory() as session:
+            result = await session.execute(statement)
+            return [row_to_article(row) for row in result.scalars()]
+
+    def submit(
+        self,
+        articles: List[NewsArticle],
+        language: Optional[str] = None,
+    ) -> None:
+        """Ingest articles in the background.
+
+        Args:
+            articles: Articles to store.
+            language: Language of the articles, if known.
+        """
+        task = asyncio.create_task(self._ingest_quietly(articles, language))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _ingest_quietly(
+        self,
+        articles: List[NewsArticle],
+        language: Optional[str],
+    ) -> None:
+        """Ingest articles, logging instead of raising on failure."""
+        try:
+            await self.ingest(articles, language)
+        except Exception as e:
+            logger.warning("Article ingestion failed: %s", e)
+
+    async def drain(self) -> None:
+        """Wait for every background ingestion to finish."""
+        if self._pending:
+            await asyncio.gather(*self._pending)
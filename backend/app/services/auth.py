@@ -2,16 +2,17 @@
 
 import firebase_admin
 from firebase_admin import auth
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 
 from app.core.config import settings
 from app.db.models import User
-from app.db.session import get_session
+from app.db.session import async_session_factory, get_session
 from app.core.error import handle_auth_error
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
 from app.core.firebase import initialize_firebase
 
 security = HTTPBearer()
@@ -84,3 +85,28 @@ async def get_current_user(
     """Get the current authenticated user."""
     auth_service = AuthService(session)
     return await auth_service.get_current_user(credentials)
+
+
+async def authenticate_request(
+    request: Request,
+    session_factory: sessionmaker = async_session_factory,
+) -> bool:
+    """Check that a request carries the credentials of a known user.
+
+    Cached responses are served without running route dependencies, so
+    the cache middleware runs this check before serving one.
+
+    Args:
+        request: Incoming request.
+        session_factory: Factory creating database sessions.
+
+    Returns:
+        bool: True if the request is authenticated.
+    """
+    try:
+        credentials = await security(request)
+        async with session_factory() as session:
+            await AuthService(session).get_current_user(credentials)
+    except HTTPException:
+        return False
+    return True
@@ -0,0 +1,248 @@
+"""Near-duplicate detection of articles with MinHash LSH.
+
+Every article is reduced to the word shingles of its title and
+description, and summarized by a MinHash signature whose agreement
+estimates the Jaccard similarity of two shingle sets. Signatures are
+split into bands: near-duplicates very likely agree on a whole band, so
+candidates are found through one dict lookup per band instead of a scan
+over every indexed article, then confirmed on the full signature.
+"""
+import re
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from app.models.schemas import NewsArticle
+from app.services.article_store import article_id_for_url
+
+_HASH_SPACE = 1 << 32
+_WORD = re.compile(r"\w+")
+
+Signature = Tuple[int, ...]
+
+
+def shingles(text: str, size: int = 2) -> Set[str]:
+    """Get the word shingles of a text.
+
+    Args:
+        text: Text to split.
+        size: Number of words per shingle.
+
+    Returns:
+        Set[str]: Lowercased shingles, or the whole text when shorter.
+    """
+    words = _WORD.findall(text.casefold())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i:i + size])
+        for i in range(len(words) - size + 1)
+    }
+
+
+def minhash(tokens: Set[str], size: int) -> Signature:
+    """Compute a one-permutation MinHash signature of a set of tokens.
+
+    Each token is hashed once and falls into one of size bins; each bin
+    keeps its smallest value. Empty bins borrow the value of the next
+    non-empty bin, so that every bin agrees between two sets with
+    probability close to their Jaccard similarity.
+
+    Args:
+        tokens: Non-empty set of tokens.
+        size: Number of signature values.
+
+    Returns:
+        Signature: Minimum hash per bin.
+    """
+    bins: List[Optional[int]] = [None] * size
+    for token in tokens:
+        value = zlib.crc32(token.encode())
+        index, rank = divmod(value, _HASH_SPACE // size)
+        index %= size
+        if bins[index] is None or rank < bins[index]:
+            bins[index] = rank
+    # Walk twice backwards so that empty bins near the end wrap around
+    signature = list(bins)
+    donor_rank, distance = 0, 0
+    for i in reversed(range(2 * size)):
+        rank = bins[i % size]
+        if rank is not None:
+            donor_rank, distance = rank, 0
+            continue
+        distance += 1
+        if i < size:
+            signature[i] = donor_rank + distance * _HASH_SPACE
+    return tuple(signature)
+
+
+def article_text(article: NewsArticle) -> str:
+    """Get the text an article is compared on."""
+    return f"{article.title} {article.description or ''}"
+
+
+class NearDuplicateIndex:
+    """In-memory LSH index clustering near-duplicate articles.
+
+    With the default 20 bands of 3 rows, pairs of articles sharing half
+    of their shingles are found with about 93% probability. The index is
+    bounded: beyond max_size articles, the oldest are forgotten first.
+    A cluster, with the sources it was seen from, lives as long as one of
+    its members is indexed.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        bands: int = 20,
+        rows: int = 3,
+        max_size: int = 50_000,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            threshold: Smallest estimated Jaccard similarity of two
+                near-duplicates.
+            bands: Number of LSH bands.
+            rows: Signature values per band.
+            max_size: Maximum number of indexed articles.
+        """
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.max_size = max_size
+        self._buckets: List[Dict[Signature, List[str]]] = [
+            {} for _ in range(bands)
+        ]
+        self._signatures: Dict[str, Signature] = {}
+        self._cluster_of: Dict[str, str] = {}
+        self._sources: Dict[str, Set[str]] = {}
+        self._members: Dict[str, int] = {}
+        self._order: Deque[str] = deque()
+        self._collapsed = 0
+
+    def add(self, article: NewsArticle) -> str:
+        """Index an article.
+
+        Args:
+            article: Article to index.
+
+        Returns:
+            str: Id of the cluster the article belongs to.
+        """
+        article_id = article.id or article_id_for_url(article.url)
+        cluster_id = self._cluster_of.get(article_id)
+        if cluster_id is None:
+            tokens = shingles(article_text(article))
+            if not tokens:
+                return article_id
+            signature = minhash(tokens, self.bands * self.rows)
+            keys = self._band_keys(signature)
+            match = self._nearest(signature, keys)
+            cluster_id = self._cluster_of[match] if match else article_id
+            self._insert(article_id, signature, keys, cluster_id)
+        self._sources.setdefault(cluster_id, set()).add(article.source)
+        return cluster_id
+
+    def collapse(self, articles: List[NewsArticle]) -> List[NewsArticle]:
+        """Index articles and keep the first of each cluster.
+
+        Kept articles are annotated with the number of other sources
+        their story was seen from.
+
+        Args:
+            articles: Articles in ranking order.
+
+        Returns:
+            List[NewsArticle]: One article per cluster.
+        """
+        clusters = [self.add(article) for article in articles]
+        kept = []
+        seen: Set[str] = set()
+        for article, cluster_id in zip(articles, clusters):
+            if cluster_id in seen:
+                self._collapsed += 1
+                continue
+            seen.add(cluster_id)
+            sources = self._sources.get(cluster_id, ())
+            alternates = max(len(sources) - 1, 0)
+            if alternates != article.alternate_source_count:
+                article = article.model_copy(
+                    update={"alternate_source_count": alternates}
+                )
+            kept.append(article)
+        return kept
+
+    def _band_keys(self, signature: Signature) -> List[Signature]:
+        """Split a signature into its bands."""
+        return [
+            signature[band * self.rows:(band + 1) * self.rows]
+            for band in range(self.bands)
+        ]
+
+    def _similarity(self, first: Signature, second: Signature) -> float:
+        """Estimate the Jaccard similarity of two signatures."""
+        agreeing = sum(x == y for x, y in zip(first, second))
+        return agreeing / len(first)
+
+    def _nearest(
+        self,
+        signature: Signature,
+        keys: List[Signature],
+    ) -> Optional[str]:
+        """Find an indexed near-duplicate of a signature."""
+        checked: Set[str] = set()
+        for band, key in enumerate(keys):
+            for candidate in self._buckets[band].get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                similarity = self._similarity(
+                    self._signatures[candidate], signature
+                )
+                if similarity >= self.threshold:
+                    return candidate
+        return None
+
+    def _insert(
+        self,
+        article_id: str,
+        signature: Signature,
+        keys: List[Signature],
+        cluster_id: str,
+    ) -> None:
+        """Add a signature to the buckets, evicting the oldest."""
+        if len(self._order) >= self.max_size:
+            self._evict(self._order.popleft())
+        self._signatures[article_id] = signature
+        self._cluster_of[article_id] = cluster_id
+        self._members[cluster_id] = self._members.get(cluster_id, 0) + 1
+        self._order.append(article_id)
+        for band, key in enumerate(keys):
+            self._buckets[band].setdefault(key, []).append(article_id)
+
+    def _evict(self, article_id: str) -> None:
+        """Forget an indexed article."""
+        signature = self._signatures.pop(article_id)
+        cluster_id = self._cluster_of.pop(article_id)
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band][key]
+            bucket.remove(article_id)
+            if not bucket:
+                del self._buckets[band][key]
+        self._members[cluster_id] -= 1
+        if not self._members[cluster_id]:
+            del self._members[cluster_id]
+            self._sources.pop(cluster_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get index counters.
+
+        Returns:
+            Dict[str, Any]: Indexed articles, clusters and collapses.
+        """
+        return {
+            "indexed": len(self._signatures),
+            "clusters": len(self._sources),
+            "collapsed": self._collapsed,
+        }
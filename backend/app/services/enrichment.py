@@ -0,0 +1,144 @@
+"""Background enrichment of stored articles with their full text."""
+import asyncio
+import logging
+from concurrent.futures import Executor
+from contextlib import suppress
+from typing import Any, Dict, List, Optional
+
+from app.core.process_pool import create_process_pool
+from app.models.schemas import NewsArticle
+from app.services.article_store import ArticleStore
+from app.services.extraction import PageFetcher, extract_text
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleEnricher:
+    """Fetches the pages of stored articles and stores their body text.
+
+    Pages are fetched concurrently on the event loop, while HTML parsing
+    runs on a process pool so that it never blocks request handling.
+    Every article is attempted once; failures are recorded and not
+    retried.
+    """
+
+    def __init__(
+        self,
+        article_store: ArticleStore,
+        fetcher: PageFetcher,
+        executor: Optional[Executor] = None,
+        max_workers: int = 2,
+        batch_size: int = 20,
+        concurrency: int = 4,
+        interval: int = 60,
+    ) -> None:
+        """Initialize the enricher.
+
+        Args:
+            article_store: Store to read articles from and save bodies to.
+            fetcher: Fetcher of article pages.
+            executor: Executor running the extraction. A process pool of
+                max_workers processes is created, and shut down with the
+                enricher, if not given.
+            max_workers: Processes of the created process pool.
+            batch_size: Articles enriched per round.
+            concurrency: Maximum number of concurrent page fetches.
+            interval: Seconds between two rounds.
+        """
+        self.article_store = article_store
+        self.fetcher = fetcher
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.interval = interval
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._task: Optional[asyncio.Task] = None
+        self._counts = {"extracted": 0, "empty": 0, "failed": 0}
+
+    def _get_executor(self) -> Executor:
+        """Get the executor, creating the process pool on first use."""
+        if self._executor is None:
+            self._executor = create_process_pool(self.max_workers)
+        return self._executor
+
+    async def enrich(self, articles: List[NewsArticle]) -> int:
+        """Extract and store the body text of articles.
+
+        Args:
+            articles: Stored articles to enrich.
+
+        Returns:
+            int: Number of articles a body was stored for.
+        """
+        bodies = await asyncio.gather(
+            *(self._extract(article) for article in articles)
+        )
+        await self.article_store.save_bodies({
+            article.id: body for article, body in zip(articles, bodies)
+        })
+        return sum(body is not None for body in bodies)
+
+    async def _extract(self, article: NewsArticle) -> Optional[str]:
+        """Fetch one article page and extract its body text."""
+        try:
+            async with self._semaphore:
+                html = await self.fetcher.fetch(article.url)
+            body = await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), extract_text, html,
+            )
+        except Exception as e:
+            logger.info("Extracting %s failed: %s", article.url, e)
+            self._counts["failed"] += 1
+            return None
+        self._counts["extracted" if body is not None else "empty"] += 1
+        return body
+
+    async def run_once(self) -> int:
+        """Enrich one batch of articles not attempted yet.
+
+        Returns:
+            int: Number of articles attempted.
+        """
+        articles = await self.article_store.pending_extraction(
+            self.batch_size,
+        )
+        if articles:
+            await self.enrich(articles)
+        return len(articles)
+
+    async def _run(self) -> None:
+        """Enrich articles forever, pausing when none are pending."""
+        while True:
+            try:
+                attempted = await self.run_once()
+            except Exception as e:
+                logger.warning("Article enrichment failed: %s", e)
+                attempted = 0
+            if not attempted:
+                await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background enrichment task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop enrichment and release the fetcher and the process pool."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.fetcher.close()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get extraction counters.
+
+        Returns:
+            Dict[str, Any]: Extracted, empty and failed pages.
+        """
+        return dict(self._counts)
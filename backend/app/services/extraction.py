@@ -0,0 +1,192 @@
+"""Fetching article pages and extracting their readable text.
+
+extract_text is a pure function without application imports, so it can
+run in worker processes that only import this module.
+"""
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+from typing import List, Optional
+
+import httpx
+
+# Elements whose text is never part of the article body
+SKIPPED_TAGS = frozenset({
+    "aside", "button", "figure", "footer", "form", "header", "iframe",
+    "nav", "noscript", "script", "select", "style", "svg", "template",
+})
+
+# Elements that end the paragraph being read
+BLOCK_TAGS = frozenset({
+    "article", "blockquote", "div", "h1", "h2", "h3", "h4", "h5", "h6",
+    "li", "main", "ol", "p", "section", "table", "ul",
+})
+
+# Elements holding the main content, when the page marks it up
+CONTENT_TAGS = frozenset({"article", "main"})
+
+# Paragraphs with fewer words are considered boilerplate
+MIN_PARAGRAPH_WORDS = 6
+
+# Bodies shorter than this are not worth keeping
+MIN_BODY_CHARS = 200
+
+MAX_BODY_CHARS = 50_000
+
+
+class _ParagraphParser(HTMLParser):
+    """Collects the text of <p> elements outside of page chrome.
+
+    Paragraphs inside <article> or <main> are collected separately, so
+    that the rest of the page can be ignored when the content is marked
+    up.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.paragraphs: List[str] = []
+        self.content_paragraphs: List[str] = []
+        self._skip_depth = 0
+        self._content_depth = 0
+        self._in_paragraph = False
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+            self._in_paragraph = tag == "p"
+        if tag in CONTENT_TAGS:
+            self._content_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+        if tag in CONTENT_TAGS:
+            self._content_depth = max(self._content_depth - 1, 0)
+
+    def handle_data(self, data: str) -> None:
+        if self._in_paragraph and not self._skip_depth:
+            self._text.append(data)
+
+    def _flush(self) -> None:
+        """End the paragraph being read, keeping it if long enough."""
+        words = "".join(self._text).split()
+        if len(words) >= MIN_PARAGRAPH_WORDS:
+            paragraph = " ".join(words)
+            self.paragraphs.append(paragraph)
+            if self._content_depth:
+                self.content_paragraphs.append(paragraph)
+        self._in_paragraph = False
+        self._text = []
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+
+
+def extract_text(html: str) -> Optional[str]:
+    """Extract the readable body text of an article page.
+
+    Keeps paragraphs of running text and drops navigation, scripts and
+    other page chrome. If the page marks up its content with <article>
+    or <main>, only paragraphs inside it are kept.
+
+    Args:
+        html: HTML of the page.
+
+    Returns:
+        Optional[str]: Paragraphs separated by blank lines, or None if
+        the page has no substantial text.
+    """
+    parser = _ParagraphParser()
+    parser.feed(html)
+    parser.close()
+    paragraphs = parser.content_paragraphs or parser.paragraphs
+    body = "\n\n".join(paragraphs)
+    if len(body) < MIN_BODY_CHARS:
+        return None
+    return body[:MAX_BODY_CHARS]
+
+
+class PageFetchError(Exception):
+    """Exception raised when a page cannot be used for extraction."""
+    pass
+
+
+class PageFetcher(ABC):
+    """Fetches the HTML of article pages."""
+
+    @abstractmethod
+    async def fetch(self, url: str) -> str:
+        """Fetch a page.
+
+        Args:
+            url: Page URL.
+
+        Returns:
+            str: HTML of the page.
+        """
+
+    async def close(self) -> None:
+        """Release resources held by the fetcher."""
+        return None
+
+
+class HttpPageFetcher(PageFetcher):
+    """Fetches pages over HTTP, reading at most max_bytes of each."""
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_bytes: int = 2_000_000,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        """Initialize the fetcher.
+
+        Args:
+            timeout: Seconds allowed per request.
+            max_bytes: Bytes read per page; the rest is ignored.
+            client: HTTP client to use. One is created, and closed with
+                the fetcher, if not given.
+        """
+        self.max_bytes = max_bytes
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            timeout=timeout, follow_redirects=True,
+        )
+
+    async def fetch(self, url: str) -> str:
+        """Fetch a page.
+
+        Args:
+            url: Page URL.
+
+        Returns:
+            str: HTML of the page, possibly truncated.
+
+        Raises:
+            httpx.HTTPError: If the request fails.
+            PageFetchError: If the page is not HTML.
+        """
+        async with self.client.stream("GET", url) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "")
+            if "html" not in content_type:
+                raise PageFetchError(f"Not an HTML page: {content_type}")
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_bytes:
+                    break
+            content = b"".join(chunks)[:self.max_bytes]
+            return content.decode(response.encoding or "utf-8", "replace")
+
+    async def close(self) -> None:
+        """Close the HTTP client if the fetcher created it."""
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,274 @@
+"""Streaming parsing of RSS 2.0 and Atom feeds into news articles.
+
+Feeds are parsed incrementally from chunks of bytes: each item is
+converted as soon as its closing tag is read and then dropped from the
+tree, so memory use does not grow with the size of the feed.
+"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+
+from app.models.schemas import NewsArticle
+from app.services.article_store import article_id_for_url
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+DC_CREATOR = "{http://purl.org/dc/elements/1.1/}creator"
+
+
+def _text(element: Optional[ElementTree.Element]) -> Optional[str]:
+    """Get the stripped text of an element, or None if empty."""
+    if element is None or element.text is None:
+        return None
+    return element.text.strip() or None
+
+
+def parse_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an RFC 822 (RSS) or RFC 3339 (Atom) date.
+
+    Dates without a timezone are taken to be UTC.
+
+    Args:
+        value: Date as found in the feed.
+
+    Returns:
+        Optional[datetime]: The parsed date, or None if unparseable.
+    """
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _atom_link(entry: ElementTree.Element) -> Optional[str]:
+    """Get the alternate link of an Atom entry."""
+    for link in entry.iter(f"{ATOM_NS}link"):
+        if link.get("rel", "alternate") == "alternate":
+            return link.get("href")
+    return None
+
+
+def _rss_item(
+    item: ElementTree.Element,
+    source: str,
+    category: Optional[str],
+) -> Optional[NewsArticle]:
+    """Convert an RSS item into an article."""
+    title = _text(item.find("title"))
+    url = _text(item.find("link"))
+    if not title or not url:
+        return None
+    return NewsArticle(
+        id=article_id_for_url(url),
+        title=title,
+        description=_text(item.find("description")),
+        url=url,
+        source=source,
+        published_at=parse_date(_text(item.find("pubDate"))),
+        category=category,
+        author=_text(item.find(DC_CREATOR)) or _text(item.find("author")),
+    )
+
+
+def _atom_entry(
+    entry: ElementTree.Element,
+    source: str,
+    category: Optional[str],
+) -> Optional[NewsArticle]:
+    """Convert an Atom entry into an article."""
+    title = _text(entry.find(f"{ATOM_NS}title"))
+    url = _atom_link(entry)
+    if not title or not url:
+        return None
+    published = (
+        _text(entry.find(f"{ATOM_NS}published"))
+        or _text(entry.find(f"{ATOM_NS}updated"))
+    )
+    return NewsArticle(
+        id=article_id_for_url(url),
+        title=title,
+        description=(
+            _text(entry.find(f"{ATOM_NS}summary"))
+            or _text(entry.find(f"{ATOM_NS}content"))
+        ),
+        url=url,
+        source=source,
+        published_at=parse_date(published),
+        category=category,
+        author=_text(entry.find(f"{ATOM_NS}author/{ATOM_NS}name")),
+    )
+
+
+class FeedParser:
+    """Incremental RSS 2.0 and Atom parser.
+
+    Feeds list their items newest first, so once an item published at
+    or before the watermark is read, every later item has been seen
+    already: the parser then reports done and ignores further input.
+
+    Attributes:
+        done: Whether the watermark was reached.
+    """
+
+    def __init__(
+        self,
+        feed_url: str,
+        category: Optional[str] = None,
+        watermark: Optional[datetime] = None,
+    ) -> None:
+        """Initialize the parser.
+
+        Args:
+            feed_url: URL the feed is fetched from.
+            category: Category assigned to every article of the feed.
+            watermark: Publication time of the newest item seen before.
+        """
+        self.feed_url = feed_url
+        self.category = category
+        self.watermark = watermark
+        self.done = False
+        self._parser = ElementTree.XMLPullParser(events=("start", "end"))
+        self._stack: List[ElementTree.Element] = []
+        self._container: Optional[ElementTree.Element] = None
+        self._source: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> Iterator[NewsArticle]:
+        """Parse a chunk of the document.
+
+        Args:
+            chunk: Next bytes of the feed.
+
+        Yields:
+            NewsArticle: Articles whose item closed within the chunk.
+
+        Raises:
+            ElementTree.ParseError: If the document is not well-formed.
+        """
+        if self.done:
+            return
+        self._parser.feed(chunk)
+        yield from self._drain()
+
+    def close(self) -> Iterator[NewsArticle]:
+        """Finish parsing the document.
+
+        Yields:
+            NewsArticle: Articles whose item closed at the very end.
+
+        Raises:
+            ElementTree.ParseError: If the document is incomplete.
+        """
+        if self.done:
+            return
+        self._parser.close()
+        yield from self._drain()
+
+    def _drain(self) -> Iterator[NewsArticle]:
+        """Handle the parse events read so far."""
+        for event, element in self._parser.read_events():
+            if event == "start":
+                self._start(element)
+                continue
+            self._stack.pop()
+            if not self._stack or self._stack[-1] is not self._container:
+                continue
+            article = self._end_child(element)
+            if article is None:
+                continue
+            if self._is_seen(article):
+                self.done = True
+                return
+            yield article
+
+    def _start(self, element: ElementTree.Element) -> None:
+        """Track an opened element and find the item container."""
+        self._stack.append(element)
+        depth = len(self._stack)
+        is_atom = self._stack[0].tag == f"{ATOM_NS}feed"
+        if (is_atom and depth == 1) or (not is_atom and depth == 2):
+            self._container = element
+
+    def _end_child(
+        self,
+        element: ElementTree.Element,
+    ) -> Optional[NewsArticle]:
+        """Handle a closed child of the channel or feed, then drop it."""
+        article = None
+        if element.tag in ("title", f"{ATOM_NS}title"):
+            self._source = _text(element)
+        elif element.tag in ("item", f"{ATOM_NS}entry"):
+            convert = _rss_item if element.tag == "item" else _atom_entry
+            source = self._source or urlsplit(self.feed_url).netloc
+            article = convert(element, source, self.category)
+        self._container.remove(element)
+        return article
+
+    def _is_seen(self, article: NewsArticle) -> bool:
+        """Check whether an article is at or before the watermark."""
+        return (
+            self.watermark is not None
+            and article.published_at is not None
+            and article.published_at <= self.watermark
+        )
+
+
+def iter_feed(
+    chunks: Iterable[bytes],
+    feed_url: str,
+    category: Optional[str] = None,
+    watermark: Optional[datetime] = None,
+) -> Iterator[NewsArticle]:
+    """Parse a feed lazily from chunks of bytes.
+
+    Reading stops as soon as the watermark is reached, so the remaining
+    chunks are never requested.
+
+    Args:
+        chunks: Successive bytes of the feed.
+        feed_url: URL the feed was fetched from.
+        category: Category assigned to every article of the feed.
+        watermark: Publication time of the newest item seen before.
+
+    Yields:
+        NewsArticle: Articles newer than the watermark, in feed order.
+    """
+    parser = FeedParser(feed_url, category, watermark)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
+
+
+def parse_feed(
+    content: bytes,
+    feed_url: str,
+    category: Optional[str] = None,
+    watermark: Optional[datetime] = None,
+) -> List[NewsArticle]:
+    """Parse a whole RSS 2.0 or Atom document into articles.
+
+    Items without a title or link are skipped.
+
+    Args:
+        content: Raw feed document.
+        feed_url: URL the feed was fetched from.
+        category: Category assigned to every article of the feed.
+        watermark: Publication time of the newest item seen before.
+
+    Returns:
+        List[NewsArticle]: Articles in feed order.
+
+    Raises:
+        ElementTree.ParseError: If the document is not well-formed XML.
+    """
+    return list(iter_feed([content], feed_url, category, watermark))
@@ -0,0 +1,316 @@
+"""Thumbnails of article images, kept in an on-disk LRU cache."""
+import asyncio
+import io
+import ipaddress
+import logging
+import os
+import socket
+from concurrent.futures import Executor
+from contextlib import suppress
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from PIL import Image, ImageOps
+
+from app.core.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_MEDIA_TYPE = "image/jpeg"
+
+
+def make_thumbnail(
+    data: bytes,
+    destination: str,
+    max_size: Tuple[int, int] = (480, 270),
+    quality: int = 80,
+) -> bytes:
+    """Downscale an image into a JPEG thumbnail file.
+
+    Runs in worker processes. The image keeps its aspect ratio and is
+    never upscaled. Transparent areas are flattened onto white.
+
+    Args:
+        data: Encoded source image.
+        destination: Path the thumbnail is written to.
+        max_size: Maximum width and height of the thumbnail.
+        quality: JPEG quality.
+
+    Returns:
+        bytes: The thumbnail, as written to the file.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        # Lets JPEG decoding skip straight to a reduced resolution
+        image.draft("RGB", max_size)
+        image = ImageOps.exif_transpose(image)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+        image.thumbnail(max_size)
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=quality, optimize=True)
+    data = buffer.getvalue()
+    # Workers of a host share the directory and may write the same file
+    partial = f"{destination}.{os.getpid()}.part"
+    with open(partial, "wb") as file:
+        file.write(data)
+    os.replace(partial, destination)
+    return data
+
+
+class ThumbnailCache:
+    """Size-bounded directory of thumbnail files, evicted LRU.
+
+    The directory is shared by the workers of a host, so it is the only
+    record of what is cached: recency is the modification time of a
+    file, touched on every hit, and eviction scans the directory. A file
+    can be evicted by another worker at any time, so thumbnails are read
+    whole and a missing file is a miss. The directory is created when
+    the first thumbnail is written.
+    """
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Directory holding the thumbnails.
+            max_bytes: Total size the files are kept under.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._counts = {"hits": 0, "misses": 0, "evictions": 0}
+        self._evict()
+
+    def _scan(self) -> List[Tuple[float, str, int]]:
+        """List the thumbnails on disk, least recently used first.
+
+        Returns:
+            List[Tuple[float, str, int]]: Modification time, digest and
+            size of every file.
+        """
+        entries = []
+        try:
+            with os.scandir(self.directory) as scan:
+                for entry in scan:
+                    if entry.name.endswith(".part"):
+                        continue
+                    with suppress(FileNotFoundError):
+                        stat = entry.stat()
+                        entries.append(
+                            (stat.st_mtime, entry.name, stat.st_size),
+                        )
+        except FileNotFoundError:
+            return []
+        return sorted(entries)
+
+    def path_for(self, digest: str) -> Path:
+        """Get where the thumbnail of a digest is stored.
+
+        Args:
+            digest: Digest of the image URL.
+
+        Returns:
+            Path: Path of the thumbnail file.
+        """
+        return self.directory / digest
+
+    def get(self, digest: str) -> Optional[bytes]:
+        """Get a cached thumbnail, marking it recently used.
+
+        Args:
+            digest: Digest of the image URL.
+
+        Returns:
+            Optional[bytes]: The JPEG thumbnail, or None if not cached.
+        """
+        path = self.path_for(digest)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self._counts["misses"] += 1
+            return None
+        self._counts["hits"] += 1
+        with suppress(OSError):
+            os.utime(path)
+        return data
+
+    def add(self, digest: str) -> None:
+        """Record a thumbnail written to path_for(digest).
+
+        Args:
+            digest: Digest of the image URL.
+        """
+        self._evict(keep=digest)
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Delete least recently used files until under max_bytes."""
+        entries = self._scan()
+        total = sum(size for _, _, size in entries)
+        for _, digest, size in entries:
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            self.path_for(digest).unlink(missing_ok=True)
+            total -= size
+            self._counts["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters.
+
+        Returns:
+            Dict[str, Any]: Hits, misses and evictions of this worker,
+            files and bytes in the directory.
+        """
+        entries = self._scan()
+        return {
+            **self._counts,
+            "files": len(entries),
+            "bytes": sum(size for _, _, size in entries),
+        }
+
+
+class ImageFetchError(Exception):
+    """Exception raised when an image cannot be fetched or decoded."""
+    pass
+
+
+class ThumbnailService:
+    """Fetches each remote image once and serves it as a thumbnail.
+
+    Concurrent requests for the same image share one fetch. Downscaling
+    runs on the given executor, normally a process pool. Image URLs come
+    from publishers, so redirects are followed one at a time and every
+    URL must point at a public address.
+    """
+
+    def __init__(
+        self,
+        cache: ThumbnailCache,
+        executor: Executor,
+        max_size: Tuple[int, int] = (480, 270),
+        max_source_bytes: int = 10_000_000,
+        timeout: float = 10.0,
+        client: Optional[httpx.AsyncClient] = None,
+        max_redirects: int = 5,
+        allow_private_hosts: bool = False,
+    ) -> None:
+        """Initialize the service.
+
+        Args:
+            cache: On-disk cache of thumbnails.
+            executor: Executor running make_thumbnail.
+            max_size: Maximum width and height of thumbnails.
+            max_source_bytes: Largest source image fetched.
+            timeout: Seconds allowed per image fetch.
+            client: HTTP client to use. One is created, and closed with
+                the service, if not given.
+            max_redirects: Redirects followed per image.
+            allow_private_hosts: Whether images may be fetched from
+                loopback, private and other non-public addresses.
+        """
+        self.cache = cache
+        self.executor = executor
+        self.max_size = max_size
+        self.max_source_bytes = max_source_bytes
+        self.max_redirects = max_redirects
+        self.allow_private_hosts = allow_private_hosts
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=timeout)
+        self.single_flight = SingleFlight()
+
+    async def thumbnail(self, url: str, digest: str) -> bytes:
+        """Get the thumbnail of an image, creating it if needed.
+
+        Args:
+            url: Remote image URL.
+            digest: Digest of the URL, naming the cached file.
+
+        Returns:
+            bytes: The JPEG thumbnail.
+
+        Raises:
+            ImageFetchError: If the image cannot be fetched or decoded.
+        """
+        data = self.cache.get(digest)
+        if data is not None:
+            return data
+        return await self.single_flight.do(
+            digest, lambda: self._create(url, digest),
+        )
+
+    async def _create(self, url: str, digest: str) -> bytes:
+        """Fetch an image and store its thumbnail."""
+        source = await self._fetch(url)
+        self.cache.directory.mkdir(parents=True, exist_ok=True)
+        path = self.cache.path_for(digest)
+        try:
+            data = await asyncio.get_running_loop().run_in_executor(
+                self.executor, make_thumbnail, source, str(path),
+                self.max_size,
+            )
+        except Exception as e:
+            raise ImageFetchError(f"Cannot decode image: {e}") from e
+        # Scans the directory, which can hold thousands of files
+        await asyncio.to_thread(self.cache.add, digest)
+        return data
+
+    async def _check_url(self, url: httpx.URL) -> None:
+        """Reject URLs that are not HTTP or point at non-public hosts."""
+        if url.scheme not in ("http", "https"):
+            raise ImageFetchError(f"Unsupported image URL: {url}")
+        if self.allow_private_hosts:
+            return
+        try:
+            addresses = [ipaddress.ip_address(url.host)]
+        except ValueError:
+            try:
+                infos = await asyncio.get_running_loop().getaddrinfo(
+                    url.host, url.port, type=socket.SOCK_STREAM,
+                )
+            except (OSError, UnicodeError) as e:
+                raise ImageFetchError(f"Cannot resolve {url.host}") from e
+            addresses = [ipaddress.ip_address(info[4][0]) for info in infos]
+        if any(not a.is_global or a.is_multicast for a in addresses):
+            raise ImageFetchError(f"Image host is not public: {url.host}")
+
+    async def _fetch(self, url: str) -> bytes:
+        """Download a source image, checking every redirect target."""
+        target = httpx.URL(url)
+        try:
+            for _ in range(self.max_redirects + 1):
+                await self._check_url(target)
+                async with self.client.stream(
+                    "GET", target, follow_redirects=False,
+                ) as response:
+                    if response.next_request is None:
+                        return await self._read(response)
+                    target = response.next_request.url
+        except httpx.HTTPError as e:
+            raise ImageFetchError(f"Cannot fetch image: {e}") from e
+        raise ImageFetchError("Too many redirects")
+
+    async def _read(self, response: httpx.Response) -> bytes:
+        """Read the body of an image response, bounded in size."""
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", "")
+        if not content_type.startswith("image/"):
+            raise ImageFetchError(f"Not an image: {content_type}")
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > self.max_source_bytes:
+                raise ImageFetchError("Image too large")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def close(self) -> None:
+        """Close the HTTP client if the service created it."""
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,499 @@
+"""Incremental ingestion of upstream feeds behind persisted watermarks.
+
+Search feeds are sorted by publication time. Each remembers the
+publication time of the newest article it ingested, with the URLs
+published at that exact second. Refreshes only ask for newer articles,
+through the upstream from parameter, and stop paging at the first page
+reaching articles already seen.
+
+Pages come newest first, so a refresh cut off by the page limit leaves
+a gap between the watermark and the oldest article it fetched. The
+watermark then stays where it is and the gap is recorded as a backlog,
+fetched by the next refreshes before the watermark moves.
+
+Headline feeds are ranked by NewsAPI instead, so an old story can sit
+above newer ones. Their watermark keeps the URLs listed by the last
+refreshes, every article is checked against them, and paging stops at
+the first page without anything new.
+"""
+import asyncio
+import json
+import logging
+from contextlib import suppress
+from datetime import UTC, datetime
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.quota import Priority
+from app.db.models import IngestionWatermark
+from app.db.session import async_session_factory
+from app.models.schemas import NewsArticle
+from app.services.news import NewsService
+
+logger = logging.getLogger(__name__)
+
+
+def _aware(value: datetime) -> datetime:
+    """Read a datetime as UTC when it carries no timezone."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+class Feed(NamedTuple):
+    """Upstream feed ingested incrementally.
+
+    Feeds with a query search every article; the others are the top
+    headlines of a category and country.
+    """
+    query: Optional[str] = None
+    category: Optional[str] = None
+    country: str = "us"
+    language: str = "en"
+    source: str = "newsapi"
+
+    @property
+    def key(self) -> str:
+        """Get the key the watermark of the feed is stored under."""
+        return ":".join((
+            self.source,
+            self.category or "",
+            self.query or "",
+            self.country,
+            self.language,
+        ))
+
+    @property
+    def time_sorted(self) -> bool:
+        """Whether the feed lists articles newest first, from any time.
+
+        Search feeds are; headline feeds are ranked by NewsAPI.
+        """
+        return self.query is not None
+
+
+class Backlog(NamedTuple):
+    """Articles of a feed left to ingest after a cut-off refresh.
+
+    Articles newer than the watermark and up to before, except the URLs
+    already fetched at before, are still to be fetched. Once they are,
+    the watermark moves to newest, the newest article fetched meanwhile.
+    """
+    before: datetime
+    urls: FrozenSet[str]
+    newest: "Watermark"
+
+    def covers(self, article: NewsArticle) -> bool:
+        """Check whether an article was fetched before the cut-off.
+
+        Args:
+            article: Fetched article.
+
+        Returns:
+            bool: True if the article is not older than the backlog.
+        """
+        if article.published_at is None:
+            return False
+        published_at = _aware(article.published_at)
+        if published_at == self.before:
+            return article.url in self.urls
+        return published_at > self.before
+
+
+class Watermark(NamedTuple):
+    """Newest articles ingested from a feed.
+
+    For headline feeds, urls are the URLs listed by the last refreshes
+    rather than those published at published_at.
+    """
+    published_at: datetime
+    urls: FrozenSet[str] = frozenset()
+    backlog: Optional[Backlog] = None
+
+    def covers(self, article: NewsArticle) -> bool:
+        """Check whether an article was already ingested.
+
+        Articles without a publication time are never covered.
+
+        Args:
+            article: Fetched article.
+
+        Returns:
+            bool: True if the article is not newer than the watermark.
+        """
+        if article.published_at is None:
+            return False
+        published_at = _aware(article.published_at)
+        if published_at == self.published_at:
+            return article.url in self.urls
+        return published_at < self.published_at
+
+
+def advance_watermark(
+    watermark: Optional[Watermark],
+    articles: List[NewsArticle],
+) -> Optional[Watermark]:
+    """Move a watermark to the newest of the given articles.
+
+    Args:
+        watermark: Current watermark, if any.
+        articles: Newly ingested articles.
+
+    Returns:
+        Optional[Watermark]: The new watermark, or the current one when
+        no article is newer.
+    """
+    dated = [
+        (_aware(article.published_at), article.url) for article in articles
+        if article.published_at is not None
+    ]
+    if not dated:
+        return watermark
+    latest = max(published_at for published_at, _ in dated)
+    if watermark is not None and watermark.published_at > latest:
+        return watermark
+    urls = {url for published_at, url in dated if published_at == latest}
+    if watermark is not None and watermark.published_at == latest:
+        urls |= watermark.urls
+    return Watermark(latest, frozenset(urls))
+
+
+def _merge_watermarks(first: Watermark, second: Watermark) -> Watermark:
+    """Get the later of two watermarks, joining their URLs on a tie."""
+    if first.published_at > second.published_at:
+        return first
+    if first.published_at < second.published_at:
+        return second
+    return first._replace(urls=first.urls | second.urls)
+
+
+def next_watermark(
+    watermark: Optional[Watermark],
+    fresh: List[NewsArticle],
+    complete: bool,
+) -> Optional[Watermark]:
+    """Get the watermark of a search feed after a refresh.
+
+    A complete refresh, one whose paging reached the watermark, moves it
+    to the newest article fetched since it, backlog included. A refresh
+    cut off by the page limit keeps the watermark and records the
+    articles still to fetch as a backlog. The first refresh of a feed
+    moves to its newest article either way.
+
+    Args:
+        watermark: Watermark before the refresh, if any.
+        fresh: New articles of the refresh.
+        complete: Whether paging reached the watermark.
+
+    Returns:
+        Optional[Watermark]: The new watermark, if any.
+    """
+    if watermark is None:
+        return advance_watermark(None, fresh)
+    pending = watermark.backlog.newest if watermark.backlog else None
+    newest = advance_watermark(pending, fresh)
+    if complete:
+        base = watermark._replace(backlog=None)
+        return _merge_watermarks(base, newest) if newest else base
+    dated = [
+        (_aware(article.published_at), article.url) for article in fresh
+        if article.published_at is not None
+    ]
+    if not dated:
+        return watermark
+    oldest = min(published_at for published_at, _ in dated)
+    urls = {url for published_at, url in dated if published_at == oldest}
+    if watermark.backlog and watermark.backlog.before == oldest:
+        urls |= watermark.backlog.urls
+    return watermark._replace(
+        backlog=Backlog(oldest, frozenset(urls), newest),
+    )
+
+
+def _dump_backlog(backlog: Optional[Backlog]) -> Optional[str]:
+    """Encode a backlog for the database."""
+    if backlog is None:
+        return None
+    return json.dumps({
+        "before": backlog.before.isoformat(),
+        "before_urls": sorted(backlog.urls),
+        "published_at": backlog.newest.published_at.isoformat(),
+        "urls": sorted(backlog.newest.urls),
+    })
+
+
+def _load_backlog(data: Optional[str]) -> Optional[Backlog]:
+    """Decode a backlog read from the database."""
+    if data is None:
+        return None
+    values = json.loads(data)
+    return Backlog(
+        datetime.fromisoformat(values["before"]),
+        frozenset(values["before_urls"]),
+        Watermark(
+            datetime.fromisoformat(values["published_at"]),
+            frozenset(values["urls"]),
+        ),
+    )
+
+
+class WatermarkStore:
+    """Watermarks of the ingested feeds, persisted in the database."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = async_session_factory,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            session_factory: Factory creating database sessions.
+        """
+        self.session_factory = session_factory
+
+    async def get(self, feed: Feed) -> Optional[Watermark]:
+        """Get the watermark of a feed.
+
+        Args:
+            feed: Ingested feed.
+
+        Returns:
+            Optional[Watermark]: The watermark, or None if the feed was
+            never ingested.
+        """
+        async with self.session_factory() as session:
+            row = await session.get(IngestionWatermark, feed.key)
+            if row is None:
+                return None
+            return Watermark(
+                _aware(row.published_at),
+                frozenset(json.loads(row.urls)),
+                _load_backlog(row.backlog),
+            )
+
+    async def save(self, feed: Feed, watermark: Watermark) -> None:
+        """Store the watermark of a feed.
+
+        Args:
+            feed: Ingested feed.
+            watermark: Its new watermark.
+        """
+        values = {
+            "key": feed.key,
+            "published_at": watermark.published_at.replace(tzinfo=None),
+            "urls": json.dumps(sorted(watermark.urls)),
+            "backlog": _dump_backlog(watermark.backlog),
+            "updated_at": datetime.now(UTC).replace(tzinfo=None),
+        }
+        statement = sqlite_insert(IngestionWatermark).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=["key"],
+            set_={name: values[name] for name in values if name != "key"},
+        )
+        async with self.session_factory() as session:
+            await session.execute(statement)
+            await session.commit()
+
+
+class IncrementalIngester:
+    """Periodically ingests only the new articles of upstream feeds.
+
+    Fetched articles reach the article store through the news service.
+    """
+
+    def __init__(
+        self,
+        news_service: NewsService,
+        watermarks: WatermarkStore,
+        feeds: List[Feed],
+        page_size: int = 20,
+        max_pages: int = 5,
+        interval: int = 300,
+    ) -> None:
+        """Initialize the ingester.
+
+        Args:
+            news_service: Service fetching feed pages from NewsAPI.
+            watermarks: Store of the feed watermarks.
+            feeds: Feeds to ingest.
+            page_size: Articles per upstream page.
+            max_pages: Pages fetched per feed and refresh at most.
+            interval: Seconds between two refreshes.
+        """
+        self.news_service = news_service
+        self.watermarks = watermarks
+        self.feeds = list(feeds)
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._counts = {
+            "pages": 0, "articles": 0, "new": 0, "stopped": 0, "cut_off": 0,
+        }
+
+    async def ingest(self, feed: Feed) -> List[NewsArticle]:
+        """Fetch the articles of a feed not ingested yet.
+
+        Search feeds with a backlog fetch it first, newest first.
+
+        Args:
+            feed: Feed to ingest.
+
+        Returns:
+            List[NewsArticle]: The new articles, in feed order.
+        """
+        watermark = await self.watermarks.get(feed)
+        if feed.time_sorted:
+            fresh, complete = await self._fetch_new(feed, watermark)
+            if not complete:
+                self._counts["cut_off"] += 1
+            advanced = next_watermark(watermark, fresh, complete)
+        else:
+            fresh, advanced = await self._fetch_headlines(feed, watermark)
+        if advanced is not None and advanced != watermark:
+            await self.watermarks.save(feed, advanced)
+        self._counts["new"] += len(fresh)
+        return fresh
+
+    async def _fetch_new(
+        self,
+        feed: Feed,
+        watermark: Optional[Watermark],
+    ) -> Tuple[List[NewsArticle], bool]:
+        """Page through a feed until the watermark or the page limit.
+
+        Returns:
+            Tuple[List[NewsArticle], bool]: The new articles, newest
+            first, and whether paging reached the watermark.
+        """
+        backlog = watermark.backlog if watermark else None
+        fresh: List[NewsArticle] = []
+        for page in range(1, self.max_pages + 1):
+            page_articles = await self._fetch_page(
+                feed,
+                page,
+                since=watermark.published_at if watermark else None,
+                until=backlog.before if backlog else None,
+            )
+            articles = [
+                article for article in page_articles
+                if backlog is None or not backlog.covers(article)
+            ]
+            new = [
+                article for article in articles
+                if watermark is None or not watermark.covers(article)
+            ]
+            fresh.extend(new)
+            if len(new) < len(articles):
+                self._counts["stopped"] += 1
+                return fresh, True
+            if len(page_articles) < self.page_size:
+                return fresh, True
+        return fresh, False
+
+    async def _fetch_headlines(
+        self,
+        feed: Feed,
+        watermark: Optional[Watermark],
+    ) -> Tuple[List[NewsArticle], Optional[Watermark]]:
+        """Page through a headline feed, skipping the URLs listed before.
+
+        Returns:
+            Tuple[List[NewsArticle], Optional[Watermark]]: The new
+            articles, in feed order, and the new watermark.
+        """
+        seen = watermark.urls if watermark else frozenset()
+        listed: Set[str] = set()
+        fresh: List[NewsArticle] = []
+        for page in range(1, self.max_pages + 1):
+            page_articles = await self._fetch_page(feed, page)
+            new = 0
+            for article in page_articles:
+                if article.url not in seen and article.url not in listed:
+                    fresh.append(article)
+                    new += 1
+                listed.add(article.url)
+            if not new:
+                self._counts["stopped"] += 1
+                break
+            if len(page_articles) < self.page_size:
+                break
+        # Pages left unfetched still list the URLs seen before
+        urls = listed | seen
+        if len(urls) > 2 * self.max_pages * self.page_size:
+            urls = listed
+        advanced = advance_watermark(watermark, fresh)
+        if advanced is None:
+            return fresh, None
+        return fresh, Watermark(advanced.published_at, frozenset(urls))
+
+    async def _fetch_page(
+        self,
+        feed: Feed,
+        page: int,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[NewsArticle]:
+        """Fetch one page of a feed in the background lane."""
+        page_articles = await self.news_service.get_feed_page(
+            query=feed.query,
+            category=feed.category,
+            country=feed.country,
+            language=feed.language,
+            since=since,
+            until=until,
+            page=page,
+            page_size=self.page_size,
+            priority=Priority.BACKGROUND,
+        )
+        self._counts["pages"] += 1
+        self._counts["articles"] += len(page_articles)
+        return page_articles
+
+    async def run_once(self) -> None:
+        """Ingest every feed once, one after the other."""
+        for feed in self.feeds:
+            try:
+                await self.ingest(feed)
+            except Exception as e:
+                logger.warning("Ingesting %s failed: %s", feed.key, e)
+
+    async def _run(self) -> None:
+        """Ingest the feeds forever at a fixed interval."""
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background ingestion task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background ingestion task."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get ingestion counters.
+
+        Returns:
+            Dict[str, Any]: Pages and articles fetched, new articles,
+            refreshes stopped at the watermark and refreshes cut off by
+            the page limit.
+        """
+        return {**self._counts, "feeds": len(self.feeds)}
@@ -1,8 +1,28 @@
 """News service for fetching and searching news articles."""
-from typing import List
-from newsapi import NewsApiClient
+import functools
+import logging
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional
+from cachetools import LRUCache
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
 from app.core.config import settings
-from app.models.schemas import NewsArticle, NewsSearchParams
+from app.core.quota import Priority, QuotaExceededError, UpstreamScheduler
+from app.core.singleflight import SingleFlight
+from app.models.records import to_articles, to_records
+from app.models.schemas import (
+    ARTICLE_LIST_ADAPTER,
+    NewsArticle,
+    NewsSearchParams,
+)
+from app.services.article_store import ArticleStore, article_id_for_url
+from app.services.news_client import (
+    AsyncNewsApiClient,
+    NewsApiError,
+    build_query_params,
+)
+from app.services.search import ArticleSearchEngine
+
+logger = logging.getLogger(__name__)
 
 
 class NewsServiceError(Exception):
@@ -10,72 +30,471 @@ class NewsServiceError(Exception):
     pass
 
 
-def create_news_api_client(api_key: str) -> NewsApiClient:
-    """Create a NewsApiClient instance."""
-    return NewsApiClient(api_key=api_key)
+class NewsUnavailableError(NewsServiceError):
+    """Exception raised when NewsAPI must not be called right now."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        """Initialize the error.
+
+        Args:
+            message: Error message.
+            retry_after: Seconds after which a retry may succeed.
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class NewsQuotaExceededError(NewsUnavailableError):
+    """Exception raised when the upstream budget is exhausted."""
+    pass
+
+
+class NewsRequestError(NewsServiceError):
+    """Exception raised when NewsAPI rejects a request as invalid."""
+    pass
+
+
+def is_upstream_failure(error: Exception) -> bool:
+    """Check whether an upstream error means NewsAPI is failing.
+
+    Server errors, timeouts, transport errors and rate limiting are
+    failures; requests NewsAPI rejected as invalid are not.
+
+    Args:
+        error: Error raised by an upstream call.
+
+    Returns:
+        bool: True if the error should count against the circuit.
+    """
+    return not (isinstance(error, NewsApiError) and error.is_client_error)
+
+
+def create_news_api_client(api_key: str) -> AsyncNewsApiClient:
+    """Create an AsyncNewsApiClient instance."""
+    return AsyncNewsApiClient(
+        api_key=api_key,
+        timeout=settings.NEWS_API_TIMEOUT,
+        max_connections=settings.NEWS_API_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.NEWS_API_MAX_KEEPALIVE,
+        max_concurrency=settings.NEWS_API_MAX_CONCURRENCY,
+    )
+
+
+# NewsAPI returns mostly the same articles on every refresh, so their
+# ids are memoized.
+_article_id = functools.lru_cache(maxsize=16_384)(article_id_for_url)
+
+
+def _normalize_article(
+    article: Dict[str, Any],
+    category: Optional[str],
+) -> Dict[str, Any]:
+    """Map one NewsAPI article onto the NewsArticle fields."""
+    source = article.get("source")
+    if isinstance(source, dict):
+        source = source.get("name", "Unknown")
+    else:
+        source = str(source)
+    return {
+        "id": _article_id(article["url"]),
+        "title": article.get("title"),
+        "description": article.get("description"),
+        "url": article["url"],
+        "source": source,
+        "published_at": article.get(
+            "published_at", article.get("publishedAt")
+        ),
+        "category": article.get("category", category),
+        "author": article.get("author"),
+        "image_url": article.get("image_url", article.get("urlToImage")),
+    }
+
+
+def convert_api_response_to_articles(
+    response: dict,
+    category: Optional[str] = None,
+) -> List[NewsArticle]:
+    """Convert NewsAPI response to list of NewsArticle models.
 
+    Articles are normalized first and then validated in one batch.
+    """
+    return ARTICLE_LIST_ADAPTER.validate_python([
+        _normalize_article(article, category)
+        for article in response["articles"]
+    ])
 
-def convert_api_response_to_articles(response: dict) -> List[NewsArticle]:
-    """Convert NewsAPI response to list of NewsArticle models."""
-    articles = []
-    for article in response["articles"]:
-        # Create a copy of the article dict and modify the source field
-        article_data = article.copy()
-        if isinstance(article["source"], dict):
-            article_data["source"] = article["source"].get("name", "Unknown")
-        else:
-            article_data["source"] = str(article["source"])
-        articles.append(NewsArticle(**article_data))
-    return articles
+
+def _newsapi_time(value: Optional[datetime]) -> Optional[str]:
+    """Format a time for the from and to parameters of NewsAPI."""
+    if value is None:
+        return None
+    return value.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%S")
 
 
 class NewsService:
     """Service for interacting with the News API."""
 
-    def __init__(self) -> None:
-        """Initialize the NewsService."""
+    def __init__(
+        self,
+        client: Optional[AsyncNewsApiClient] = None,
+        article_store: Optional[ArticleStore] = None,
+        search_engine: Optional[ArticleSearchEngine] = None,
+        scheduler: Optional[UpstreamScheduler] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        last_good_size: int = 500,
+    ) -> None:
+        """Initialize the NewsService.
+
+        Args:
+            client: Upstream client to use. When omitted, the service
+                creates its own client and closes it on exit.
+            article_store: Optional store that keeps every fetched
+                article.
+            search_engine: Optional local search engine answering
+                searches the stored corpus covers.
+            scheduler: Optional budget every upstream call must pass.
+            breaker: Optional circuit breaker guarding upstream calls.
+            last_good_size: Number of last good upstream results kept
+                to serve while NewsAPI is failing.
+        """
         self.api_key = settings.NEWS_API_KEY
-        self.client = create_news_api_client(self.api_key)
+        self._owns_client = client is None
+        self.client = client or create_news_api_client(self.api_key)
+        self.article_store = article_store
+        self.search_engine = search_engine
+        self.scheduler = scheduler
+        self.breaker = breaker
+        self.single_flight = SingleFlight()
+        self._last_good: LRUCache = LRUCache(maxsize=last_good_size)
+        self._fallbacks_served = 0
 
     async def search_articles(
         self,
         params: NewsSearchParams,
+        priority: Priority = Priority.INTERACTIVE,
     ) -> List[NewsArticle]:
-        """Search for news articles."""
-        try:
-            # Build query string to include category if provided
-            q = params.query or ""
-            response = self.client.get_everything(
-                q=q.strip() or None,  # Use None if empty string
-                language=params.language,
-                page_size=params.page_size,
-                page=params.page,
-            )
-            return convert_api_response_to_articles(response)
-        except Exception as e:
-            raise NewsServiceError(f"Error fetching news: {str(e)}")
+        """Search for news articles.
+
+        Searches are answered from the local index when plan_search
+        decided so for the query, and forwarded to NewsAPI otherwise.
+        NewsAPI cannot search without a query, so searches without one
+        find nothing here and are left to the other sources.
+        """
+        # Collapse whitespace so equivalent queries share one call
+        q = " ".join((params.query or "").split())
+        if not q:
+            return []
+        params = await self.plan_search(params)
+        if params.local:
+            local = await self._search_locally(params)
+            if local is not None:
+                return local
+
+        return await self._fetch(
+            "get_everything",
+            priority,
+            language=params.language,
+            q=q,
+            page_size=params.page_size,
+            page=params.page,
+        )
 
     async def get_top_headlines(
         self,
         category: str | None = None,
         country: str = "us",
         page_size: int = 10,
+        priority: Priority = Priority.INTERACTIVE,
     ) -> List[NewsArticle]:
         """Get top headlines."""
-        try:
-            response = self.client.get_top_headlines(
-                category=category,
-                country=country,
+        return await self._fetch(
+            "get_top_headlines",
+            priority,
+            category=category,
+            country=country,
+            page_size=page_size,
+        )
+
+    async def get_feed_page(
+        self,
+        query: Optional[str] = None,
+        category: Optional[str] = None,
+        country: str = "us",
+        language: str = "en",
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        page: int = 1,
+        page_size: int = 20,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> List[NewsArticle]:
+        """Get one page of a feed for ingestion, newest first.
+
+        Feeds with a query are searched on /everything, sorted by
+        publication time and starting at since. Other feeds are the top
+        headlines of a category, which NewsAPI cannot filter by time.
+        Failures are raised rather than served from a fallback.
+
+        Args:
+            query: Search query of the feed, if any.
+            category: Category of a headlines feed.
+            country: Country code of a headlines feed.
+            language: Language code of a search feed.
+            since: Oldest publication time wanted, if known.
+            until: Newest publication time wanted, for search feeds.
+            page: Page number.
+            page_size: Number of articles per page.
+            priority: Scheduling lane of the call.
+
+        Returns:
+            List[NewsArticle]: Articles of the page.
+        """
+        if query:
+            return await self._fetch(
+                "get_everything",
+                priority,
+                fallback=False,
+                q=query,
+                language=language,
+                sort_by="publishedAt",
+                from_param=_newsapi_time(since),
+                to=_newsapi_time(until),
+                page=page,
                 page_size=page_size,
             )
-            return convert_api_response_to_articles(response)
+        return await self._fetch(
+            "get_top_headlines",
+            priority,
+            fallback=False,
+            category=category,
+            country=country,
+            page=page,
+            page_size=page_size,
+        )
+
+    async def _fetch(
+        self,
+        method: str,
+        priority: Priority,
+        fallback: bool = True,
+        **params: Any,
+    ) -> List[NewsArticle]:
+        """Fetch articles upstream, sharing identical in-flight calls.
+
+        When the upstream call fails, the last good result for the same
+        parameters, or else matching stored articles, are served instead
+        unless fallback is False.
+
+        Args:
+            method: Name of the upstream client method to call.
+            priority: Scheduling lane of the call.
+            fallback: Whether to serve stale articles on failure.
+            **params: Upstream query parameters.
+
+        Returns:
+            List[NewsArticle]: Parsed articles, shared by every caller.
+        """
+        key = (method, tuple(sorted(build_query_params(params).items())))
+        try:
+            articles = await self.single_flight.do(
+                key,
+                lambda: self._call_upstream(method, priority, params),
+            )
+        except NewsRequestError:
+            # Retrying or serving stale data cannot fix the request
+            raise
+        except NewsServiceError:
+            if not fallback:
+                raise
+            stale = await self._fallback(key, method, params)
+            if stale is None:
+                raise
+            self._fallbacks_served += 1
+            return stale
+        if fallback:
+            # Only results that may be served as a fallback are kept
+            self._last_good[key] = to_records(articles)
+        return articles
+
+    async def _call_upstream(
+        self,
+        method: str,
+        priority: Priority,
+        params: Dict[str, Any],
+    ) -> List[NewsArticle]:
+        """Call NewsAPI once and convert the response."""
+        # Check the circuit first so an open circuit spends no budget
+        if self.breaker is not None and not self.breaker.allows_calls():
+            raise NewsUnavailableError(
+                "Upstream circuit is open", self.breaker.retry_after()
+            )
+        await self._acquire(priority)
+        try:
+            response = await self._request(method, params)
+            articles = convert_api_response_to_articles(
+                response, params.get("category")
+            )
+        except CircuitOpenError as e:
+            raise NewsUnavailableError(str(e), e.retry_after)
+        except NewsApiError as e:
+            if e.is_client_error:
+                raise NewsRequestError(f"Error fetching news: {str(e)}")
+            raise NewsServiceError(f"Error fetching news: {str(e)}")
         except Exception as e:
             raise NewsServiceError(f"Error fetching news: {str(e)}")
+        self._store(articles, params.get("language"))
+        return articles
+
+    async def _request(
+        self,
+        method: str,
+        params: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Send one upstream request through the circuit breaker."""
+        def call():
+            return getattr(self.client, method)(**params)
+
+        if self.breaker is None:
+            return await call()
+        return await self.breaker.call(call, is_failure=is_upstream_failure)
+
+    async def _fallback(
+        self,
+        key: tuple,
+        method: str,
+        params: Dict[str, Any],
+    ) -> Optional[List[NewsArticle]]:
+        """Get a stale result to serve while NewsAPI is failing.
+
+        Returns:
+            Optional[List[NewsArticle]]: Stale articles, or None.
+        """
+        stale = self._last_good.get(key)
+        if stale is not None:
+            return to_articles(stale)
+        try:
+            if method == "get_everything":
+                stored = await self._search_stored(params)
+            else:
+                stored = await self._recent_stored(params)
+        except Exception as e:
+            logger.warning("Stored article fallback failed: %s", e)
+            return None
+        return stored or None
+
+    async def _search_stored(
+        self,
+        params: Dict[str, Any],
+    ) -> List[NewsArticle]:
+        """Search stored articles for an upstream search."""
+        if self.search_engine is None:
+            return []
+        return await self.search_engine.search(NewsSearchParams(
+            query=params.get("q"),
+            language=params["language"],
+            page_size=params["page_size"],
+            page=params["page"],
+        ))
+
+    async def _recent_stored(
+        self,
+        params: Dict[str, Any],
+    ) -> List[NewsArticle]:
+        """Get recent stored articles for an upstream headlines call."""
+        if self.article_store is None:
+            return []
+        return await self.article_store.recent(
+            category=params.get("category"),
+            limit=params["page_size"],
+        )
+
+    async def _acquire(self, priority: Priority) -> None:
+        """Wait for the upstream budget to admit a call.
+
+        Raises:
+            NewsQuotaExceededError: If the budget is exhausted.
+        """
+        if self.scheduler is None:
+            return
+        try:
+            await self.scheduler.acquire(priority)
+        except QuotaExceededError as e:
+            raise NewsQuotaExceededError(str(e), e.retry_after)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Get runtime metrics of the service.
+
+        Returns:
+            Dict[str, Any]: Metrics keyed by component.
+        """
+        metrics = {
+            "singleflight": self.single_flight.stats(),
+            "fallbacks_served": self._fallbacks_served,
+        }
+        if self.scheduler is not None:
+            metrics["quota"] = self.scheduler.stats()
+        if self.breaker is not None:
+            metrics["circuit_breaker"] = self.breaker.stats()
+        return metrics
+
+    async def plan_search(
+        self,
+        params: NewsSearchParams,
+    ) -> NewsSearchParams:
+        """Decide whether a query is answered from the local index.
+
+        The decision is made once per query, on its first page, and kept
+        in the parameters of the next pages, so that one result set never
+        mixes local and upstream orderings.
+
+        Args:
+            params: Search parameters.
+
+        Returns:
+            NewsSearchParams: The parameters with local set.
+        """
+        if params.local is not None:
+            return params
+        local = False
+        if self.search_engine is not None:
+            try:
+                local = await self.search_engine.covers(params)
+            except Exception as e:
+                logger.warning("Local search failed: %s", e)
+        return params.model_copy(update={"local": local})
+
+    async def _search_locally(
+        self,
+        params: NewsSearchParams,
+    ) -> Optional[List[NewsArticle]]:
+        """Search the local index, if any, without ever failing."""
+        if self.search_engine is None:
+            return None
+        try:
+            return await self.search_engine.search(params)
+        except Exception as e:
+            logger.warning("Local search failed: %s", e)
+            return None
+
+    def _store(
+        self,
+        articles: List[NewsArticle],
+        language: Optional[str] = None,
+    ) -> None:
+        """Hand fetched articles to the article store, if any."""
+        if self.article_store is not None and articles:
+            self.article_store.submit(articles, language)
 
     async def __aenter__(self) -> "NewsService":
         """Enter async context."""
         return self
 
+    async def close(self) -> None:
+        """Close the upstream client if this service owns it."""
+        if self.article_store is not None:
+            await self.article_store.drain()
+        if self._owns_client:
+            await self.client.aclose()
+
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         """Exit async context."""
-        pass  # No need to close anything with the NewsApiClient
+        await self.close()
@@ -0,0 +1,184 @@
+"""Async HTTP client for the NewsAPI service."""
+import asyncio
+from typing import Any, Dict, Optional
+
+import httpx
+
+NEWS_API_BASE_URL = "https://newsapi.org/v2"
+
+# Map pythonic keyword arguments to the NewsAPI query parameter names.
+_PARAM_NAMES = {
+    "page_size": "pageSize",
+    "sort_by": "sortBy",
+    "from_param": "from",
+    "search_in": "searchIn",
+}
+
+
+class NewsApiError(Exception):
+    """Exception raised when NewsAPI returns an error response."""
+
+    def __init__(
+        self,
+        message: str,
+        code: Optional[str] = None,
+        status_code: Optional[int] = None,
+    ) -> None:
+        """Initialize the error.
+
+        Args:
+            message: Error message returned by NewsAPI.
+            code: NewsAPI error code, if any.
+            status_code: HTTP status code of the response, if any.
+        """
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+    @property
+    def is_client_error(self) -> bool:
+        """Check whether NewsAPI rejected the request itself.
+
+        Client errors, such as missing parameters, say nothing about the
+        health of NewsAPI. Rate limiting is not one of them.
+
+        Returns:
+            bool: True for 4xx responses other than rate limiting.
+        """
+        return (
+            self.status_code is not None
+            and 400 <= self.status_code < 500
+            and self.status_code != 429
+            and self.code != "rateLimited"
+        )
+
+
+def build_query_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Build NewsAPI query parameters from keyword arguments.
+
+    Args:
+        params: Keyword arguments using pythonic names.
+
+    Returns:
+        Dict[str, Any]: Query parameters with unset values dropped.
+    """
+    return {
+        _PARAM_NAMES.get(name, name): value
+        for name, value in params.items()
+        if value is not None
+    }
+
+
+class AsyncNewsApiClient:
+    """Async NewsAPI client sharing one keep-alive connection pool."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = NEWS_API_BASE_URL,
+        timeout: float = 10.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        max_concurrency: int = 10,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """Initialize the client.
+
+        Args:
+            api_key: NewsAPI key.
+            base_url: NewsAPI base URL.
+            timeout: Default timeout in seconds for each call.
+            max_connections: Maximum number of pooled connections.
+            max_keepalive_connections: Maximum idle keep-alive connections.
+            max_concurrency: Maximum number of calls in flight at once.
+            transport: Optional transport, mainly for testing.
+        """
+        self.api_key = api_key
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"X-Api-Key": api_key},
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            transport=transport,
+        )
+
+    async def get_everything(
+        self,
+        timeout: Optional[float] = None,
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """Search every article via the /everything endpoint.
+
+        Args:
+            timeout: Optional timeout overriding the client default.
+            **params: NewsAPI query parameters (q, language, page_size...).
+
+        Returns:
+            Dict[str, Any]: Parsed NewsAPI response.
+        """
+        return await self._get("/everything", params, timeout)
+
+    async def get_top_headlines(
+        self,
+        timeout: Optional[float] = None,
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """Get top headlines via the /top-headlines endpoint.
+
+        Args:
+            timeout: Optional timeout overriding the client default.
+            **params: NewsAPI query parameters (category, country...).
+
+        Returns:
+            Dict[str, Any]: Parsed NewsAPI response.
+        """
+        return await self._get("/top-headlines", params, timeout)
+
+    async def _get(
+        self,
+        path: str,
+        params: Dict[str, Any],
+        timeout: Optional[float],
+    ) -> Dict[str, Any]:
+        """Perform a GET request against NewsAPI.
+
+        Raises:
+            NewsApiError: If NewsAPI reports an error.
+        """
+        request_timeout = (
+            httpx.Timeout(timeout) if timeout is not None
+            else httpx.USE_CLIENT_DEFAULT
+        )
+        async with self._semaphore:
+            response = await self._http.get(
+                path,
+                params=build_query_params(params),
+                timeout=request_timeout,
+            )
+        try:
+            payload = response.json()
+        except ValueError:
+            payload = {}
+        if response.status_code != 200 or payload.get("status") != "ok":
+            raise NewsApiError(
+                payload.get("message", f"HTTP {response.status_code}"),
+                payload.get("code"),
+                response.status_code,
+            )
+        return payload
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncNewsApiClient":
+        """Enter async context."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Exit async context."""
+        await self.aclose()
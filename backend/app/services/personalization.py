@@ -0,0 +1,298 @@
+"""Personalized ranking of recent articles from bookmark history.
+
+Articles are hashed into sparse term vectors. A user's profile is the
+sum of the vectors of their bookmarks, kept as sorted index and weight
+arrays. Candidate articles are scored against a profile all at once:
+their vectors are concatenated, matched against the profile with one
+searchsorted and summed per article with one bincount, instead of
+looping over articles in Python.
+
+Profiles are cached. Before each ranking the bookmark ids of the user
+are compared with the cached profile, and only added or removed
+bookmarks are applied to it.
+"""
+import logging
+import math
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Bookmark
+from app.db.session import async_session_factory
+from app.models.schemas import NewsArticle
+from app.services.article_store import ArticleStore
+from app.services.trending import extract_terms
+
+logger = logging.getLogger(__name__)
+
+# Size of the hashed feature space
+FEATURES = 1 << 20
+
+# Sparse vector as sorted unique feature indices and their weights
+Vector = Tuple[np.ndarray, np.ndarray]
+
+EMPTY_VECTOR: Vector = (
+    np.empty(0, dtype=np.int64),
+    np.empty(0, dtype=np.float64),
+)
+
+
+def article_vector(article: NewsArticle) -> Vector:
+    """Get the hashed term vector of an article.
+
+    Features are the terms of the title and description plus the source,
+    weighted so that the vector has unit length.
+
+    Args:
+        article: Article to vectorize.
+
+    Returns:
+        Vector: Sorted feature indices and their weights.
+    """
+    terms, _ = extract_terms(article)
+    terms.add(f"source:{article.source.casefold()}")
+    hashed = np.fromiter(
+        (zlib.crc32(term.encode()) % FEATURES for term in terms),
+        dtype=np.int64,
+        count=len(terms),
+    )
+    indices = np.unique(hashed)
+    weights = np.full(len(indices), 1 / math.sqrt(len(indices)))
+    return indices, weights
+
+
+def add_vectors(first: Vector, second: Vector, sign: float = 1.0) -> Vector:
+    """Add or subtract two sparse vectors.
+
+    Args:
+        first: Vector to add to.
+        second: Vector added, or subtracted if sign is negative.
+        sign: Factor applied to the second vector.
+
+    Returns:
+        Vector: The sum, without features whose weight cancelled out.
+    """
+    indices, inverse = np.unique(
+        np.concatenate((first[0], second[0])), return_inverse=True,
+    )
+    weights = np.bincount(
+        inverse,
+        np.concatenate((first[1], sign * second[1])),
+        minlength=len(indices),
+    )
+    kept = np.abs(weights) > 1e-9
+    return indices[kept], weights[kept]
+
+
+def score_articles(profile: Vector, vectors: List[Vector]) -> np.ndarray:
+    """Score article vectors against a profile.
+
+    Features are weighted by their inverse document frequency among the
+    scored articles, so terms shared by most candidates count little.
+
+    Args:
+        profile: Profile vector.
+        vectors: Vectors of the articles to score.
+
+    Returns:
+        np.ndarray: Score of every article, in order.
+    """
+    count = len(vectors)
+    scores = np.zeros(count)
+    profile_indices, profile_weights = profile
+    if not count or not len(profile_indices):
+        return scores
+    indices = np.concatenate([vector[0] for vector in vectors])
+    weights = np.concatenate([vector[1] for vector in vectors])
+    rows = np.repeat(
+        np.arange(count), [len(vector[0]) for vector in vectors],
+    )
+    positions = np.minimum(
+        np.searchsorted(profile_indices, indices), len(profile_indices) - 1,
+    )
+    matched = profile_indices[positions] == indices
+    _, inverse, frequencies = np.unique(
+        indices, return_inverse=True, return_counts=True,
+    )
+    idf = np.log((1 + count) / (1 + frequencies)) + 1
+    products = np.where(matched, profile_weights[positions], 0.0)
+    products *= weights * idf[inverse]
+    return np.bincount(rows, products, minlength=count)
+
+
+def _bookmark_article(bookmark: Bookmark) -> NewsArticle:
+    """Get the article a bookmark was made from."""
+    return NewsArticle(
+        id=bookmark.article_id,
+        title=bookmark.title,
+        description=bookmark.description,
+        url=bookmark.url,
+        source=bookmark.source,
+    )
+
+
+class UserProfile:
+    """Term profile of one user, the sum of their bookmark vectors."""
+
+    def __init__(self) -> None:
+        """Initialize an empty profile."""
+        self.vector: Vector = EMPTY_VECTOR
+        self._bookmarks: Dict[int, Tuple[Vector, str, str]] = {}
+
+    @property
+    def bookmark_ids(self) -> Set[int]:
+        """Get the ids of the bookmarks in the profile."""
+        return set(self._bookmarks)
+
+    @property
+    def bookmarked(self) -> Set[str]:
+        """Get the article ids and URLs of the bookmarks."""
+        return {
+            key for _, article_id, url in self._bookmarks.values()
+            for key in (article_id, url)
+        }
+
+    def add(self, bookmark_id: int, article: NewsArticle) -> None:
+        """Add a bookmarked article to the profile.
+
+        Args:
+            bookmark_id: Bookmark id.
+            article: Bookmarked article.
+        """
+        if bookmark_id in self._bookmarks:
+            return
+        vector = article_vector(article)
+        self._bookmarks[bookmark_id] = (vector, article.id, article.url)
+        self.vector = add_vectors(self.vector, vector)
+
+    def remove(self, bookmark_id: int) -> None:
+        """Remove a deleted bookmark from the profile.
+
+        Args:
+            bookmark_id: Bookmark id.
+        """
+        entry = self._bookmarks.pop(bookmark_id, None)
+        if entry is None:
+            return
+        self.vector = (
+            add_vectors(self.vector, entry[0], sign=-1.0)
+            if self._bookmarks else EMPTY_VECTOR
+        )
+
+
+class FeedRanker:
+    """Ranks recent stored articles for a user from their bookmarks."""
+
+    def __init__(
+        self,
+        article_store: ArticleStore,
+        session_factory: sessionmaker = async_session_factory,
+        candidates: int = 500,
+        max_profiles: int = 1000,
+        max_vectors: int = 10_000,
+    ) -> None:
+        """Initialize the ranker.
+
+        Args:
+            article_store: Store the candidate articles are read from.
+            session_factory: Factory creating database sessions.
+            candidates: Most recent articles considered per ranking.
+            max_profiles: Profiles kept in memory.
+            max_vectors: Article vectors kept in memory.
+        """
+        self.article_store = article_store
+        self.session_factory = session_factory
+        self.candidates = candidates
+        self._profiles: LRUCache = LRUCache(maxsize=max_profiles)
+        self._vectors: LRUCache = LRUCache(maxsize=max_vectors)
+        self._counts = {"built": 0, "added": 0, "removed": 0}
+
+    async def profile(self, user_id: int) -> UserProfile:
+        """Get the profile of a user, up to date with their bookmarks.
+
+        Args:
+            user_id: User id.
+
+        Returns:
+            UserProfile: The cached profile, updated incrementally.
+        """
+        profile = self._profiles.get(user_id)
+        if profile is None:
+            profile = self._profiles[user_id] = UserProfile()
+            self._counts["built"] += 1
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(Bookmark.id).where(Bookmark.user_id == user_id)
+            )
+            current = set(result.scalars())
+            known = profile.bookmark_ids
+            for bookmark_id in known - current:
+                profile.remove(bookmark_id)
+            added = current - known
+            if added:
+                result = await session.execute(
+                    select(Bookmark).where(Bookmark.id.in_(added))
+                )
+                for bookmark in result.scalars():
+                    profile.add(bookmark.id, _bookmark_article(bookmark))
+        self._counts["removed"] += len(known - current)
+        self._counts["added"] += len(added)
+        return profile
+
+    def _vector(self, article: NewsArticle) -> Vector:
+        """Get the vector of a candidate article, cached by id."""
+        key = article.id or article.url
+        vector = self._vectors.get(key)
+        if vector is None:
+            vector = self._vectors[key] = article_vector(article)
+        return vector
+
+    async def feed(
+        self,
+        user_id: int,
+        limit: int = 20,
+        category: Optional[str] = None,
+    ) -> List[NewsArticle]:
+        """Get the recent articles ranked for a user.
+
+        Articles the user bookmarked are left out. Without bookmarks, or
+        between equally scored articles, newer articles come first.
+
+        Args:
+            user_id: User id.
+            limit: Maximum number of articles.
+            category: Only rank articles of this category, if given.
+
+        Returns:
+            List[NewsArticle]: Articles, best match first.
+        """
+        profile = await self.profile(user_id)
+        bookmarked = profile.bookmarked
+        articles = [
+            article for article in await self.article_store.recent(
+                category=category, limit=self.candidates,
+            )
+            if article.id not in bookmarked and article.url not in bookmarked
+        ]
+        scores = score_articles(
+            profile.vector, [self._vector(article) for article in articles],
+        )
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [articles[index] for index in order]
+
+    def stats(self) -> Dict[str, Any]:
+        """Get ranker counters.
+
+        Returns:
+            Dict[str, Any]: Profiles built, bookmarks added to and removed
+            from profiles, and cached profiles and vectors.
+        """
+        return {
+            **self._counts,
+            "profiles": len(self._profiles),
+            "vectors": len(self._vectors),
+        }
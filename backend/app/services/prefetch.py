@@ -0,0 +1,270 @@
+"""Background prefetching of top headlines and search pages."""
+import asyncio
+import logging
+import time
+from contextlib import suppress
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from cachetools import TTLCache
+
+from app.core.quota import Priority
+from app.models.records import ArticleRecord, to_articles, to_records
+from app.models.schemas import NewsArticle, NewsSearchParams
+from app.services.aggregator import ArticlePage, NewsAggregator
+
+logger = logging.getLogger(__name__)
+
+HeadlineKey = Tuple[Optional[str], str]
+
+
+class HeadlinePrefetcher:
+    """Keeps an in-memory snapshot of top headlines fresh.
+
+    A combination whose refreshes keep failing is not served past the
+    max age of its snapshot, so lookups fall through to upstream.
+    """
+
+    def __init__(
+        self,
+        aggregator: NewsAggregator,
+        categories: Sequence[str],
+        countries: Sequence[str],
+        interval: int = 1800,
+        page_size: int = 100,
+        max_age: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the prefetcher.
+
+        Args:
+            aggregator: Aggregator used to fetch headlines.
+            categories: Categories to prefetch.
+            countries: Country codes to prefetch.
+            interval: Seconds between two refreshes.
+            page_size: Number of headlines fetched per combination.
+            max_age: Seconds a snapshot is served, twice the interval
+                by default.
+            clock: Monotonic time source.
+        """
+        self.aggregator = aggregator
+        self.categories = list(categories)
+        self.countries = list(countries)
+        self.interval = interval
+        self.page_size = page_size
+        self.max_age = 2 * interval if max_age is None else max_age
+        self._clock = clock
+        self._snapshot: Dict[
+            HeadlineKey, Tuple[float, List[ArticleRecord]]
+        ] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def combinations(self) -> List[HeadlineKey]:
+        """Get every (category, country) combination to prefetch.
+
+        Returns:
+            List[HeadlineKey]: Combinations, including "no category".
+        """
+        categories: List[Optional[str]] = [None, *self.categories]
+        return [
+            (category, country)
+            for country in self.countries
+            for category in categories
+        ]
+
+    def daily_calls(self) -> float:
+        """Get the upstream calls the refreshes make per day.
+
+        Returns:
+            float: Calls per day, one per combination and refresh.
+        """
+        return len(self.combinations()) * 86400 / self.interval
+
+    def lookup(
+        self,
+        category: Optional[str],
+        country: str,
+        page_size: int,
+    ) -> Optional[List[NewsArticle]]:
+        """Get headlines from the snapshot.
+
+        Args:
+            category: News category.
+            country: Country code.
+            page_size: Number of articles to return.
+
+        Returns:
+            Optional[List[NewsArticle]]: Headlines, or None if the
+            combination was never prefetched, its snapshot is older than
+            the max age or cannot satisfy the requested page size.
+        """
+        snapshot = self._snapshot.get((category, country))
+        if snapshot is None:
+            return None
+        fetched_at, records = snapshot
+        if self._clock() - fetched_at > self.max_age:
+            return None
+        if page_size > self.page_size and len(records) >= self.page_size:
+            return None
+        return to_articles(records[:page_size])
+
+    async def refresh(self) -> None:
+        """Refresh every combination concurrently."""
+        keys = self.combinations()
+        results = await asyncio.gather(
+            *(self._fetch(category, country) for category, country in keys),
+            return_exceptions=True,
+        )
+        for key, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                logger.warning("Headline prefetch failed for %s: %s",
+                               key, result)
+                continue
+            self._snapshot[key] = (self._clock(), to_records(result))
+
+    async def _fetch(
+        self,
+        category: Optional[str],
+        country: str,
+    ) -> List[NewsArticle]:
+        """Fetch headlines for one combination."""
+        return await self.aggregator.get_top_headlines(
+            category=category,
+            country=country,
+            page_size=self.page_size,
+            priority=Priority.BACKGROUND,
+        )
+
+    async def _run(self) -> None:
+        """Refresh the snapshot forever at a fixed interval."""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background refresh task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+def search_page_key(params: NewsSearchParams) -> tuple:
+    """Get the key identifying one page of a search.
+
+    Args:
+        params: Search parameters.
+
+    Returns:
+        tuple: Hashable key of the page.
+    """
+    return (
+        params.query,
+        params.category,
+        params.language,
+        params.page_size,
+        params.page,
+        params.local,
+    )
+
+
+class SearchPagePrefetcher:
+    """Speculatively fetches the next page of searches being browsed.
+
+    Prefetching is capped so that it cannot eat the upstream quota: only
+    pages up to max_page are prefetched, at most max_in_flight at a time,
+    and in the background lane.
+    """
+
+    def __init__(
+        self,
+        aggregator: NewsAggregator,
+        ttl: int = 120,
+        max_size: int = 256,
+        max_page: int = 5,
+        max_in_flight: int = 2,
+    ) -> None:
+        """Initialize the prefetcher.
+
+        Args:
+            aggregator: Aggregator used to fetch pages.
+            ttl: Seconds a prefetched page stays servable.
+            max_size: Maximum number of prefetched pages kept.
+            max_page: Highest page number that is prefetched.
+            max_in_flight: Maximum number of concurrent prefetches.
+        """
+        self.aggregator = aggregator
+        self.max_page = max_page
+        self.max_in_flight = max_in_flight
+        self._pages: TTLCache = TTLCache(maxsize=max_size, ttl=ttl)
+        self._pending: Dict[tuple, asyncio.Task] = {}
+        self._counts = {"hits": 0, "scheduled": 0, "skipped": 0}
+
+    def lookup(self, params: NewsSearchParams) -> Optional[ArticlePage]:
+        """Get a prefetched page.
+
+        Args:
+            params: Search parameters of the page.
+
+        Returns:
+            Optional[ArticlePage]: The page, or None if it was not
+            prefetched or has expired.
+        """
+        prefetched = self._pages.get(search_page_key(params))
+        if prefetched is None:
+            return None
+        self._counts["hits"] += 1
+        records, has_next = prefetched
+        return ArticlePage(to_articles(records), has_next)
+
+    def schedule(self, params: NewsSearchParams) -> None:
+        """Prefetch a page in the background, unless capped.
+
+        Args:
+            params: Search parameters of the page to prefetch.
+        """
+        key = search_page_key(params)
+        if key in self._pages or key in self._pending:
+            return
+        if (
+            params.page > self.max_page
+            or len(self._pending) >= self.max_in_flight
+        ):
+            self._counts["skipped"] += 1
+            return
+        self._counts["scheduled"] += 1
+        self._pending[key] = asyncio.create_task(self._fetch(key, params))
+
+    async def _fetch(self, key: tuple, params: NewsSearchParams) -> None:
+        """Fetch one page into the prefetched pages."""
+        try:
+            page = await self.aggregator.search_page(
+                params, Priority.BACKGROUND,
+            )
+            self._pages[key] = (to_records(page.articles), page.has_next)
+        except Exception as e:
+            logger.info("Search page prefetch failed: %s", e)
+        finally:
+            self._pending.pop(key, None)
+
+    async def stop(self) -> None:
+        """Cancel every pending prefetch."""
+        tasks = list(self._pending.values())
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+
+    def stats(self) -> Dict[str, Any]:
+        """Get prefetch counters.
+
+        Returns:
+            Dict[str, Any]: Hits, scheduled and skipped prefetches.
+        """
+        return {**self._counts, "in_flight": len(self._pending)}
@@ -0,0 +1,428 @@
+"""Process-lifetime registry of shared services."""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from fastapi import FastAPI, Request
+
+from app.core.cache import Cache
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.config import settings
+from app.core.process_pool import create_process_pool
+from app.core.quota import UpstreamScheduler
+from app.services.aggregator import NewsAggregator
+from app.services.article_store import ArticleStore
+from app.services.dedup import NearDuplicateIndex
+from app.services.enrichment import ArticleEnricher
+from app.services.extraction import HttpPageFetcher
+from app.services.images import ThumbnailCache, ThumbnailService
+from app.services.ingestion import Feed, IncrementalIngester, WatermarkStore
+from app.services.news import NewsService, create_news_api_client
+from app.services.news_client import AsyncNewsApiClient
+from app.services.personalization import FeedRanker
+from app.services.prefetch import HeadlinePrefetcher, SearchPagePrefetcher
+from app.services.related import RelatedArticlesIndex
+from app.services.search import ArticleSearchEngine
+from app.services.trending import TrendingEngine
+from app.services.sources import NewsApiSource, NewsSource, RssSource
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """Registry of services built once at startup and closed on shutdown."""
+
+    def __init__(self, cache: Cache) -> None:
+        """Initialize the registry.
+
+        Args:
+            cache: Response cache shared with the cache middleware.
+        """
+        self.cache = cache
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self.article_store: Optional[ArticleStore] = None
+        self.news_client: Optional[AsyncNewsApiClient] = None
+        self.news_service: Optional[NewsService] = None
+        self.news_aggregator: Optional[NewsAggregator] = None
+        self.headline_prefetcher: Optional[HeadlinePrefetcher] = None
+        self.search_prefetcher: Optional[SearchPagePrefetcher] = None
+        self.ingester: Optional[IncrementalIngester] = None
+        self.article_enricher: Optional[ArticleEnricher] = None
+        self.thumbnail_service: Optional[ThumbnailService] = None
+        self.trending: Optional[TrendingEngine] = None
+        self.feed_ranker: Optional[FeedRanker] = None
+        self.related: Optional[RelatedArticlesIndex] = None
+
+    async def startup(self) -> None:
+        """Build the upstream clients and services."""
+        self.process_pool = create_process_pool(
+            settings.PROCESS_POOL_WORKERS,
+        )
+        self.article_store = ArticleStore()
+        self.trending = TrendingEngine(
+            width=settings.TRENDING_SKETCH_WIDTH,
+            depth=settings.TRENDING_SKETCH_DEPTH,
+            capacity=settings.TRENDING_CANDIDATES,
+        )
+        self.article_store.add_listener(self.trending.observe)
+        self.feed_ranker = FeedRanker(
+            self.article_store,
+            candidates=settings.FEED_CANDIDATES,
+            max_profiles=settings.FEED_PROFILE_CACHE_SIZE,
+            max_vectors=settings.FEED_VECTOR_CACHE_SIZE,
+        )
+        self.related = RelatedArticlesIndex(
+            self.article_store,
+            dimensions=settings.RELATED_DIMENSIONS,
+            shortlist=settings.RELATED_SHORTLIST,
+            max_size=settings.RELATED_MAX_ARTICLES,
+            warm_size=settings.RELATED_WARM_ARTICLES,
+        )
+        self.article_store.add_listener(self.related.add)
+        if not settings.TESTING:
+            self.related.start()
+        self.news_client = create_news_api_client(settings.NEWS_API_KEY)
+        self.news_service = NewsService(
+            client=self.news_client,
+            article_store=self.article_store,
+            search_engine=(
+                ArticleSearchEngine(max_age=settings.LOCAL_SEARCH_MAX_AGE)
+                if settings.LOCAL_SEARCH_ENABLED else None
+            ),
+            scheduler=UpstreamScheduler(
+                rate_per_second=settings.NEWS_API_RATE_PER_SECOND,
+                burst=settings.NEWS_API_BURST,
+                daily_budget=settings.NEWS_API_DAILY_QUOTA,
+                interactive_reserve=settings.NEWS_API_INTERACTIVE_RESERVE,
+                interactive_max_wait=settings.NEWS_API_INTERACTIVE_MAX_WAIT,
+                background_max_wait=settings.NEWS_API_BACKGROUND_MAX_WAIT,
+            ),
+            breaker=CircuitBreaker(
+                failure_threshold=settings.NEWS_API_BREAKER_FAILURE_THRESHOLD,
+                slow_call_threshold=settings.NEWS_API_BREAKER_SLOW_CALL,
+                reset_timeout=settings.NEWS_API_BREAKER_RESET_TIMEOUT,
+                half_open_max_calls=settings.NEWS_API_BREAKER_HALF_OPEN_CALLS,
+            ),
+            last_good_size=settings.NEWS_LAST_GOOD_MAX_SIZE,
+        )
+        self.news_aggregator = NewsAggregator(
+            self._build_sources(),
+            budget=settings.NEWS_AGGREGATION_BUDGET,
+            dedup=(
+                NearDuplicateIndex(
+                    threshold=settings.NEWS_DEDUP_THRESHOLD,
+                    max_size=settings.NEWS_DEDUP_INDEX_SIZE,
+                )
+                if settings.NEWS_DEDUP_ENABLED else None
+            ),
+        )
+        self.headline_prefetcher = HeadlinePrefetcher(
+            self.news_aggregator,
+            categories=settings.NEWS_CATEGORIES,
+            countries=settings.HEADLINES_PREFETCH_COUNTRIES,
+            interval=settings.HEADLINES_PREFETCH_INTERVAL,
+            page_size=settings.HEADLINES_PREFETCH_PAGE_SIZE,
+            max_age=settings.HEADLINES_PREFETCH_MAX_AGE,
+        )
+        if settings.HEADLINES_PREFETCH_ENABLED and not settings.TESTING:
+            self._check_prefetch_budget()
+            self.headline_prefetcher.start()
+        self.ingester = IncrementalIngester(
+            self.news_service,
+            WatermarkStore(),
+            self._build_feeds(),
+            page_size=settings.INGESTION_PAGE_SIZE,
+            max_pages=settings.INGESTION_MAX_PAGES,
+            interval=settings.INGESTION_INTERVAL,
+        )
+        if self.ingester.feeds and not settings.TESTING:
+            self.ingester.start()
+        self.search_prefetcher = SearchPagePrefetcher(
+            self.news_aggregator,
+            ttl=settings.NEWS_SEARCH_PREFETCH_TTL,
+            max_size=settings.NEWS_SEARCH_PREFETCH_MAX_SIZE,
+            max_page=settings.NEWS_SEARCH_PREFETCH_MAX_PAGE,
+            max_in_flight=settings.NEWS_SEARCH_PREFETCH_MAX_IN_FLIGHT,
+        )
+        if settings.ARTICLE_EXTRACTION_ENABLED:
+            self.article_enricher = ArticleEnricher(
+                self.article_store,
+                HttpPageFetcher(
+                    timeout=settings.ARTICLE_FETCH_TIMEOUT,
+                    max_bytes=settings.ARTICLE_FETCH_MAX_BYTES,
+                ),
+                executor=self.process_pool,
+                batch_size=settings.ARTICLE_EXTRACTION_BATCH_SIZE,
+                interval=settings.ARTICLE_EXTRACTION_INTERVAL,
+            )
+            if not settings.TESTING:
+                self.article_enricher.start()
+        self.thumbnail_service = ThumbnailService(
+            ThumbnailCache(
+                settings.THUMBNAIL_CACHE_DIR,
+                max_bytes=settings.THUMBNAIL_CACHE_MAX_BYTES,
+            ),
+            self.process_pool,
+            max_size=(settings.THUMBNAIL_WIDTH, settings.THUMBNAIL_HEIGHT),
+            max_source_bytes=settings.IMAGE_FETCH_MAX_BYTES,
+            timeout=settings.IMAGE_FETCH_TIMEOUT,
+        )
+
+    def _check_prefetch_budget(self) -> None:
+        """Warn if headline prefetching outspends the background quota."""
+        calls = self.headline_prefetcher.daily_calls()
+        budget = self.news_service.scheduler.background_budget
+        if calls > budget:
+            logger.warning(
+                "Headline prefetching makes %d upstream calls a day but "
+                "background calls may only make %d: raise "
+                "HEADLINES_PREFETCH_INTERVAL or NEWS_API_DAILY_QUOTA",
+                calls, budget,
+            )
+
+    def _build_feeds(self) -> List[Feed]:
+        """Build the feeds ingested incrementally."""
+        common = {
+            "country": settings.INGESTION_COUNTRY,
+            "language": settings.INGESTION_LANGUAGE,
+        }
+        return [
+            *(Feed(query=query, **common)
+              for query in settings.INGESTION_QUERIES),
+            *(Feed(category=category, **common)
+              for category in settings.INGESTION_CATEGORIES),
+        ]
+
+    def _build_sources(self) -> List[NewsSource]:
+        """Build the configured news source adapters."""
+        sources: List[NewsSource] = [
+            NewsApiSource(
+                self.news_service, timeout=settings.NEWS_API_SOURCE_TIMEOUT,
+            ),
+        ]
+        if settings.RSS_FEEDS:
+            sources.append(RssSource(
+                settings.RSS_FEEDS,
+                timeout=settings.RSS_SOURCE_TIMEOUT,
+                ttl=settings.RSS_FEED_TTL,
+                article_store=self.article_store,
+            ))
+        return sources
+
+    async def _stop_background_tasks(self) -> None:
+        """Stop the services running background tasks."""
+        for service in (
+            self.headline_prefetcher,
+            self.search_prefetcher,
+            self.ingester,
+            self.article_enricher,
+            self.related,
+        ):
+            if service is not None:
+                await service.stop()
+
+    async def shutdown(self) -> None:
+        """Close the upstream clients and services."""
+        await self._stop_background_tasks()
+        if self.thumbnail_service is not None:
+            await self.thumbnail_service.close()
+        if self.news_aggregator is not None:
+            await self.news_aggregator.close()
+        if self.news_service is not None:
+            await self.news_service.close()
+        if self.news_client is not None:
+            await self.news_client.aclose()
+        await self.cache.close()
+        self.headline_prefetcher = None
+        self.search_prefetcher = None
+        self.ingester = None
+        self.article_enricher = None
+        self.thumbnail_service = None
+        self.trending = None
+        self.feed_ranker = None
+        self.related = None
+        self.news_aggregator = None
+        self.news_service = None
+        self.news_client = None
+        self.article_store = None
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+            self.process_pool = None
+
+    @asynccontextmanager
+    async def lifespan(self, app: FastAPI) -> AsyncIterator[None]:
+        """FastAPI lifespan handler managing the registry.
+
+        Args:
+            app: The FastAPI application.
+        """
+        await self.startup()
+        app.state.services = self
+        try:
+            yield
+        finally:
+            await self.shutdown()
+
+
+def get_registry(request: Request) -> ServiceRegistry:
+    """Get the service registry of the running application.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        ServiceRegistry: The application service registry.
+
+    Raises:
+        RuntimeError: If the application lifespan has not started.
+    """
+    registry = getattr(request.app.state, "services", None)
+    if registry is None:
+        raise RuntimeError("Service registry is not initialized")
+    return registry
+
+
+def get_news_service(request: Request) -> NewsService:
+    """Get the shared NewsService instance.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        NewsService: The process-wide news service.
+    """
+    return get_registry(request).news_service
+
+
+def get_news_aggregator(request: Request) -> NewsAggregator:
+    """Get the shared NewsAggregator instance.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        NewsAggregator: The process-wide news aggregator.
+    """
+    return get_registry(request).news_aggregator
+
+
+def get_response_cache(request: Request) -> Cache:
+    """Get the response cache shared with the cache middleware.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        Cache: The process-wide response cache.
+    """
+    return get_registry(request).cache
+
+
+def get_article_store(request: Request) -> ArticleStore:
+    """Get the shared article store.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        ArticleStore: The process-wide article store.
+    """
+    return get_registry(request).article_store
+
+
+def get_article_enricher(request: Request) -> Optional[ArticleEnricher]:
+    """Get the shared article enricher.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        Optional[ArticleEnricher]: The process-wide article enricher, or
+        None if extraction is disabled.
+    """
+    return get_registry(request).article_enricher
+
+
+def get_thumbnail_service(request: Request) -> ThumbnailService:
+    """Get the shared thumbnail service.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        ThumbnailService: The process-wide thumbnail service.
+    """
+    return get_registry(request).thumbnail_service
+
+
+def get_trending_engine(request: Request) -> TrendingEngine:
+    """Get the shared trending engine.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        TrendingEngine: The process-wide trending engine.
+    """
+    return get_registry(request).trending
+
+
+def get_feed_ranker(request: Request) -> FeedRanker:
+    """Get the shared feed ranker.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        FeedRanker: The process-wide feed ranker.
+    """
+    return get_registry(request).feed_ranker
+
+
+def get_related_index(request: Request) -> RelatedArticlesIndex:
+    """Get the shared related articles index.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        RelatedArticlesIndex: The process-wide related articles index.
+    """
+    return get_registry(request).related
+
+
+def get_ingester(request: Request) -> IncrementalIngester:
+    """Get the shared incremental ingester.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        IncrementalIngester: The process-wide incremental ingester.
+    """
+    return get_registry(request).ingester
+
+
+def get_headline_prefetcher(request: Request) -> HeadlinePrefetcher:
+    """Get the shared headline prefetcher.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        HeadlinePrefetcher: The process-wide headline prefetcher.
+    """
+    return get_registry(request).headline_prefetcher
+
+
+def get_search_prefetcher(request: Request) -> SearchPagePrefetcher:
+    """Get the shared search page prefetcher.
+
+    Args:
+        request: The current request.
+
+    Returns:
+        SearchPagePrefetcher: The process-wide search page prefetcher.
+    """
+    return get_registry(request).search_prefetcher
@@ -0,0 +1,268 @@
+"""Related articles from an approximate nearest-neighbor index.
+
+Every article is reduced to a hashed TF-IDF vector of its terms, which
+is projected onto a few hundred random +1/-1 directions: the resulting
+dense float32 vector keeps cosine similarities approximately, at a
+fixed size. Vectors are stored unit-length, one row each, in a single
+float32 matrix.
+
+Neighbors are searched on binary codes first: each vector is also
+summarized by the side of random hyperplanes it lies on, and the
+Hamming distance of two codes estimates the angle between the vectors.
+Codes take 32 bytes per article and are compared to the query all at
+once with XOR and popcount; only the shortlist of closest codes is
+then ranked on the float32 matrix.
+
+Document frequencies grow as articles are indexed, and each article is
+weighted with the frequencies known when it was indexed.
+"""
+import asyncio
+import logging
+import zlib
+from contextlib import suppress
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.schemas import NewsArticle
+from app.services.article_store import ArticleStore, article_id_for_url
+from app.services.trending import extract_terms
+
+logger = logging.getLogger(__name__)
+
+
+def _grow(array: np.ndarray, rows: int) -> np.ndarray:
+    """Copy an array into a larger zeroed one with the given rows."""
+    grown = np.zeros((rows,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class RelatedArticlesIndex:
+    """Incremental index of stored articles by similarity.
+
+    The index is bounded: beyond max_size articles, the oldest indexed
+    ones are overwritten first.
+    """
+
+    def __init__(
+        self,
+        article_store: ArticleStore,
+        dimensions: int = 256,
+        features: int = 1 << 16,
+        bits: int = 256,
+        shortlist: int = 1024,
+        max_size: int = 50_000,
+        warm_size: int = 10_000,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            article_store: Store the returned articles are read from.
+            dimensions: Size of the projected vectors.
+            features: Size of the hashed term space.
+            bits: Hyperplanes of the binary codes, a multiple of 64.
+            shortlist: Closest codes ranked on the vectors per query.
+            max_size: Maximum number of indexed articles.
+            warm_size: Most recent stored articles indexed on start.
+            seed: Seed of the random projection and hyperplanes.
+        """
+        self.article_store = article_store
+        self.max_size = max_size
+        self.warm_size = warm_size
+        self.features = features
+        self.shortlist = shortlist
+        rng = np.random.default_rng(seed)
+        # Projection entries are +1/-1 with the 1/sqrt(dimensions)
+        # scale left out, as vectors are normalized afterwards
+        self._projection = (
+            rng.integers(0, 2, (features, dimensions), dtype=np.int8) * 2 - 1
+        )
+        self._planes = rng.standard_normal(
+            (bits, dimensions),
+        ).astype(np.float32)
+        self._frequencies = np.zeros(features, dtype=np.int32)
+        self._documents = 0
+        self._matrix = np.zeros((0, dimensions), dtype=np.float32)
+        self._codes = np.zeros((0, bits // 64), dtype=np.uint64)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+        self._counts = {"queries": 0}
+
+    def __len__(self) -> int:
+        """Get the number of indexed articles."""
+        return len(self._rows)
+
+    def _vectorize(self, article: NewsArticle) -> Optional[np.ndarray]:
+        """Get the unit-length projected TF-IDF vector of an article."""
+        terms, _ = extract_terms(article)
+        if not terms:
+            return None
+        indices = np.unique(np.fromiter(
+            (zlib.crc32(term.encode()) % self.features for term in terms),
+            dtype=np.int64,
+            count=len(terms),
+        ))
+        self._documents += 1
+        self._frequencies[indices] += 1
+        weights = np.log(
+            (1 + self._documents) / (1 + self._frequencies[indices])
+        ) + 1
+        vector = weights.astype(np.float32) @ self._projection[indices]
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    def _code(self, vector: np.ndarray) -> np.ndarray:
+        """Get the binary code of a vector, packed in 64-bit words."""
+        return np.packbits(self._planes @ vector > 0).view(np.uint64)
+
+    def add(self, articles: Iterable[NewsArticle]) -> None:
+        """Index articles not indexed yet.
+
+        Args:
+            articles: Articles to index, oldest first.
+        """
+        for article in articles:
+            article_id = article.id or article_id_for_url(article.url)
+            if article_id in self._rows:
+                continue
+            vector = self._vectorize(article)
+            if vector is None:
+                continue
+            row = self._allocate()
+            self._matrix[row] = vector
+            self._codes[row] = self._code(vector)
+            self._ids[row] = article_id
+            self._rows[article_id] = row
+
+    def _allocate(self) -> int:
+        """Get a free row, growing the matrix or evicting the oldest."""
+        size = len(self._ids)
+        if size < self.max_size:
+            if size == len(self._matrix):
+                capacity = min(max(2 * size, 1024), self.max_size)
+                self._matrix = _grow(self._matrix, capacity)
+                self._codes = _grow(self._codes, capacity)
+            self._ids.append("")
+            return size
+        row = self._next
+        self._next = (row + 1) % self.max_size
+        del self._rows[self._ids[row]]
+        return row
+
+    def _candidates(self, row: int) -> np.ndarray:
+        """Get the rows whose codes are closest to the code of a row."""
+        size = len(self._ids)
+        if size - 1 <= self.shortlist:
+            candidates = np.arange(size)
+        else:
+            distances = np.bitwise_count(
+                self._codes[:size] ^ self._codes[row]
+            ).sum(axis=1, dtype=np.int32)
+            distances[row] = np.iinfo(np.int32).max
+            candidates = np.argpartition(distances, self.shortlist)[
+                :self.shortlist
+            ]
+        return candidates[candidates != row]
+
+    def nearest(self, article_id: str, limit: int) -> List[Tuple[str, float]]:
+        """Find the indexed articles most similar to an indexed article.
+
+        Args:
+            article_id: Id of an indexed article.
+            limit: Maximum number of neighbors.
+
+        Returns:
+            List[Tuple[str, float]]: Neighbor ids with their estimated
+            cosine similarity, most similar first.
+
+        Raises:
+            KeyError: If the article is not indexed.
+        """
+        row = self._rows[article_id]
+        self._counts["queries"] += 1
+        candidates = self._candidates(row)
+        if not len(candidates):
+            return []
+        similarities = self._matrix[candidates] @ self._matrix[row]
+        if len(candidates) > limit:
+            best = np.argpartition(-similarities, limit)[:limit]
+        else:
+            best = np.arange(len(candidates))
+        best = best[np.argsort(-similarities[best], kind="stable")]
+        return [
+            (self._ids[candidates[i]], float(similarities[i])) for i in best
+        ]
+
+    async def related(
+        self,
+        article_id: str,
+        limit: int = 10,
+    ) -> Optional[List[NewsArticle]]:
+        """Get the stored articles most similar to a stored article.
+
+        Articles not indexed yet, for instance older than the warm-up,
+        are indexed first.
+
+        Args:
+            article_id: Article identifier.
+            limit: Maximum number of articles.
+
+        Returns:
+            Optional[List[NewsArticle]]: Related articles, most similar
+            first, or None if the article is not stored.
+        """
+        if article_id not in self._rows:
+            article = await self.article_store.get(article_id)
+            if article is None:
+                return None
+            self.add([article])
+            if article_id not in self._rows:
+                return []
+        neighbors = self.nearest(article_id, limit)
+        return await self.article_store.get_many(
+            [neighbor for neighbor, _ in neighbors]
+        )
+
+    async def warm(self) -> None:
+        """Index the most recent stored articles."""
+        articles = await self.article_store.recent(limit=self.warm_size)
+        self.add(reversed(articles))
+        logger.info("Indexed %d related articles", len(self))
+
+    def start(self) -> None:
+        """Start indexing recent articles in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._warm_quietly())
+
+    async def _warm_quietly(self) -> None:
+        """Warm the index, logging failures."""
+        try:
+            await self.warm()
+        except Exception as e:
+            logger.warning("Warming the related articles index failed: %s",
+                           e)
+
+    async def stop(self) -> None:
+        """Stop warming the index."""
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get index counters.
+
+        Returns:
+            Dict[str, Any]: Indexed articles, queries, and the size of
+            the vectors and codes in bytes.
+        """
+        return {
+            **self._counts,
+            "indexed": len(self),
+            "bytes": self._matrix.nbytes + self._codes.nbytes,
+        }
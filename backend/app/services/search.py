@@ -0,0 +1,150 @@
+"""Local full-text search over stored articles."""
+import re
+from datetime import UTC, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import (
+    Select,
+    column,
+    func,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Article
+from app.db.session import async_session_factory
+from app.models.schemas import NewsArticle, NewsSearchParams
+from app.services.article_store import row_to_article
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+_articles_fts = table("articles_fts", column("rowid"))
+
+# BM25 column weights: title matches count more than description ones,
+# which count more than matches in the extracted body
+_RANK = text("bm25(articles_fts, 4.0, 1.0, 0.5)")
+
+
+def build_match_query(query: Optional[str]) -> Optional[str]:
+    """Build an FTS5 MATCH expression from free text.
+
+    Every word is quoted, so user input can never be interpreted as
+    FTS5 query syntax. Words are implicitly ANDed.
+
+    Args:
+        query: Free-text search query.
+
+    Returns:
+        Optional[str]: MATCH expression, or None if there are no words.
+    """
+    words = _WORD.findall(query or "")
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+class ArticleSearchEngine:
+    """BM25-ranked full-text search over the local article store."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = async_session_factory,
+        max_age: float = 6 * 3600,
+    ) -> None:
+        """Initialize the search engine.
+
+        Args:
+            session_factory: Factory creating database sessions.
+            max_age: Seconds after which the newest match of a query is
+                too old for the corpus to cover it.
+        """
+        self.session_factory = session_factory
+        self.max_age = max_age
+
+    def _matching(
+        self,
+        statement: Select,
+        params: NewsSearchParams,
+    ) -> Select:
+        """Restrict a statement to the matches of a search."""
+        return (
+            statement
+            .join(
+                _articles_fts,
+                literal_column("articles_fts.rowid")
+                == literal_column("articles.rowid"),
+            )
+            .where(text("articles_fts MATCH :match"))
+            .where(or_(
+                Article.language == params.language,
+                Article.language.is_(None),
+            ))
+        )
+
+    async def search(self, params: NewsSearchParams) -> List[NewsArticle]:
+        """Search stored articles.
+
+        Articles of unknown language match every language.
+
+        Args:
+            params: Search parameters.
+
+        Returns:
+            List[NewsArticle]: The requested page, best matches first.
+        """
+        match = build_match_query(params.query)
+        if match is None:
+            return []
+
+        statement = (
+            self._matching(select(Article), params)
+            .order_by(_RANK)
+            .limit(params.page_size)
+            .offset((params.page - 1) * params.page_size)
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(statement, {"match": match})
+            return [row_to_article(row) for row in result.scalars()]
+
+    async def covers(self, params: NewsSearchParams) -> bool:
+        """Tell whether the corpus covers a query.
+
+        The corpus covers a query when it can fill a page of it and its
+        newest match is recent. As matches age, the query goes upstream
+        again, which stores newer articles. The requested page is
+        ignored, so that every page of a query is answered the same way.
+
+        Args:
+            params: Search parameters.
+
+        Returns:
+            bool: Whether the query can be answered locally.
+        """
+        match = build_match_query(params.query)
+        if match is None:
+            return False
+        statement = self._matching(
+            select(func.count(), func.max(Article.published_at)), params,
+        )
+        async with self.session_factory() as session:
+            result = await session.execute(statement, {"match": match})
+            count, newest = result.one()
+        if count < params.page_size or newest is None:
+            return False
+        # Stored as naive UTC
+        oldest = datetime.now(UTC).replace(tzinfo=None) - timedelta(
+            seconds=self.max_age,
+        )
+        return newest >= oldest
+
+    async def rebuild(self) -> None:
+        """Rebuild the full-text index from the articles table."""
+        async with self.session_factory() as session:
+            await session.execute(text(
+                "INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')"
+            ))
+            await session.commit()
@@ -0,0 +1,6 @@
+"""Adapters for the upstream sources news is aggregated from."""
+from app.services.sources.base import NewsSource
+from app.services.sources.newsapi import NewsApiSource
+from app.services.sources.rss import RssSource
+
+__all__ = ["NewsSource", "NewsApiSource", "RssSource"]
@@ -0,0 +1,71 @@
+"""Interface every news source adapter implements."""
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from app.core.quota import Priority
+from app.models.schemas import NewsArticle, NewsSearchParams
+
+
+class NewsSource(ABC):
+    """A source of news articles the aggregator fans out to.
+
+    Attributes:
+        name: Unique name of the source, used in metrics.
+        timeout: Seconds the aggregator waits for this source.
+    """
+
+    name: str = "source"
+    timeout: float = 5.0
+
+    @abstractmethod
+    async def search_articles(
+        self,
+        params: NewsSearchParams,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        """Search the source for articles.
+
+        Args:
+            params: Search parameters.
+            priority: Scheduling lane of the request.
+
+        Returns:
+            List[NewsArticle]: Matching articles.
+        """
+
+    @abstractmethod
+    async def get_top_headlines(
+        self,
+        category: Optional[str] = None,
+        country: str = "us",
+        page_size: int = 10,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        """Get the top headlines of the source.
+
+        Args:
+            category: News category.
+            country: Country code.
+            page_size: Number of articles to return.
+            priority: Scheduling lane of the request.
+
+        Returns:
+            List[NewsArticle]: Headlines.
+        """
+
+    async def close(self) -> None:
+        """Release the resources held by the source."""
+
+
+def recency_key(article: NewsArticle) -> float:
+    """Get a sort key ordering articles by publication time.
+
+    Args:
+        article: Article to order.
+
+    Returns:
+        float: Publication timestamp, or -inf when unknown.
+    """
+    if article.published_at is None:
+        return float("-inf")
+    return article.published_at.timestamp()
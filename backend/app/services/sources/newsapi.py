@@ -0,0 +1,47 @@
+"""NewsAPI source adapter."""
+from typing import List, Optional
+
+from app.core.quota import Priority
+from app.models.schemas import NewsArticle, NewsSearchParams
+from app.services.news import NewsService
+from app.services.sources.base import NewsSource
+
+
+class NewsApiSource(NewsSource):
+    """Source backed by NewsAPI through the shared NewsService."""
+
+    name = "newsapi"
+
+    def __init__(self, news_service: NewsService, timeout: float = 5.0):
+        """Initialize the source.
+
+        Args:
+            news_service: Service calling NewsAPI. It is not closed by
+                this source.
+            timeout: Seconds the aggregator waits for this source.
+        """
+        self.news_service = news_service
+        self.timeout = timeout
+
+    async def search_articles(
+        self,
+        params: NewsSearchParams,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        """Search NewsAPI, or the local index when it covers the query."""
+        return await self.news_service.search_articles(params, priority)
+
+    async def get_top_headlines(
+        self,
+        category: Optional[str] = None,
+        country: str = "us",
+        page_size: int = 10,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        """Get NewsAPI top headlines."""
+        return await self.news_service.get_top_headlines(
+            category=category,
+            country=country,
+            page_size=page_size,
+            priority=priority,
+        )
@@ -0,0 +1,178 @@
+"""RSS and Atom feed source adapter."""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Optional
+
+import httpx
+
+from app.core.quota import Priority
+from app.core.singleflight import SingleFlight
+from app.models.schemas import NewsArticle, NewsSearchParams
+from app.services.article_store import ArticleStore
+from app.services.feed_parser import FeedParser
+from app.services.sources.base import NewsSource, recency_key
+
+logger = logging.getLogger(__name__)
+
+
+def _matches(
+    article: NewsArticle,
+    terms: List[str],
+    category: Optional[str],
+) -> bool:
+    """Check whether an article contains every term and the category."""
+    if category is not None and article.category != category:
+        return False
+    text = f"{article.title} {article.description or ''}".casefold()
+    return all(term in text for term in terms)
+
+
+class RssSource(NewsSource):
+    """Source backed by a fixed set of RSS or Atom feeds.
+
+    Feeds are fetched concurrently, at most once per ttl, and searched
+    in memory. Each feed is streamed through the parser, and the
+    download stops at the first item already seen. A feed that fails to
+    load keeps its previous items.
+    """
+
+    name = "rss"
+
+    def __init__(
+        self,
+        feeds: Mapping[str, Optional[str]],
+        timeout: float = 3.0,
+        ttl: float = 300.0,
+        max_items_per_feed: int = 200,
+        article_store: Optional[ArticleStore] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the source.
+
+        Args:
+            feeds: Feed URLs mapped to the category of their articles.
+            timeout: Seconds the aggregator waits for this source.
+            ttl: Seconds a fetched feed is reused before refetching.
+            max_items_per_feed: Number of items kept per feed.
+            article_store: Optional store fetched articles are saved to.
+            client: HTTP client to use. One is created, and closed with
+                the source, if not given.
+            clock: Monotonic time source.
+        """
+        self.feeds = dict(feeds)
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_items_per_feed = max_items_per_feed
+        self.article_store = article_store
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            timeout=timeout, follow_redirects=True,
+        )
+        self.single_flight = SingleFlight()
+        self._clock = clock
+        self._items: Dict[str, List[NewsArticle]] = {}
+        self._fetched_at: Dict[str, float] = {}
+
+    async def search_articles(
+        self,
+        params: NewsSearchParams,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        """Search feed items whose title or description has every term.
+
+        Feeds carry no reliable language, so the language is ignored.
+        """
+        terms = (params.query or "").casefold().split()
+        matches = [
+            article for article in await self._articles()
+            if _matches(article, terms, params.category)
+        ]
+        start = (params.page - 1) * params.page_size
+        return matches[start:start + params.page_size]
+
+    async def get_top_headlines(
+        self,
+        category: Optional[str] = None,
+        country: str = "us",
+        page_size: int = 10,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        """Get the newest feed items.
+
+        Feeds carry no country, so every feed counts for every country.
+        """
+        matches = [
+            article for article in await self._articles()
+            if _matches(article, [], category)
+        ]
+        return matches[:page_size]
+
+    async def _articles(self) -> List[NewsArticle]:
+        """Get the items of every feed, newest first."""
+        stale = [url for url in self.feeds if self._is_stale(url)]
+        if stale:
+            await asyncio.gather(*(
+                self.single_flight.do(url, lambda url=url: self._load(url))
+                for url in stale
+            ))
+        articles = [
+            article
+            for url in self.feeds
+            for article in self._items.get(url, [])
+        ]
+        articles.sort(key=recency_key, reverse=True)
+        return articles
+
+    def _is_stale(self, url: str) -> bool:
+        """Check whether a feed is due for a refetch."""
+        fetched_at = self._fetched_at.get(url)
+        return fetched_at is None or self._clock() - fetched_at >= self.ttl
+
+    async def _load(self, url: str) -> None:
+        """Fetch and parse one feed, keeping old items on failure."""
+        previous = self._items.get(url, [])
+        watermark = max(
+            (a.published_at for a in previous if a.published_at),
+            default=None,
+        )
+        try:
+            articles = await self._stream(url, watermark)
+        except Exception as e:
+            logger.warning("Fetching feed %s failed: %s", url, e)
+        else:
+            self._items[url] = (articles + previous)[
+                :self.max_items_per_feed
+            ]
+            if articles and self.article_store is not None:
+                self.article_store.submit(articles)
+        # Failed feeds are also retried only after the ttl
+        self._fetched_at[url] = self._clock()
+
+    async def _stream(
+        self,
+        url: str,
+        watermark: Optional[datetime],
+    ) -> List[NewsArticle]:
+        """Download a feed and parse it as it arrives.
+
+        Returns:
+            List[NewsArticle]: Items newer than the watermark.
+        """
+        parser = FeedParser(url, self.feeds[url], watermark)
+        articles: List[NewsArticle] = []
+        async with self.client.stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                articles.extend(parser.feed(chunk))
+                if parser.done:
+                    return articles
+        articles.extend(parser.close())
+        return articles
+
+    async def close(self) -> None:
+        """Close the HTTP client if the source created it."""
+        if self._owns_client:
+            await self.client.aclose()
@@ -0,0 +1,423 @@
+"""Trending terms and entities over rolling time windows.
+
+Counts are kept per time slot in Count-Min Sketches, so memory does not
+grow with the number of articles or distinct terms. Each window keeps
+the sum of its live slots next to them: counting a term and estimating
+its window count cost one lookup per sketch row, and expiring a slot
+subtracts it from the sum. A bounded set of candidate heavy hitters per
+window is maintained as terms are counted, so the top terms are read
+without scanning anything.
+"""
+import hashlib
+import logging
+import re
+import time
+from array import array
+from datetime import UTC, datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from app.models.schemas import NewsArticle, TrendingTerm, TrendingTopics
+
+logger = logging.getLogger(__name__)
+
+# Window name mapped to its length and number of slots, in seconds
+DEFAULT_WINDOWS: Dict[str, Tuple[int, int]] = {
+    "1h": (3600, 12),
+    "24h": (86400, 24),
+}
+
+STOPWORDS = frozenset("""
+a about after again against all also am an and any are as at be because
+been before being between both but by can could did do does doing down
+during each few for from further had has have having he her here hers him
+his how i if in into is it its itself just me more most my new news no nor
+not now of off on once only or other our ours out over own same says she
+should so some such than that the their theirs them then there these
+they this those through to too under until up very via vs was we were
+what when where which while who whom why will with would you your
+""".split())
+
+_WORD = re.compile(r"[^\W\d_][\w'-]*[^\W_]|[^\W\d_]")
+_CAPITALIZED = re.compile(r"[A-Z][\w&'-]*")
+
+
+def _words(text: str) -> List[str]:
+    """Split text into words, without possessive endings."""
+    return [word.removesuffix("'s") for word in _WORD.findall(text)]
+
+
+def extract_terms(article: NewsArticle) -> Tuple[Set[str], Set[str]]:
+    """Get the terms and named entities of an article.
+
+    Terms are the lowercased words of the title and description, without
+    stopwords. Entities are runs of capitalized words in the title, such
+    as "Federal Reserve"; the first word of the title only counts when
+    it is not a stopword.
+
+    Args:
+        article: Article to read.
+
+    Returns:
+        Tuple[Set[str], Set[str]]: Terms and entities, each once.
+    """
+    text = f"{article.title} {article.description or ''}"
+    terms = {
+        word for word in (w.lower() for w in _words(text))
+        if len(word) > 2 and word not in STOPWORDS
+    }
+    entities = set()
+    run: List[str] = []
+    for word in _words(article.title) + [""]:
+        if _CAPITALIZED.fullmatch(word) and word.lower() not in STOPWORDS:
+            run.append(word)
+            continue
+        if run:
+            entities.add(" ".join(run))
+        run = []
+    return terms, entities
+
+
+def sketch_cells(term: str, width: int, depth: int) -> List[int]:
+    """Get the counters of a term in a sketch, one per row.
+
+    Rows hash with double hashing over a single digest. Sketches of the
+    same shape share cells, so they are computed once per term.
+
+    Args:
+        term: Term to hash.
+        width: Counters per row.
+        depth: Number of rows.
+
+    Returns:
+        List[int]: Index of the counter of every row.
+    """
+    digest = hashlib.blake2b(term.encode(), digest_size=8).digest()
+    first = int.from_bytes(digest[:4], "little")
+    second = int.from_bytes(digest[4:], "little") | 1
+    return [
+        row * width + (first + row * second) % width
+        for row in range(depth)
+    ]
+
+
+def _slot_sketch(size: int) -> array:
+    """Create an empty sketch of unsigned counters."""
+    return array("I", bytes(4 * size))
+
+
+class SlidingCountMinSketch:
+    """Count-Min Sketch over a window of fixed-length time slots."""
+
+    def __init__(
+        self,
+        window: int,
+        slots: int,
+        width: int = 2048,
+        depth: int = 4,
+    ) -> None:
+        """Initialize the sketch.
+
+        Args:
+            window: Window length in seconds.
+            slots: Number of slots the window is split into.
+            width: Counters per row.
+            depth: Rows, each with its own hash function.
+        """
+        self.slot_length = window / slots
+        self.slots = slots
+        self.width = width
+        self.depth = depth
+        self._slots: Dict[int, array] = {}
+        self._total = _slot_sketch(width * depth)
+        self._current = 0
+
+    def cells(self, term: str) -> List[int]:
+        """Get the counter of a term in every row.
+
+        Args:
+            term: Term to hash.
+
+        Returns:
+            List[int]: Index of the counter of every row.
+        """
+        return sketch_cells(term, self.width, self.depth)
+
+    def advance(self, now: float) -> bool:
+        """Move the window to end at the given time.
+
+        Args:
+            now: Current time in seconds.
+
+        Returns:
+            bool: True if slots expired.
+        """
+        current = int(now // self.slot_length)
+        if current <= self._current:
+            return False
+        self._current = current
+        expired = [
+            slot for slot in self._slots if slot <= current - self.slots
+        ]
+        for slot in expired:
+            counts = self._slots.pop(slot)
+            for cell, count in enumerate(counts):
+                if count:
+                    self._total[cell] -= count
+        return bool(expired)
+
+    def add(self, cells: List[int], timestamp: float) -> Optional[int]:
+        """Count one occurrence of a term.
+
+        Args:
+            cells: Cells of the term, from cells().
+            timestamp: When the term occurred, at most the current time.
+
+        Returns:
+            Optional[int]: The new window estimate of the term, or None if
+            the timestamp is outside the window.
+        """
+        slot = int(timestamp // self.slot_length)
+        if slot <= self._current - self.slots or slot > self._current:
+            return None
+        counts = self._slots.get(slot)
+        if counts is None:
+            counts = self._slots[slot] = _slot_sketch(
+                self.width * self.depth
+            )
+        estimate = None
+        for cell in cells:
+            counts[cell] += 1
+            self._total[cell] += 1
+            value = self._total[cell]
+            estimate = value if estimate is None else min(estimate, value)
+        return estimate
+
+    def estimate(self, term: str) -> int:
+        """Estimate how often a term occurred in the window.
+
+        Args:
+            term: Term to look up.
+
+        Returns:
+            int: Estimated count, never below the true count.
+        """
+        return min(self._total[cell] for cell in self.cells(term))
+
+
+class HeavyHitters:
+    """Bounded set of the terms with the highest estimated counts."""
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the set.
+
+        Args:
+            capacity: Maximum number of candidate terms.
+        """
+        self.capacity = capacity
+        self._counts: Dict[str, int] = {}
+        self._floor = 0
+
+    def offer(self, term: str, count: int) -> None:
+        """Record the current estimate of a term.
+
+        Args:
+            term: Counted term.
+            count: Its window estimate.
+        """
+        if term in self._counts or len(self._counts) < self.capacity:
+            self._counts[term] = count
+            return
+        # The floor is a lower bound of the weakest count, as candidates
+        # only grow between refreshes
+        if count <= self._floor:
+            return
+        weakest = min(self._counts, key=self._counts.__getitem__)
+        if count <= self._counts[weakest]:
+            self._floor = self._counts[weakest]
+            return
+        del self._counts[weakest]
+        self._counts[term] = count
+        self._floor = min(self._counts.values())
+
+    def refresh(self, estimate: Callable[[str], int]) -> None:
+        """Re-estimate every candidate after slots expired.
+
+        Args:
+            estimate: Estimator of the window count of a term.
+        """
+        self._counts = {
+            term: count for term, count in (
+                (term, estimate(term)) for term in self._counts
+            ) if count > 0
+        }
+        self._floor = min(self._counts.values(), default=0)
+
+    def __len__(self) -> int:
+        """Get the number of candidates."""
+        return len(self._counts)
+
+    def top(self, limit: int) -> List[Tuple[str, int]]:
+        """Get the candidates with the highest counts.
+
+        Args:
+            limit: Maximum number of terms.
+
+        Returns:
+            List[Tuple[str, int]]: Terms and counts, highest first.
+        """
+        ranked = sorted(
+            self._counts.items(), key=lambda item: (-item[1], item[0]),
+        )
+        return ranked[:limit]
+
+
+class _Window:
+    """Sketches and heavy hitters of terms and entities in one window."""
+
+    def __init__(self, window: int, slots: int, width: int, depth: int,
+                 capacity: int) -> None:
+        self.length = window
+        self.sketches = {
+            kind: SlidingCountMinSketch(window, slots, width, depth)
+            for kind in ("terms", "entities")
+        }
+        self.hitters = {kind: HeavyHitters(capacity) for kind in self.sketches}
+
+    def advance(self, now: float) -> None:
+        for kind, sketch in self.sketches.items():
+            if sketch.advance(now):
+                self.hitters[kind].refresh(sketch.estimate)
+
+    def add(self, kind: str, hashed: List[Tuple[str, List[int]]],
+            timestamp: float) -> None:
+        sketch = self.sketches[kind]
+        hitters = self.hitters[kind]
+        for term, cells in hashed:
+            estimate = sketch.add(cells, timestamp)
+            if estimate is not None:
+                hitters.offer(term, estimate)
+
+
+class TrendingEngine:
+    """Incrementally counts terms of ingested articles per time window.
+
+    Articles are counted at their publication time, or when they are
+    observed if it is unknown, and each article counts once per term.
+    """
+
+    def __init__(
+        self,
+        windows: Mapping[str, Tuple[int, int]] = DEFAULT_WINDOWS,
+        width: int = 2048,
+        depth: int = 4,
+        capacity: int = 200,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the engine.
+
+        Args:
+            windows: Window names mapped to their length and number of
+                slots, in seconds.
+            width: Counters per sketch row.
+            depth: Rows per sketch.
+            capacity: Candidate heavy hitters kept per window and kind.
+            clock: Wall-clock time source.
+        """
+        self.width = width
+        self.depth = depth
+        self._clock = clock
+        self._windows = {
+            name: _Window(length, slots, width, depth, capacity)
+            for name, (length, slots) in windows.items()
+        }
+        self._observed = 0
+
+    def _hash(self, terms: Iterable[str]) -> List[Tuple[str, List[int]]]:
+        """Pair terms with their sketch cells."""
+        return [
+            (term, sketch_cells(term, self.width, self.depth))
+            for term in terms
+        ]
+
+    @property
+    def windows(self) -> List[str]:
+        """Get the names of the windows."""
+        return list(self._windows)
+
+    def observe(self, articles: Iterable[NewsArticle]) -> None:
+        """Count the terms of newly ingested articles.
+
+        Args:
+            articles: Articles seen for the first time.
+        """
+        now = self._clock()
+        for window in self._windows.values():
+            window.advance(now)
+        for article in articles:
+            timestamp = now
+            if article.published_at is not None:
+                published_at = article.published_at
+                if published_at.tzinfo is None:
+                    published_at = published_at.replace(tzinfo=UTC)
+                timestamp = min(published_at.timestamp(), now)
+            terms, entities = extract_terms(article)
+            hashed_terms = self._hash(terms)
+            hashed_entities = self._hash(entities)
+            for window in self._windows.values():
+                window.add("terms", hashed_terms, timestamp)
+                window.add("entities", hashed_entities, timestamp)
+            self._observed += 1
+
+    def top(self, window: str, limit: int = 10) -> TrendingTopics:
+        """Get the top terms and entities of a window.
+
+        Args:
+            window: Window name.
+            limit: Maximum number of terms and of entities.
+
+        Returns:
+            TrendingTopics: Top terms and entities, highest count first.
+
+        Raises:
+            KeyError: If the window is unknown.
+        """
+        counted = self._windows[window]
+        counted.advance(self._clock())
+        return TrendingTopics(
+            window=window,
+            generated_at=datetime.fromtimestamp(self._clock(), UTC),
+            **{
+                kind: [
+                    TrendingTerm(term=term, count=count)
+                    for term, count in hitters.top(limit)
+                ]
+                for kind, hitters in counted.hitters.items()
+            },
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get engine counters.
+
+        Returns:
+            Dict[str, Any]: Observed articles and candidates per window.
+        """
+        return {
+            "observed": self._observed,
+            "candidates": {
+                name: {
+                    kind: len(hitters)
+                    for kind, hitters in window.hitters.items()
+                }
+                for name, window in self._windows.items()
+            },
+        }
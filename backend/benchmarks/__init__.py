@@ -0,0 +1 @@
+"""Micro-benchmarks of hot paths, run as modules from the backend dir."""
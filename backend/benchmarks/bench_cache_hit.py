@@ -0,0 +1,132 @@
+"""Benchmark of responses served from the response cache.
+
+Runs a news-like route behind CacheMiddleware, warms the cache, then
+sends GET requests straight to the ASGI app and reports the wall time
+and CPU time of a hit. For reference, it also times decoding the cached
+body and rendering it again as a JSONResponse, which hits used to do.
+
+Usage:
+    python -m benchmarks.bench_cache_hit [--requests 5000]
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import UTC, datetime, timedelta
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.core.cache import Cache
+from app.core.middleware import CacheMiddleware
+from app.models.schemas import NewsArticle
+
+PAGE_SIZES = (10, 100)
+
+
+def make_articles(count: int) -> List[NewsArticle]:
+    """Build a page of articles."""
+    published = datetime(2024, 1, 1, tzinfo=UTC)
+    return [
+        NewsArticle(
+            id=f"{i:032x}",
+            title=f"Headline number {i} about a developing story",
+            description=f"Summary {i} of what happened today, in detail.",
+            url=f"https://example.com/news/{i}",
+            source="Reuters",
+            published_at=published + timedelta(minutes=i),
+            category="technology",
+            author="Jane Doe",
+            image_url=f"https://example.com/img/{i}.jpg",
+        )
+        for i in range(count)
+    ]
+
+
+def make_app() -> CacheMiddleware:
+    """Build a cached app serving one page per page size."""
+    app = FastAPI()
+    pages = {size: make_articles(size) for size in PAGE_SIZES}
+
+    @app.get("/news")
+    async def news(page_size: int = 10) -> List[NewsArticle]:
+        return pages[page_size]
+
+    return CacheMiddleware(
+        app, Cache(max_size=100, ttl=3600), paths=["/news"],
+    )
+
+
+async def get(app: CacheMiddleware, page_size: int) -> bytes:
+    """Send one GET request to the ASGI app and return its body."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/news",
+        "raw_path": b"/news",
+        "query_string": f"page_size={page_size}".encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("bench", 80),
+    }
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(chunks)
+
+
+async def time_hits(app: CacheMiddleware, page_size: int, count: int):
+    """Time cache hits, returning wall and CPU microseconds per hit."""
+    await get(app, page_size)
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(count):
+        await get(app, page_size)
+    return (
+        (time.perf_counter() - wall) / count * 1e6,
+        (time.process_time() - cpu) / count * 1e6,
+    )
+
+
+def time_reparse(body: bytes, count: int) -> float:
+    """Time decoding a body and rendering it again, per call in us."""
+    start = time.perf_counter()
+    for _ in range(count):
+        JSONResponse(content=json.loads(body.decode()))
+    return (time.perf_counter() - start) / count * 1e6
+
+
+async def run(count: int) -> None:
+    """Run the benchmark and print the results."""
+    app = make_app()
+    print(f"{'page':>6} {'bytes':>8} {'hit wall':>10} {'hit cpu':>10}"
+          f" {'reparse':>10}")
+    for page_size in PAGE_SIZES:
+        body = await get(app, page_size)
+        wall, cpu = await time_hits(app, page_size, count)
+        reparse = time_reparse(body, count)
+        print(f"{page_size:>6} {len(body):>8} {wall:>8.1f}us {cpu:>8.1f}us"
+              f" {reparse:>8.1f}us")
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark of the memory held by in-memory article snapshots.
+
+Builds articles the way NewsAPI responses are converted, so repeated
+strings such as the source are separate objects, and measures with
+tracemalloc what a snapshot of NewsArticle models holds per article
+compared with the same snapshot as ArticleRecord objects. Converting
+records back at the API boundary is timed as well.
+
+Usage:
+    python -m benchmarks.bench_memory [--articles 1000000]
+"""
+import argparse
+import gc
+import json
+import timeit
+import tracemalloc
+from typing import List
+
+from app.models.records import to_articles, to_records
+from app.models.schemas import NewsArticle
+from app.services.news import convert_api_response_to_articles
+
+SOURCES = ["Reuters", "Associated Press", "BBC News", "CNN", "Bloomberg"]
+CATEGORIES = ["business", "general", "science", "sports", "technology"]
+AUTHORS = ["Jane Doe", "John Smith", "Staff", None]
+
+# Articles decoded per simulated upstream response
+CHUNK = 1000
+
+
+def make_chunk(start: int, count: int) -> bytes:
+    """Build a NewsAPI response body with unique articles."""
+    return json.dumps({
+        "status": "ok",
+        "articles": [
+            {
+                "source": {"id": None, "name": SOURCES[i % len(SOURCES)]},
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "author": AUTHORS[i % len(AUTHORS)],
+                "title": f"Headline number {i} about a developing story",
+                "description": f"Summary {i} of what happened today.",
+                "url": f"https://example.com/news/{i}",
+                "urlToImage": f"https://example.com/img/{i}.jpg",
+                "publishedAt": f"2024-01-{i % 28 + 1:02d}T12:00:00Z",
+            }
+            for i in range(start, start + count)
+        ],
+    }).encode()
+
+
+def build_articles(count: int) -> List[NewsArticle]:
+    """Convert count articles, one upstream-sized response at a time."""
+    articles: List[NewsArticle] = []
+    for start in range(0, count, CHUNK):
+        response = json.loads(make_chunk(start, min(CHUNK, count - start)))
+        articles.extend(convert_api_response_to_articles(response))
+    return articles
+
+
+def traced() -> int:
+    """Get the bytes currently allocated, after a full collection."""
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=1_000_000)
+    args = parser.parse_args()
+    count = args.articles
+
+    tracemalloc.start()
+    baseline = traced()
+    articles = build_articles(count)
+    before = traced() - baseline
+    records = to_records(articles)
+    del articles
+    after = traced() - baseline
+    tracemalloc.stop()
+
+    page = records[:100]
+    repeat = 1000
+    boundary = timeit.timeit(lambda: to_articles(page), number=repeat)
+
+    print(f"snapshot of {count:,} articles:")
+    print(f"  NewsArticle   {before / 2**20:9.1f} MiB"
+          f"  {before / count:7.0f} B/article")
+    print(f"  ArticleRecord {after / 2**20:9.1f} MiB"
+          f"  {after / count:7.0f} B/article"
+          f"  ({before / after:.2f}x smaller)")
+    print(f"converting 100 records at the boundary: "
+          f"{boundary / repeat * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,10 @@ from datetime import datetime
 
 @pytest.fixture
 async def async_client():
-    async with AsyncClient(app=app, base_url="http://test") as client:
-        yield client
+    # Run the lifespan, which builds the service registry of the app
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            yield client
 
 
 @pytest.fixture
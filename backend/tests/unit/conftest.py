@@ -1,10 +1,16 @@
 """Test configuration and fixtures."""
+import threading
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 from app.db.models import Base
+from app.models.schemas import NewsArticle
 
 
 async def create_test_engine():
@@ -39,6 +45,13 @@ async def engine():
     await engine.dispose()
 
 
+@pytest.fixture(scope="function")
+async def session_factory(engine):
+    """Create a session factory bound to a fresh test database."""
+    await setup_test_database(engine)
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
 @pytest.fixture(scope="function")
 async def session(engine):
     """Create a test database session."""
@@ -47,3 +60,109 @@ async def session(engine):
     yield session
     await session.rollback()
     await session.close()
+
+
+@pytest.fixture
+def make_article() -> Callable[..., NewsArticle]:
+    """Create a factory of test articles.
+
+    Articles get a title, URL and publication hour derived from their
+    index; keyword arguments override any field.
+    """
+    def make(index: int = 0, **fields) -> NewsArticle:
+        data = {
+            "title": f"Title {index}",
+            "url": f"https://example.com/articles/{index}",
+            "source": "Test Source",
+            "published_at": datetime(2024, 1, 1, index % 24, tzinfo=UTC),
+        }
+        data.update(fields)
+        return NewsArticle(**data)
+
+    return make
+
+
+@pytest.fixture
+def rss_feed() -> bytes:
+    """Create a small RSS 2.0 feed document."""
+    return b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel>
+    <title>Example News</title>
+    <item>
+      <title>First story</title>
+      <link>https://example.com/first</link>
+      <description>About the first story</description>
+      <pubDate>Mon, 01 Jan 2024 10:00:00 +0000</pubDate>
+      <dc:creator>Jane Doe</dc:creator>
+    </item>
+    <item>
+      <description>Item without title or link is skipped</description>
+    </item>
+  </channel>
+</rss>
+"""
+
+
+@pytest.fixture
+def atom_feed() -> bytes:
+    """Create a small Atom feed document."""
+    return b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example Atom</title>
+  <entry>
+    <title>Atom story</title>
+    <link rel="alternate" href="https://example.org/atom-story"/>
+    <summary>Atom summary</summary>
+    <updated>2024-01-02T08:30:00Z</updated>
+    <author><name>John Roe</name></author>
+  </entry>
+</feed>
+"""
+
+
+class StubServer(ThreadingHTTPServer):
+    """Local HTTP server answering with canned responses.
+
+    responses maps paths to (status, content type, body); unknown paths
+    get a 404. Requested paths are recorded in requests.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.responses: Dict[str, Tuple[int, str, bytes]] = {}
+        self.requests: List[str] = []
+
+    def url(self, path: str) -> str:
+        """Get the URL of a path on this server."""
+        host, port = self.server_address
+        return f"http://{host}:{port}{path}"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Request handler of StubServer."""
+
+    def do_GET(self) -> None:
+        self.server.requests.append(self.path)
+        status, content_type, body = self.server.responses.get(
+            self.path, (404, "text/plain", b"not found"),
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Run a local HTTP server for the duration of a test."""
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
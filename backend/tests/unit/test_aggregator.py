@@ -0,0 +1,148 @@
+"""Tests for the multi-source news aggregator."""
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from app.core.quota import Priority
+from app.models.schemas import NewsArticle, NewsSearchParams
+from app.services.aggregator import NewsAggregator, merge_articles
+from app.services.dedup import NearDuplicateIndex
+from app.services.news import NewsServiceError
+from app.services.sources import NewsSource
+
+
+class StubSource(NewsSource):
+    """Source returning fixed articles after a delay."""
+
+    def __init__(self, name, articles=(), delay=0.0, error=None,
+                 timeout=1.0) -> None:
+        self.name = name
+        self.articles = list(articles)
+        self.delay = delay
+        self.error = error
+        self.timeout = timeout
+
+    async def _answer(self) -> List[NewsArticle]:
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.articles
+
+    async def search_articles(
+        self,
+        params: NewsSearchParams,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        return await self._answer()
+
+    async def get_top_headlines(
+        self,
+        category: Optional[str] = None,
+        country: str = "us",
+        page_size: int = 10,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[NewsArticle]:
+        return await self._answer()
+
+
+def test_merge_deduplicates_and_orders_by_recency(make_article):
+    """Test that merged articles are unique and newest first."""
+    first = [make_article(1, url="https://a.com/1"),
+             make_article(3, url="https://a.com/3")]
+    second = [make_article(9, url="https://A.com/3#top"),
+              make_article(2, url="https://b.com/2")]
+
+    merged = merge_articles([first, second])
+
+    assert [a.url for a in merged] == [
+        "https://a.com/3", "https://b.com/2", "https://a.com/1",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_slow_source_only_costs_its_own_results(make_article):
+    """Test that a source past its deadline is dropped from the result."""
+    aggregator = NewsAggregator([
+        StubSource("fast", [make_article(1, url="https://a.com/1")]),
+        StubSource("slow", [make_article(2, url="https://b.com/1")],
+                   delay=1.0, timeout=0.05),
+    ], budget=1.0)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    articles = await aggregator.get_top_headlines()
+
+    assert loop.time() - started < 0.5
+    assert [a.url for a in articles] == ["https://a.com/1"]
+    assert aggregator.stats()["slow"]["timed_out"] == 1
+    assert aggregator.stats()["fast"]["ok"] == 1
+
+
+@pytest.mark.asyncio
+async def test_budget_bounds_the_whole_fan_out(make_article):
+    """Test that the latency budget applies even to patient sources."""
+    aggregator = NewsAggregator([
+        StubSource("fast", [make_article(1, url="https://a.com/1")]),
+        StubSource("slow", delay=1.0, timeout=5.0),
+    ], budget=0.05)
+
+    articles = await aggregator.search_articles(NewsSearchParams())
+
+    assert len(articles) == 1
+    assert aggregator.stats()["slow"]["timed_out"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_source_is_skipped(make_article):
+    """Test that errors are raised only when no source answered."""
+    error = NewsServiceError("upstream down")
+    healthy = NewsAggregator([
+        StubSource("broken", error=error),
+        StubSource("ok", [make_article(1, url="https://a.com/1")]),
+    ])
+    broken = NewsAggregator([StubSource("broken", error=error)])
+
+    assert len(await healthy.get_top_headlines()) == 1
+    with pytest.raises(NewsServiceError) as exc_info:
+        await broken.get_top_headlines()
+    assert exc_info.value is error
+
+
+@pytest.mark.asyncio
+async def test_near_duplicates_are_collapsed(make_article):
+    """Test that one story from several outlets is returned once."""
+    story = make_article(3, url="https://a.com/fed")
+    story.title = "Fed raises interest rates by a quarter point"
+    copy = make_article(2, url="https://b.com/fed")
+    copy.title = "Fed raises interest rates by a quarter point - B News"
+    copy.source = "B News"
+    aggregator = NewsAggregator(
+        [StubSource("newsapi", [story]), StubSource("rss", [copy])],
+        dedup=NearDuplicateIndex(),
+    )
+
+    articles = await aggregator.get_top_headlines()
+
+    assert [a.url for a in articles] == ["https://a.com/fed"]
+    assert articles[0].alternate_source_count == 1
+
+
+@pytest.mark.asyncio
+async def test_collapsed_page_still_has_next(make_article):
+    """Test that the next page is decided before collapsing."""
+    story = make_article(3, url="https://a.com/fed")
+    story.title = "Fed raises interest rates by a quarter point"
+    copy = make_article(2, url="https://b.com/fed")
+    copy.title = "Fed raises interest rates by a quarter point - B News"
+    aggregator = NewsAggregator(
+        [StubSource("newsapi", [story, copy])],
+        dedup=NearDuplicateIndex(),
+    )
+
+    full = await aggregator.search_page(NewsSearchParams(page_size=2))
+    last = await aggregator.search_page(NewsSearchParams(page_size=3))
+
+    assert [a.url for a in full.articles] == ["https://a.com/fed"]
+    assert full.has_next
+    assert not last.has_next
@@ -0,0 +1,143 @@
+"""Tests for the article store."""
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db.models import Article
+from app.services.article_store import ArticleStore, article_id_for_url
+
+
+async def count_articles(session_factory) -> int:
+    """Count stored articles."""
+    async with session_factory() as session:
+        result = await session.execute(select(func.count(Article.id)))
+        return result.scalar_one()
+
+
+def test_article_id_is_stable():
+    """Test that equivalent URLs hash to the same id."""
+    first = article_id_for_url("https://Example.com/a?b=1#comments")
+    second = article_id_for_url(" https://example.com/a?b=1 ")
+
+    assert first == second
+    assert first != article_id_for_url("https://example.com/a?b=2")
+    assert len(first) == 32
+
+
+@pytest.mark.asyncio
+async def test_ingest_stores_articles_once(session_factory, make_article):
+    """Test that re-ingesting the same articles stores nothing new."""
+    store = ArticleStore(session_factory)
+    articles = [make_article(i) for i in range(3)]
+
+    first = await store.ingest(articles, language="en")
+    second = await store.ingest(articles + [make_article(3)])
+
+    assert len(first) == 3
+    assert [a.title for a in second] == ["Title 3"]
+    assert await count_articles(session_factory) == 4
+
+
+@pytest.mark.asyncio
+async def test_listeners_receive_new_articles_only(
+        session_factory, make_article):
+    """Test that listeners see each stored article once."""
+    store = ArticleStore(session_factory)
+    batches = []
+    store.add_listener(batches.append)
+    store.add_listener(lambda articles: 1 / 0)
+
+    await store.ingest([make_article(0), make_article(1)])
+    await store.ingest([make_article(1), make_article(2)])
+    await store.ingest([make_article(2)])
+
+    assert [[a.title for a in batch] for batch in batches] == [
+        ["Title 0", "Title 1"], ["Title 2"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ingests_notify_each_article_once(
+        session_factory, make_article):
+    """Test that an article stored after the id lookup is not new."""
+    store = ArticleStore(session_factory)
+    batches = []
+    store.add_listener(batches.append)
+    await store.ingest([make_article(0)])
+
+    # As if another ingest stored article 0 between lookup and insert
+    store._existing_ids = AsyncMock(return_value=set())
+    stored = await store.ingest([make_article(0), make_article(1)])
+
+    assert [a.title for a in stored] == ["Title 1"]
+    assert [[a.title for a in batch] for batch in batches] == [
+        ["Title 0"], ["Title 1"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ingest_deduplicates_within_batch(session_factory, make_article):
+    """Test that duplicate URLs within one batch are stored once."""
+    store = ArticleStore(session_factory, batch_size=2)
+    articles = [make_article(i) for i in range(5)]
+    articles.append(make_article(0, title="Same URL, other title"))
+
+    stored = await store.ingest(articles)
+
+    assert len(stored) == 5
+    assert await count_articles(session_factory) == 5
+
+
+@pytest.mark.asyncio
+async def test_get_round_trip(session_factory, make_article):
+    """Test that stored articles convert back to NewsArticle."""
+    store = ArticleStore(session_factory)
+    article = make_article(7, author="Author", category="science")
+    await store.ingest([article], language="en")
+
+    stored = await store.get(article_id_for_url(article.url))
+
+    assert stored.title == article.title
+    assert stored.author == "Author"
+    assert stored.category == "science"
+    assert stored.published_at == article.published_at
+    assert await store.get("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_submit_ingests_in_background(session_factory, make_article):
+    """Test background ingestion."""
+    store = ArticleStore(session_factory)
+
+    store.submit([make_article(1), make_article(2)])
+    await store.drain()
+
+    assert await count_articles(session_factory) == 2
+
+
+@pytest.mark.asyncio
+async def test_recent_returns_newest_first(session_factory, make_article):
+    """Test that recent articles are filtered and ordered by date."""
+    store = ArticleStore(session_factory)
+    await store.ingest([
+        make_article(1, category="science"),
+        make_article(3, category="science"),
+        make_article(2, category="sports"),
+    ])
+
+    recent = await store.recent(category="science", limit=5)
+
+    assert [article.title for article in recent] == ["Title 3", "Title 1"]
+
+
+@pytest.mark.asyncio
+async def test_get_many_keeps_order(session_factory, make_article):
+    """Test that articles are returned in the requested order."""
+    store = ArticleStore(session_factory)
+    stored = await store.ingest([make_article(i) for i in range(3)])
+    ids = [article_id_for_url(article.url) for article in stored]
+
+    articles = await store.get_many([ids[2], "missing", ids[0]])
+
+    assert [a.title for a in articles] == ["Title 2", "Title 0"]
@@ -2,10 +2,10 @@
 import pytest
 from unittest.mock import patch
 from firebase_admin import auth
-from fastapi import HTTPException
+from fastapi import HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials
 
-from app.services.auth import get_current_user
+from app.services.auth import authenticate_request, get_current_user
 from app.db.models import User
 
 
@@ -74,3 +74,35 @@ async def test_get_current_user_expired_token(mock_credentials, session):
             await get_current_user(mock_credentials, session)
         assert exc_info.value.status_code == 401
         assert "Expired authentication token" in exc_info.value.detail
+
+
+def make_request(authorization: str = None) -> Request:
+    """Create a request with an optional Authorization header."""
+    headers = []
+    if authorization is not None:
+        headers.append((b"authorization", authorization.encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.asyncio
+async def test_authenticate_request(mock_firebase_user, session_factory):
+    """Test the check run before serving cached responses."""
+    async with session_factory() as session:
+        session.add(User(firebase_uid="test-uid", email="test@example.com"))
+        await session.commit()
+
+    with patch(
+        "firebase_admin.auth.verify_id_token",
+        return_value=mock_firebase_user
+    ):
+        assert await authenticate_request(
+            make_request("Bearer valid-token"), session_factory,
+        )
+        assert not await authenticate_request(
+            make_request(), session_factory,
+        )
+    with patch("firebase_admin.auth.verify_id_token",
+               side_effect=auth.InvalidIdTokenError("Invalid token", None)):
+        assert not await authenticate_request(
+            make_request("Bearer forged-token"), session_factory,
+        )
@@ -72,3 +72,33 @@ async def test_cache_expiration(cache):
 
     # Value should be expired
     assert await cache.get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_cache_per_item_ttl():
+    """Test that an explicit TTL overrides the default one."""
+    cache = Cache(max_size=10, ttl=1)
+
+    await cache.set("short", b"value")
+    await cache.set("long", b"value", ttl=60)
+
+    import time
+    time.sleep(1)
+
+    assert await cache.get("short") is None
+    assert await cache.get("long") == b"value"
+
+
+@pytest.mark.asyncio
+async def test_cache_age():
+    """Test reporting the age of cached values."""
+    cache = Cache(max_size=10, ttl=60)
+
+    await cache.set("key", b"value")
+
+    assert 0 <= await cache.age("key") < 1
+    assert await cache.age("missing") is None
+    entry = await cache.get_entry("key")
+    assert entry.value == b"value"
+    assert 0 <= cache.entry_age(entry) < 1
+    assert await cache.get_entry("missing") is None
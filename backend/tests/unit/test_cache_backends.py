@@ -0,0 +1,260 @@
+"""Tests for the shared cache backends."""
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from app.core.cache import Cache, CacheEntry, MemoryBackend
+from app.core.cache_backends import (
+    RedisBackend,
+    SQLiteBackend,
+    create_cache_backend,
+)
+from app.core.middleware import CacheMiddleware
+
+
+class FakeRedis:
+    """Local stand-in for a Redis server, speaking its protocol."""
+
+    def __init__(self, password: str = None) -> None:
+        self.password = password
+        self.data = {}
+        self.commands = []
+        self.server = None
+        self.writers = set()
+
+    async def start(self) -> int:
+        """Start listening on a free local port and return it."""
+        self.server = await asyncio.start_server(
+            self.handle, "127.0.0.1", 0,
+        )
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop the server and drop its connections."""
+        self.server.close()
+        for writer in self.writers:
+            writer.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer) -> None:
+        """Serve the commands of one connection."""
+        authenticated = self.password is None
+        self.writers.add(writer)
+        try:
+            while True:
+                count = int((await reader.readline())[1:])
+                args = []
+                for _ in range(count):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                name = args[0].decode().upper()
+                self.commands.append(name)
+                if name == "AUTH":
+                    authenticated = args[1].decode() == self.password
+                if not authenticated:
+                    writer.write(b"-NOAUTH Authentication required.\r\n")
+                else:
+                    writer.write(self.reply(name, args[1:]))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ValueError, ConnectionError):
+            writer.close()
+        finally:
+            self.writers.discard(writer)
+
+    def reply(self, name: str, args: list) -> bytes:
+        """Run a command and encode its reply."""
+        if name == "GET":
+            value, expires = self.data.get(args[0], (None, 0))
+            if value is None or expires <= time.monotonic():
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == "DEL":
+            return b":%d\r\n" % (self.data.pop(args[0], None) is not None)
+        if name == "SET":
+            ttl = int(args[3]) / 1000 if len(args) > 3 else 3600
+            self.data[args[0]] = (args[1], time.monotonic() + ttl)
+        return b"+OK\r\n"
+
+
+@pytest.fixture
+async def redis_server():
+    """Run a Redis stand-in for the duration of a test."""
+    server = FakeRedis()
+    server.port = await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_is_shared_by_workers(tmp_path):
+    """Test that caches over one database file share their entries."""
+    path = str(tmp_path / "cache" / "responses.db")
+    first = Cache(ttl=60, backend=SQLiteBackend(path))
+    second = Cache(ttl=60, backend=SQLiteBackend(path))
+
+    await first.set("key", b"value")
+    await first.set("short", b"value", ttl=0.05)
+    await asyncio.sleep(0.1)
+
+    assert await second.get("key") == b"value"
+    assert 0 <= await second.age("key") < 1
+    assert await second.get("short") is None
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_prunes_oldest_entries(tmp_path):
+    """Test that pruning keeps only the newest max_size entries."""
+    backend = SQLiteBackend(
+        str(tmp_path / "responses.db"), max_size=3, prune_interval=5,
+    )
+    now = time.time()
+    for index in range(5):
+        await backend.set(str(index), CacheEntry(b"v", now + index, 60))
+
+    assert [await backend.get(str(index)) is None for index in range(5)] == [
+        True, True, False, False, False,
+    ]
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_is_shared_by_workers(redis_server):
+    """Test that caches over one server share entries and lifetimes."""
+    url = f"redis://127.0.0.1:{redis_server.port}/0"
+    first = Cache(ttl=60, backend=RedisBackend(url))
+    second = Cache(ttl=60, backend=RedisBackend(url))
+
+    await first.set("key", b"\x00binary\r\nvalue")
+    await first.set("short", b"value", ttl=0.05)
+    await asyncio.sleep(0.1)
+
+    assert await second.get("key") == b"\x00binary\r\nvalue"
+    assert 0 <= await second.age("key") < 1
+    assert await second.get("short") is None
+    assert b"news-aggregator:key" in redis_server.data
+    await first.close()
+    await second.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_authenticates_and_selects_db(redis_server):
+    """Test that the password and database of the URL are used."""
+    redis_server.password = "s3cret"
+    url = f"redis://:s3cret@127.0.0.1:{redis_server.port}/2"
+    backend = RedisBackend(url)
+
+    await backend.set("key", CacheEntry(b"value", time.time(), 60))
+
+    assert (await backend.get("key")).value == b"value"
+    assert redis_server.commands[:3] == ["AUTH", "SELECT", "SET"]
+    await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_drops_values_without_header(redis_server):
+    """Test that a foreign or truncated value is a miss, then deleted."""
+    redis_server.data[b"news-aggregator:key"] = (
+        b"short", time.monotonic() + 60,
+    )
+    cache = Cache(backend=RedisBackend(
+        f"redis://127.0.0.1:{redis_server.port}",
+    ))
+
+    assert await cache.get("key") is None
+    assert b"news-aggregator:key" not in redis_server.data
+    assert cache.stats()["errors"] == 0
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_degrades_to_misses(redis_server):
+    """Test that an unreachable server is counted and read as a miss."""
+    cache = Cache(backend=RedisBackend(
+        f"redis://127.0.0.1:{redis_server.port}", timeout=0.5,
+    ))
+    await cache.set("key", b"value")
+    await redis_server.stop()
+
+    assert await cache.get("key") is None
+    await cache.set("key", b"value")
+
+    assert cache.stats()["errors"] == 2
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_reconnects_after_failure(redis_server):
+    """Test that a dropped connection is reopened on the next command."""
+    cache = Cache(backend=RedisBackend(
+        f"redis://127.0.0.1:{redis_server.port}",
+    ))
+    await cache.set("key", b"value")
+    cache.backend._writer.close()
+    await asyncio.sleep(0)
+
+    await cache.get("key")
+    assert await cache.get("key") == b"value"
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_counts_hits_and_misses():
+    """Test the cache counters."""
+    cache = Cache()
+    await cache.set("key", b"value")
+    await cache.get("key")
+    await cache.get("missing")
+
+    assert cache.stats() == {
+        "backend": "memory", "hits": 1, "misses": 1, "errors": 0,
+    }
+
+
+def test_create_cache_backend(tmp_path):
+    """Test that backends are selected by name."""
+    assert isinstance(create_cache_backend("memory"), MemoryBackend)
+    assert isinstance(
+        create_cache_backend("sqlite", sqlite_path=str(tmp_path / "c.db")),
+        SQLiteBackend,
+    )
+    assert isinstance(create_cache_backend("redis"), RedisBackend)
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached")
+    with pytest.raises(ValueError):
+        RedisBackend("http://localhost")
+
+
+@pytest.mark.asyncio
+async def test_workers_share_warm_responses(tmp_path):
+    """Test that a response cached by one worker is served by another."""
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.get("/news")
+    async def news():
+        app.state.calls += 1
+        return {"calls": app.state.calls}
+
+    path = str(tmp_path / "responses.db")
+    workers = [
+        CacheMiddleware(
+            app, Cache(ttl=60, backend=SQLiteBackend(path)), paths=["/news"],
+        )
+        for _ in range(2)
+    ]
+    bodies = []
+    for worker in workers:
+        transport = ASGITransport(app=worker)
+        async with AsyncClient(transport=transport,
+                               base_url="http://test") as client:
+            bodies.append((await client.get("/news")).json())
+
+    assert bodies == [{"calls": 1}, {"calls": 1}]
+    assert app.state.calls == 1
+    for worker in workers:
+        await worker.cache.close()
@@ -0,0 +1,120 @@
+"""Tests for the circuit breaker."""
+import pytest
+
+from app.core.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise RuntimeError("upstream down")
+
+
+@pytest.mark.asyncio
+async def test_opens_after_consecutive_failures():
+    """Test that the circuit opens and then rejects calls."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10,
+                             clock=clock)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await breaker.call(fail)
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        await breaker.call(ok)
+    assert exc_info.value.retry_after == pytest.approx(10)
+    assert breaker.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_success_resets_failure_count():
+    """Test that only consecutive failures open the circuit."""
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    with pytest.raises(RuntimeError):
+        await breaker.call(fail)
+    assert await breaker.call(ok) == "ok"
+    with pytest.raises(RuntimeError):
+        await breaker.call(fail)
+
+    assert breaker.state is CircuitState.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_half_open_trial_closes_or_reopens():
+    """Test that one trial call decides whether the circuit closes."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10,
+                             clock=clock)
+    with pytest.raises(RuntimeError):
+        await breaker.call(fail)
+
+    clock.now += 10
+    assert breaker.state is CircuitState.HALF_OPEN
+    with pytest.raises(RuntimeError):
+        await breaker.call(fail)
+    assert breaker.state is CircuitState.OPEN
+
+    clock.now += 10
+    assert await breaker.call(ok) == "ok"
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.stats()["times_opened"] == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_count_as_failures():
+    """Test that calls slower than the threshold open the circuit."""
+    clock = FakeClock()
+
+    async def slow():
+        clock.now += 6
+        return "late"
+
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_threshold=5,
+                             clock=clock)
+
+    assert await breaker.call(slow) == "late"
+    assert breaker.state is CircuitState.OPEN
+
+
+@pytest.mark.asyncio
+async def test_errors_that_are_not_failures():
+    """Test that errors excluded by is_failure count as answers."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10,
+                             clock=clock)
+
+    def is_failure(error):
+        return not isinstance(error, ValueError)
+
+    async def invalid():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        await breaker.call(invalid, is_failure=is_failure)
+    assert breaker.state is CircuitState.CLOSED
+
+    with pytest.raises(RuntimeError):
+        await breaker.call(fail, is_failure=is_failure)
+    clock.now += 10
+    with pytest.raises(ValueError):
+        await breaker.call(invalid, is_failure=is_failure)
+    assert breaker.state is CircuitState.CLOSED
@@ -58,3 +58,26 @@ def test_settings_cors_origins():
     assert len(settings.BACKEND_CORS_ORIGINS) == 2
     assert "http://localhost:3000" in settings.BACKEND_CORS_ORIGINS
     assert "https://example.com" in settings.BACKEND_CORS_ORIGINS
+
+
+def test_default_prefetching_fits_the_background_quota():
+    """Test that default headline prefetching fits its share of quota."""
+    settings = Settings(
+        SECRET_KEY="test-secret",
+        FIREBASE_CREDENTIALS_PATH="test-path",
+        NEWS_API_KEY="test-api-key",
+        DATABASE_URL="sqlite+aiosqlite:///./test.db",
+        TESTING=True,
+    )
+    combinations = (len(settings.NEWS_CATEGORIES) + 1) * len(
+        settings.HEADLINES_PREFETCH_COUNTRIES
+    )
+    daily_calls = combinations * 86400 / settings.HEADLINES_PREFETCH_INTERVAL
+    background_budget = settings.NEWS_API_DAILY_QUOTA * (
+        1 - settings.NEWS_API_INTERACTIVE_RESERVE
+    )
+
+    assert daily_calls <= background_budget
+    assert settings.HEADLINES_PREFETCH_MAX_AGE >= (
+        settings.HEADLINES_PREFETCH_INTERVAL
+    )
@@ -0,0 +1,45 @@
+"""Tests for pagination cursors."""
+import pytest
+
+from app.core.cursor import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes to the state it was made from."""
+    state = {"query": "climate", "page": 3, "page_size": 20}
+
+    cursor = encode_cursor(state)
+
+    assert decode_cursor(cursor) == state
+    assert "climate" not in cursor
+
+
+def test_cursor_is_url_safe():
+    """Test that cursors need no URL escaping."""
+    cursor = encode_cursor({"query": "a+b/c?d=e&f"})
+
+    assert all(c.isalnum() or c in "-_." for c in cursor)
+
+
+@pytest.mark.parametrize("cursor", ["", "abc", "a.b.c", "!!!.???"])
+def test_malformed_cursor_rejected(cursor):
+    """Test that malformed cursors are rejected."""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_tampered_cursor_rejected():
+    """Test that changing the payload invalidates the signature."""
+    payload, signature = encode_cursor({"page": 2}).split(".")
+    forged, _ = encode_cursor({"page": 9}).split(".")
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(f"{forged}.{signature}")
+
+
+def test_cursor_signed_with_other_key_rejected():
+    """Test that cursors are bound to the signing key."""
+    cursor = encode_cursor({"page": 2}, key="other")
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
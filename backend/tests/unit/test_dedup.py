@@ -0,0 +1,97 @@
+"""Tests for near-duplicate detection."""
+from app.services.dedup import NearDuplicateIndex, minhash, shingles
+
+FED_STORY = {
+    "title": (
+        "Fed raises interest rates by a quarter point as inflation persists"
+    ),
+    "description": (
+        "The Federal Reserve raised its benchmark rate on Wednesday, citing "
+        "stubborn inflation."
+    ),
+}
+FED_REWRITE = {
+    "title": (
+        "Fed raises interest rates by quarter point as inflation persists"
+    ),
+    "description": (
+        "The Federal Reserve raised its key rate on Wednesday, pointing to "
+        "stubborn inflation."
+    ),
+}
+FED_OTHER = {
+    "title": "Fed holds interest rates steady as inflation cools",
+    "description": (
+        "The Federal Reserve kept its benchmark rate unchanged on Wednesday."
+    ),
+}
+
+
+def test_shingles():
+    """Test that shingles are lowercased word pairs."""
+    assert shingles("Rates RISE, again") == {"rates rise", "rise again"}
+    assert shingles("Breaking") == {"breaking"}
+    assert shingles("!!!") == set()
+
+
+def test_minhash_agreement_tracks_similarity():
+    """Test that identical sets agree fully and disjoint ones do not."""
+    first = shingles(" ".join(FED_STORY.values()))
+
+    assert minhash(first, 60) == minhash(set(first), 60)
+    other = minhash({f"token {i}" for i in range(30)}, 60)
+    agreeing = sum(x == y for x, y in zip(minhash(first, 60), other))
+    assert agreeing < 10
+
+
+def test_collapse_keeps_first_copy_and_counts_sources(make_article):
+    """Test that rewrites of one story collapse into the first copy."""
+    index = NearDuplicateIndex()
+    articles = [
+        make_article(1, **FED_STORY, source="Wire"),
+        make_article(2, **FED_OTHER, source="Wire"),
+        make_article(3, **FED_REWRITE, source="Daily"),
+        make_article(4, **FED_STORY, source="Gazette"),
+    ]
+
+    collapsed = index.collapse(articles)
+
+    assert [a.url for a in collapsed] == [
+        "https://example.com/articles/1", "https://example.com/articles/2",
+    ]
+    assert [a.alternate_source_count for a in collapsed] == [2, 0]
+    assert articles[0].alternate_source_count == 0
+    assert index.stats() == {"indexed": 4, "clusters": 2, "collapsed": 2}
+
+
+def test_index_is_bounded(make_article):
+    """Test that the oldest articles are evicted beyond max_size."""
+    index = NearDuplicateIndex(max_size=2)
+    first = make_article(1, **FED_STORY, source="Wire")
+    index.add(first)
+    index.add(make_article(2, **FED_OTHER, source="Wire"))
+    index.add(make_article(
+        3, title="Unrelated", description="Sports results", source="Wire",
+    ))
+
+    assert index.stats()["indexed"] == 2
+    # The evicted story starts a new cluster when seen again
+    assert index.add(make_article(4, **FED_STORY, source="Daily")) != first.id
+
+
+def test_cluster_outlives_its_first_member(make_article):
+    """Test that evicting the first copy keeps the cluster and sources."""
+    index = NearDuplicateIndex(max_size=3)
+    cluster_id = index.add(make_article(1, **FED_STORY, source="Wire"))
+    rewrite = make_article(2, **FED_REWRITE, source="Daily")
+    assert index.add(rewrite) == cluster_id
+    index.add(make_article(
+        3, title="Unrelated", description="Sports results", source="Wire",
+    ))
+    # Evicts the first copy, the rewrite still holds the cluster
+    index.add(make_article(
+        4, title="Another story", description="Weather today", source="Wire",
+    ))
+
+    assert index.collapse([rewrite])[0].alternate_source_count == 1
+    assert index.stats() == {"indexed": 3, "clusters": 3, "collapsed": 0}
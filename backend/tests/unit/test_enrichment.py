@@ -0,0 +1,82 @@
+"""Tests for the article enricher."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import AsyncMock
+
+from app.models.schemas import NewsArticle, NewsSearchParams
+from app.services.article_store import ArticleStore
+from app.services.enrichment import ArticleEnricher
+from app.services.extraction import HttpPageFetcher, PageFetcher
+from app.services.search import ArticleSearchEngine
+
+PAGE = "<article>" + "<p>{}</p>" * 3 + "</article>"
+PARAGRAPHS = [
+    "Researchers found that the new alloy survives temperatures far "
+    "beyond anything tested before.",
+    "The team expects the first turbines built from it within five "
+    "years, pending certification.",
+    "Independent labs have already reproduced the measurements twice "
+    "with matching results.",
+]
+
+
+async def store_articles(session_factory, urls) -> ArticleStore:
+    """Create a store holding one article per URL."""
+    store = ArticleStore(session_factory)
+    await store.ingest([
+        NewsArticle(title=f"Story {i}", url=url, source="Example")
+        for i, url in enumerate(urls)
+    ])
+    return store
+
+
+@pytest.mark.asyncio
+async def test_enricher_on_process_pool(session_factory, stub_server):
+    """Test pages fetched from a server and parsed in worker processes."""
+    stub_server.responses["/alloy"] = (
+        200, "text/html", PAGE.format(*PARAGRAPHS).encode(),
+    )
+    stub_server.responses["/video"] = (200, "video/mp4", b"\x00")
+    store = await store_articles(session_factory, [
+        stub_server.url("/alloy"),
+        stub_server.url("/video"),
+        stub_server.url("/gone"),
+    ])
+    enricher = ArticleEnricher(store, HttpPageFetcher(), max_workers=1)
+
+    try:
+        assert await enricher.run_once() == 3
+    finally:
+        await enricher.stop()
+
+    assert enricher.stats() == {"extracted": 1, "empty": 0, "failed": 2}
+    [article] = await ArticleSearchEngine(session_factory).search(
+        NewsSearchParams(query="turbines certification")
+    )
+    content = await store.get_content(article.id)
+    assert content.title == "Story 0"
+    assert content.body.split("\n\n") == PARAGRAPHS
+    # Failed articles are not attempted again
+    assert await store.pending_extraction(10) == []
+
+
+@pytest.mark.asyncio
+async def test_enricher_pluggable_fetcher(session_factory):
+    """Test that any fetcher and executor can be plugged in."""
+    store = await store_articles(
+        session_factory, ["https://example.com/a", "https://example.com/b"],
+    )
+    fetcher = AsyncMock(spec=PageFetcher)
+    fetcher.fetch.return_value = "<p>too short</p>"
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        enricher = ArticleEnricher(
+            store, fetcher, executor=executor, batch_size=1,
+        )
+        assert await enricher.run_once() == 1
+        assert await enricher.run_once() == 1
+        assert await enricher.run_once() == 0
+        await enricher.stop()
+
+    assert enricher.stats() == {"extracted": 0, "empty": 2, "failed": 0}
+    fetcher.close.assert_awaited_once()
@@ -0,0 +1,102 @@
+"""Tests for page fetching and text extraction."""
+import httpx
+import pytest
+
+from app.services.extraction import (
+    HttpPageFetcher,
+    PageFetchError,
+    extract_text,
+)
+
+PARAGRAPH = (
+    "The committee published its findings on Tuesday after a year of "
+    "hearings across the region."
+)
+
+
+def article_page(paragraphs: int = 4) -> str:
+    """Create an article page wrapped in typical page chrome."""
+    body = "".join(f"<p>{PARAGRAPH} ({i})</p>" for i in range(paragraphs))
+    return f"""<html><head><title>Story</title>
+<script>var tracking = "<p>not text</p>";</script>
+<style>p {{ color: red; }}</style></head>
+<body>
+<nav><p>Home World Politics Business Sports and Entertainment</p></nav>
+<p>Sign up for the newsletter to get stories like this every day</p>
+<article>
+  <h1>Findings published</h1>
+  {body}
+  <aside><p>Read more: other stories you might like today here</p></aside>
+  <p>Short.</p>
+</article>
+<footer><p>Copyright 2024 Example Media Group, all rights reserved</p>
+</footer>
+</body></html>"""
+
+
+def test_extract_text_keeps_article_paragraphs():
+    """Test that only running text of the article is kept."""
+    text = extract_text(article_page())
+
+    paragraphs = text.split("\n\n")
+    assert len(paragraphs) == 4
+    assert paragraphs[0] == f"{PARAGRAPH} (0)"
+    for chrome in ("newsletter", "Home", "Read more", "Copyright", "var"):
+        assert chrome not in text
+
+
+def test_extract_text_without_article_markup():
+    """Test that pages without <article> fall back to every paragraph."""
+    html = "<div>" + "".join(
+        f"<p>{PARAGRAPH} &amp; more {i}" for i in range(3)
+    ) + "</div>"
+
+    text = extract_text(html)
+
+    assert text.count("&") == 3
+    assert len(text.split("\n\n")) == 3
+
+
+def test_extract_text_short_page():
+    """Test that pages without substantial text yield nothing."""
+    assert extract_text(article_page(paragraphs=1)) is None
+    assert extract_text("not html at all") is None
+
+
+@pytest.mark.asyncio
+async def test_http_fetcher(stub_server):
+    """Test that pages are fetched from a server."""
+    stub_server.responses["/story"] = (
+        200, "text/html; charset=utf-8", "<p>Café</p>".encode(),
+    )
+    fetcher = HttpPageFetcher()
+
+    html = await fetcher.fetch(stub_server.url("/story"))
+
+    assert html == "<p>Café</p>"
+    await fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_http_fetcher_truncates_large_pages(stub_server):
+    """Test that at most max_bytes of a page are read."""
+    stub_server.responses["/big"] = (200, "text/html", b"x" * 100_000)
+    fetcher = HttpPageFetcher(max_bytes=1000)
+
+    html = await fetcher.fetch(stub_server.url("/big"))
+
+    assert len(html) == 1000
+    await fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_http_fetcher_errors(stub_server):
+    """Test that missing and non-HTML pages are rejected."""
+    stub_server.responses["/doc.pdf"] = (200, "application/pdf", b"%PDF")
+    fetcher = HttpPageFetcher()
+
+    with pytest.raises(PageFetchError):
+        await fetcher.fetch(stub_server.url("/doc.pdf"))
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetcher.fetch(stub_server.url("/missing"))
+    await fetcher.close()
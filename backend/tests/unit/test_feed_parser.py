@@ -0,0 +1,90 @@
+"""Tests for the RSS and Atom feed parser."""
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from app.services.feed_parser import iter_feed, parse_feed
+
+
+def large_feed(items: int):
+    """Generate an RSS feed of many items, newest first, in chunks."""
+    newest = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    yield b'<?xml version="1.0"?><rss version="2.0"><channel>'
+    yield b"<title>Big Feed</title>"
+    for i in range(items):
+        published = newest - timedelta(minutes=i)
+        yield (
+            f"<item><title>Story {i}</title>"
+            f"<link>https://example.com/{i}</link>"
+            f"<description>{'text ' * 40}</description>"
+            f"<pubDate>{published:%a, %d %b %Y %H:%M:%S} +0000</pubDate>"
+            f"</item>"
+        ).encode()
+    yield b"</channel></rss>"
+
+
+def test_parse_rss(rss_feed):
+    """Test that RSS items are converted into articles."""
+    articles = parse_feed(rss_feed, "https://example.com/rss",
+                          category="world")
+
+    assert len(articles) == 1
+    article = articles[0]
+    assert article.title == "First story"
+    assert article.source == "Example News"
+    assert article.author == "Jane Doe"
+    assert article.category == "world"
+    assert article.published_at == datetime(2024, 1, 1, 10,
+                                            tzinfo=timezone.utc)
+    assert article.id is not None
+
+
+def test_parse_atom(atom_feed):
+    """Test that Atom entries are converted into articles."""
+    articles = parse_feed(atom_feed, "https://example.org/atom")
+
+    article = articles[0]
+    assert article.url == "https://example.org/atom-story"
+    assert article.description == "Atom summary"
+    assert article.author == "John Roe"
+    assert article.published_at.day == 2
+
+
+def test_chunked_parse_matches_whole_document(rss_feed):
+    """Test that feeding one byte at a time gives the same articles."""
+    chunks = (rss_feed[i:i + 1] for i in range(len(rss_feed)))
+
+    streamed = list(iter_feed(chunks, "https://example.com/rss"))
+
+    assert streamed == parse_feed(rss_feed, "https://example.com/rss")
+
+
+def test_parsing_stops_at_watermark():
+    """Test that items at or before the watermark end the parse early."""
+    chunks = large_feed(1000)
+    watermark = datetime(2023, 12, 31, 23, 57, tzinfo=timezone.utc)
+
+    articles = list(iter_feed(chunks, "https://example.com/rss",
+                              watermark=watermark))
+
+    assert [a.title for a in articles] == [
+        "Story 0", "Story 1", "Story 2",
+    ]
+    # The rest of the feed was never read
+    assert len(list(chunks)) > 990
+
+
+def test_memory_stays_flat_for_large_feeds():
+    """Test that parsed items are released while streaming."""
+    def peak_memory(items: int) -> int:
+        tracemalloc.start()
+        count = sum(1 for _ in iter_feed(large_feed(items),
+                                         "https://example.com/rss"))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert count == items
+        return peak
+
+    small = peak_memory(100)
+    large = peak_memory(3000)
+
+    assert large < small * 2
@@ -0,0 +1,226 @@
+"""Tests for the thumbnail proxy."""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from PIL import Image
+
+from app.api.v1.api import api_router
+from app.core.process_pool import create_process_pool
+from app.core.thumbnails import image_digest, thumbnail_path
+from app.models.schemas import NewsArticle
+from app.services.images import (
+    ImageFetchError,
+    ThumbnailCache,
+    ThumbnailService,
+    make_thumbnail,
+)
+from app.services.registry import get_thumbnail_service
+
+
+def encode_image(size, mode="RGB", fmt="PNG") -> bytes:
+    """Create an encoded test image."""
+    buffer = io.BytesIO()
+    Image.new(mode, size, "red").save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def test_make_thumbnail(tmp_path):
+    """Test that images are downscaled keeping their aspect ratio."""
+    destination = tmp_path / "thumb"
+
+    data = make_thumbnail(
+        encode_image((1600, 1200), fmt="JPEG"), str(destination),
+    )
+
+    with Image.open(destination) as thumbnail:
+        assert thumbnail.format == "JPEG"
+        assert thumbnail.size == (360, 270)
+    assert data == destination.read_bytes()
+    assert os.listdir(tmp_path) == ["thumb"]
+
+
+def test_make_thumbnail_flattens_transparency(tmp_path):
+    """Test that transparent images become opaque JPEGs."""
+    destination = tmp_path / "thumb"
+
+    make_thumbnail(encode_image((100, 50), mode="RGBA"), str(destination))
+
+    with Image.open(destination) as thumbnail:
+        assert thumbnail.mode == "RGB"
+        # Small images are not upscaled
+        assert thumbnail.size == (100, 50)
+
+
+def write_thumbnail(directory, digest: str, mtime: int) -> None:
+    """Write a 100 byte thumbnail last used at mtime."""
+    path = directory / digest
+    path.write_bytes(b"x" * 100)
+    os.utime(path, (mtime, mtime))
+
+
+def test_thumbnail_cache_evicts_least_recently_used(tmp_path):
+    """Test that the cache stays under its size bound."""
+    cache = ThumbnailCache(str(tmp_path), max_bytes=250)
+    write_thumbnail(tmp_path, "a", 1)
+    write_thumbnail(tmp_path, "b", 2)
+    cache.get("a")
+    write_thumbnail(tmp_path, "c", 3)
+    cache.add("c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"x" * 100
+    assert not (tmp_path / "b").exists()
+    assert cache.stats()["files"] == 2
+    assert cache.stats()["bytes"] == 200
+
+    # Oversized directories are trimmed at startup
+    write_thumbnail(tmp_path, "d", 4)
+    assert ThumbnailCache(str(tmp_path), max_bytes=250).stats()["files"] == 2
+
+
+def test_thumbnail_cache_is_shared_by_workers(tmp_path):
+    """Test that workers share one size bound and tolerate evictions."""
+    first = ThumbnailCache(str(tmp_path), max_bytes=250)
+    second = ThumbnailCache(str(tmp_path), max_bytes=250)
+    write_thumbnail(tmp_path, "a", 1)
+    first.add("a")
+    write_thumbnail(tmp_path, "b", 2)
+    first.add("b")
+    write_thumbnail(tmp_path, "c", 3)
+    second.add("c")
+
+    # Evicted by the second worker, so a miss for the first
+    assert first.get("a") is None
+    assert sorted(os.listdir(tmp_path)) == ["b", "c"]
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Create a thumbnail service downscaling on a thread."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield ThumbnailService(
+            ThumbnailCache(str(tmp_path / "thumbs"), max_bytes=10**6),
+            executor,
+            allow_private_hosts=True,
+        )
+
+
+@pytest.mark.asyncio
+async def test_thumbnail_service_fetches_once(service, stub_server):
+    """Test that each image is fetched once, then served from disk."""
+    stub_server.responses["/photo.png"] = (
+        200, "image/png", encode_image((960, 540)),
+    )
+    url = stub_server.url("/photo.png")
+
+    first = await service.thumbnail(url, image_digest(url))
+    second = await service.thumbnail(url, image_digest(url))
+
+    assert first == second
+    assert stub_server.requests == ["/photo.png"]
+    with Image.open(io.BytesIO(first)) as thumbnail:
+        assert thumbnail.size == (480, 270)
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_thumbnail_service_errors(service, stub_server):
+    """Test that missing, non-image and corrupt images are rejected."""
+    stub_server.responses["/page"] = (200, "text/html", b"<html>")
+    stub_server.responses["/broken.jpg"] = (200, "image/jpeg", b"nope")
+
+    for path in ("/page", "/broken.jpg", "/missing.jpg"):
+        url = stub_server.url(path)
+        with pytest.raises(ImageFetchError):
+            await service.thumbnail(url, image_digest(url))
+    assert service.cache.stats()["files"] == 0
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_thumbnail_service_rejects_private_hosts(tmp_path):
+    """Test that URLs and redirects to internal hosts are not fetched."""
+    requested = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested.append(str(request.url))
+        return httpx.Response(
+            302, headers={"Location": "http://169.254.169.254/latest"},
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    executor = ThreadPoolExecutor(max_workers=1)
+    service = ThumbnailService(
+        ThumbnailCache(str(tmp_path), max_bytes=10**6), executor,
+        client=client,
+    )
+
+    for url in ("http://127.0.0.1/a.png", "http://[::1]/a.png",
+                "http://10.0.0.8/a.png", "ftp://203.0.113.9/a.png",
+                "http://93.184.216.34/a.png"):
+        with pytest.raises(ImageFetchError):
+            await service.thumbnail(url, image_digest(url))
+    # Only the public URL was requested; its redirect was refused
+    assert requested == ["http://93.184.216.34/a.png"]
+    await client.aclose()
+    executor.shutdown()
+
+
+def test_article_thumbnail_url():
+    """Test that articles link to the signed thumbnail of their image."""
+    article = NewsArticle(
+        title="Title", url="https://example.com/a", source="Example",
+        image_url="https://cdn.example.com/a.jpg?w=2000",
+    )
+
+    assert article.model_dump()["thumbnail_url"] == thumbnail_path(
+        "https://cdn.example.com/a.jpg?w=2000"
+    )
+    assert article.thumbnail_url.startswith(
+        f"/api/v1/images/{image_digest(article.image_url)}?url="
+    )
+    assert NewsArticle(
+        title="Title", url="https://example.com/b", source="Example",
+    ).thumbnail_url is None
+
+
+@pytest.mark.asyncio
+async def test_get_thumbnail_endpoint(tmp_path, stub_server):
+    """Test the endpoint with downscaling on a real process pool."""
+    stub_server.responses["/photo.jpg"] = (
+        200, "image/jpeg", encode_image((2000, 1000), fmt="JPEG"),
+    )
+    url = stub_server.url("/photo.jpg")
+    pool = create_process_pool(1)
+    service = ThumbnailService(
+        ThumbnailCache(str(tmp_path), max_bytes=10**6), pool,
+        allow_private_hosts=True,
+    )
+    app = FastAPI()
+    app.include_router(api_router)
+    app.dependency_overrides[get_thumbnail_service] = lambda: service
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(thumbnail_path(url))
+        cached = await client.get(
+            thumbnail_path(url),
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        forged = await client.get(
+            f"/api/v1/images/{'0' * 32}", params={"url": url},
+        )
+    pool.shutdown()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "immutable" in response.headers["cache-control"]
+    with Image.open(io.BytesIO(response.content)) as thumbnail:
+        assert thumbnail.size == (480, 240)
+    assert cached.status_code == 304
+    assert forged.status_code == 404
+    assert stub_server.requests == ["/photo.jpg"]
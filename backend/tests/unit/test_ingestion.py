@@ -0,0 +1,233 @@
+"""Tests for incremental ingestion behind watermarks."""
+from datetime import datetime, timedelta, UTC
+
+import httpx
+import pytest
+
+from app.services.ingestion import (
+    Feed,
+    IncrementalIngester,
+    Watermark,
+    WatermarkStore,
+    advance_watermark,
+)
+from app.services.news import NewsService
+from app.services.news_client import AsyncNewsApiClient
+
+
+class FakeNewsApi:
+    """NewsAPI stand-in paging articles newest first."""
+
+    def __init__(self) -> None:
+        self.minutes = []
+        self.requests = []
+        # Order of the top headlines, when not newest first
+        self.ranking = None
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        params = request.url.params
+        published = [
+            (datetime(2024, 1, 1) + timedelta(minutes=minute)).isoformat()
+            for minute in self.minutes
+        ]
+        matching = sorted(
+            (
+                (when, minute) for when, minute in zip(published, self.minutes)
+                if params.get("from", "") <= when <= params.get("to", "~")
+            ),
+            reverse=True,
+        )
+        if self.ranking and request.url.path.endswith("/top-headlines"):
+            matching.sort(key=lambda item: self.ranking.index(item[1]))
+        size = int(params["pageSize"])
+        start = (int(params["page"]) - 1) * size
+        return httpx.Response(200, json={"status": "ok", "articles": [
+            {
+                "title": f"Story {minute}",
+                "url": f"https://example.com/{minute}",
+                "source": {"name": "Test Source"},
+                "publishedAt": f"{when}Z",
+            }
+            for when, minute in matching[start:start + size]
+        ]})
+
+    def client(self) -> AsyncNewsApiClient:
+        """Create an upstream client served by this stand-in."""
+        return AsyncNewsApiClient(
+            api_key="test-api-key",
+            transport=httpx.MockTransport(self.handler),
+        )
+
+
+def test_watermark_covers_older_and_seen_articles(make_article):
+    """Test which articles a watermark covers."""
+    watermark = Watermark(
+        datetime(2024, 1, 1, 10, tzinfo=UTC),
+        frozenset({"https://example.com/articles/10"}),
+    )
+
+    assert watermark.covers(make_article(9))
+    assert watermark.covers(make_article(10))
+    assert not watermark.covers(make_article(10, url="https://example.com/b"))
+    assert not watermark.covers(make_article(11))
+    assert not watermark.covers(make_article(1, published_at=None))
+
+
+def test_advance_watermark(make_article):
+    """Test that watermarks only move forward."""
+    first = advance_watermark(None, [make_article(5), make_article(3)])
+    same = advance_watermark(first, [make_article(5, url="https://x.com/5")])
+
+    assert first == Watermark(
+        datetime(2024, 1, 1, 5, tzinfo=UTC),
+        frozenset({"https://example.com/articles/5"}),
+    )
+    assert same.urls == {"https://example.com/articles/5", "https://x.com/5"}
+    assert advance_watermark(first, [make_article(4)]) == first
+    assert advance_watermark(first, []) == first
+
+
+@pytest.mark.asyncio
+async def test_watermark_store_round_trip(session_factory):
+    """Test that watermarks are persisted per feed."""
+    store = WatermarkStore(session_factory)
+    feed = Feed(query="rockets")
+    watermark = Watermark(
+        datetime(2024, 1, 1, tzinfo=UTC), frozenset({"https://a.com"}),
+    )
+
+    assert await store.get(feed) is None
+    await store.save(feed, watermark)
+    await store.save(feed, watermark._replace(urls=frozenset()))
+
+    assert await store.get(feed) == watermark._replace(urls=frozenset())
+    assert await store.get(Feed(category="science")) is None
+
+
+@pytest.mark.asyncio
+async def test_ingest_stops_at_the_watermark(session_factory):
+    """Test that refreshes only fetch articles newer than the last."""
+    upstream = FakeNewsApi()
+    upstream.minutes = [1, 2, 3, 4, 5]
+    feed = Feed(query="rockets")
+    async with NewsService(upstream.client()) as news_service:
+        ingester = IncrementalIngester(
+            news_service,
+            WatermarkStore(session_factory),
+            [feed],
+            page_size=2,
+            max_pages=5,
+        )
+        first = await ingester.ingest(feed)
+        upstream.minutes.append(6)
+        second = await ingester.ingest(feed)
+        third = await ingester.ingest(feed)
+
+    assert [a.title for a in first] == [f"Story {m}" for m in (5, 4, 3, 2, 1)]
+    assert [a.title for a in second] == ["Story 6"]
+    assert third == []
+    assert "from" not in upstream.requests[0].url.params
+    assert upstream.requests[3].url.params["from"] == "2024-01-01T00:05:00"
+    assert upstream.requests[3].url.params["sortBy"] == "publishedAt"
+    assert len(upstream.requests) == 5
+    assert ingester.stats() == {
+        "pages": 5, "articles": 8, "new": 6, "stopped": 2, "cut_off": 0,
+        "feeds": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_headline_feeds_are_paged_without_from(session_factory):
+    """Test that headline feeds stop at a page with nothing new."""
+    upstream = FakeNewsApi()
+    upstream.minutes = [1, 2, 3]
+    feed = Feed(category="science")
+    async with NewsService(upstream.client()) as news_service:
+        ingester = IncrementalIngester(
+            news_service, WatermarkStore(session_factory), [feed], page_size=2,
+        )
+        await ingester.run_once()
+        upstream.minutes.append(4)
+        await ingester.run_once()
+
+    assert upstream.requests[-1].url.path.endswith("/top-headlines")
+    assert upstream.requests[-1].url.params["category"] == "science"
+    assert "from" not in upstream.requests[-1].url.params
+    assert ingester.stats()["new"] == 4
+    # Story 3 was seen on the first page, but only page 2 has nothing new
+    assert ingester.stats()["pages"] == 4
+
+
+@pytest.mark.asyncio
+async def test_cut_off_refreshes_resume_the_backlog(session_factory):
+    """Test that articles past the page limit are fetched later."""
+    upstream = FakeNewsApi()
+    upstream.minutes = [0]
+    feed = Feed(query="rockets")
+    store = WatermarkStore(session_factory)
+    async with NewsService(upstream.client()) as news_service:
+        ingester = IncrementalIngester(
+            news_service, store, [feed], page_size=10, max_pages=10,
+        )
+        await ingester.ingest(feed)
+        upstream.minutes.extend(range(1, 151))
+        first = await ingester.ingest(feed)
+        cut_off = await store.get(feed)
+        upstream.minutes.append(151)
+        second = await ingester.ingest(feed)
+        third = await ingester.ingest(feed)
+
+    assert len(first) == 100
+    assert cut_off.published_at == datetime(2024, 1, 1, tzinfo=UTC)
+    assert cut_off.backlog.before == datetime(2024, 1, 1, 0, 51, tzinfo=UTC)
+    assert upstream.requests[11].url.params["to"] == "2024-01-01T00:51:00"
+    assert len(second) == 50
+    assert [a.title for a in third] == ["Story 151"]
+    ingested = {a.url for a in first + second + third}
+    assert ingested == {f"https://example.com/{m}" for m in range(1, 152)}
+    assert await store.get(feed) == Watermark(
+        datetime(2024, 1, 1, 2, 31, tzinfo=UTC),
+        frozenset({"https://example.com/151"}),
+    )
+    assert ingester.stats()["cut_off"] == 1
+
+
+@pytest.mark.asyncio
+async def test_ranked_headlines_are_filtered_one_by_one(session_factory):
+    """Test that an old story on top does not hide newer ones below."""
+    upstream = FakeNewsApi()
+    upstream.minutes = [0, 1]
+    feed = Feed(category="science")
+    store = WatermarkStore(session_factory)
+    async with NewsService(upstream.client()) as news_service:
+        ingester = IncrementalIngester(
+            news_service, store, [feed], page_size=2, max_pages=3,
+        )
+        await ingester.ingest(feed)
+        upstream.minutes.extend([2, 3, 4])
+        upstream.ranking = [0, 2, 1, 3, 4]
+        second = await ingester.ingest(feed)
+        third = await ingester.ingest(feed)
+
+    assert [a.title for a in second] == ["Story 2", "Story 3", "Story 4"]
+    assert third == []
+    watermark = await store.get(feed)
+    assert watermark.published_at == datetime(2024, 1, 1, 0, 4, tzinfo=UTC)
+    assert watermark.urls == {f"https://example.com/{m}" for m in range(5)}
+    assert "from" not in upstream.requests[-1].url.params
+
+
+@pytest.mark.asyncio
+async def test_ingestion_pages_are_not_kept_as_fallbacks(session_factory):
+    """Test that background polling leaves the fallback cache alone."""
+    upstream = FakeNewsApi()
+    upstream.minutes = [1, 2]
+    async with NewsService(upstream.client()) as news_service:
+        ingester = IncrementalIngester(
+            news_service, WatermarkStore(session_factory),
+            [Feed(query="rockets"), Feed(category="science")],
+        )
+        await ingester.run_once()
+
+        assert len(news_service._last_good) == 0
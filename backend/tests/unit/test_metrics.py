@@ -0,0 +1,80 @@
+"""Tests for the metrics endpoint."""
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.api.v1.api import api_router
+from app.core.cache import Cache
+from app.services.aggregator import NewsAggregator
+from app.services.article_store import ArticleStore
+from app.services.ingestion import IncrementalIngester, WatermarkStore
+from app.services.news import NewsService
+from app.services.personalization import FeedRanker
+from app.services.prefetch import SearchPagePrefetcher
+from app.services.related import RelatedArticlesIndex
+from app.services.registry import (
+    get_article_enricher,
+    get_feed_ranker,
+    get_ingester,
+    get_news_aggregator,
+    get_news_service,
+    get_related_index,
+    get_response_cache,
+    get_search_prefetcher,
+    get_trending_engine,
+)
+from app.services.sources import NewsApiSource
+from app.services.trending import TrendingEngine
+
+
+@pytest.fixture
+def app() -> FastAPI:
+    """Create a test FastAPI application."""
+    app = FastAPI()
+    app.include_router(api_router)
+    news_service = NewsService()
+    aggregator = NewsAggregator([NewsApiSource(news_service)])
+    app.dependency_overrides[get_news_service] = lambda: news_service
+    app.dependency_overrides[get_news_aggregator] = lambda: aggregator
+    app.dependency_overrides[get_article_enricher] = lambda: None
+    app.dependency_overrides[get_trending_engine] = TrendingEngine
+    app.dependency_overrides[get_ingester] = (
+        lambda: IncrementalIngester(news_service, WatermarkStore(), [])
+    )
+    app.dependency_overrides[get_related_index] = (
+        lambda: RelatedArticlesIndex(ArticleStore(), features=1024)
+    )
+    app.dependency_overrides[get_feed_ranker] = (
+        lambda: FeedRanker(ArticleStore())
+    )
+    app.dependency_overrides[get_response_cache] = lambda: Cache()
+    app.dependency_overrides[get_search_prefetcher] = (
+        lambda: SearchPagePrefetcher(aggregator)
+    )
+    return app
+
+
+@pytest.mark.asyncio
+async def test_get_metrics(app: FastAPI):
+    """Test that metrics are exposed and never cached."""
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get("/api/v1/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+    assert response.json()["news"]["singleflight"] == {
+        "calls": 0, "collapsed": 0, "in_flight": 0,
+    }
+    assert response.json()["sources"] == {
+        "newsapi": {"ok": 0, "failed": 0, "timed_out": 0},
+    }
+    assert response.json()["search_prefetch"] == {
+        "hits": 0, "scheduled": 0, "skipped": 0, "in_flight": 0,
+    }
+    assert response.json()["trending"]["observed"] == 0
+    assert response.json()["feed"]["profiles"] == 0
+    assert response.json()["related"]["indexed"] == 0
+    assert response.json()["ingestion"]["feeds"] == 0
+    assert response.json()["cache"] == {
+        "backend": "memory", "hits": 0, "misses": 0, "errors": 0,
+    }
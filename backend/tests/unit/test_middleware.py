@@ -1,12 +1,25 @@
 """Tests for middleware functionality."""
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-
-from app.core.middleware import RateLimitMiddleware, CacheMiddleware
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from httpx import ASGITransport, AsyncClient
+
+from app.core.middleware import (
+    CacheKeySpec,
+    CacheMiddleware,
+    CachedResponse,
+    RateLimitMiddleware,
+    StaleWhileRevalidate,
+    canonical_cache_key,
+)
 from app.core.rate_limiter import RateLimiter
-from app.core.cache import Cache
+from app.core.cache import Cache, CacheEntry, MemoryBackend
+
+# Paths the cache middleware is allowed to cache in these tests
+CACHED_PATHS = ["/test", "/image", "/news"]
 
 
 @pytest.fixture
@@ -21,7 +34,7 @@ def mock_rate_limiter():
 def mock_cache():
     """Fixture for mock cache."""
     cache = MagicMock(spec=Cache)
-    cache.get = AsyncMock(return_value=None)
+    cache.get_entry = AsyncMock(return_value=None)
     cache.set = AsyncMock()
     return cache
 
@@ -75,8 +88,9 @@ async def test_rate_limit_middleware_exceeded(mock_rate_limiter, mock_app):
 @pytest.mark.asyncio
 async def test_cache_middleware_miss(mock_cache, mock_app):
     """Test cache middleware when cache miss occurs."""
-    middleware = CacheMiddleware(mock_app, mock_cache)
+    middleware = CacheMiddleware(mock_app, mock_cache, paths=CACHED_PATHS)
     request = MagicMock(spec=Request)
+    request.scope = {}
     request.url.path = "/test"
     request.method = "GET"
 
@@ -88,7 +102,7 @@ async def test_cache_middleware_miss(mock_cache, mock_app):
 
     assert response.status_code == 200
     assert response.body == b'{"message":"success"}'
-    assert mock_cache.get.call_count == 1
+    assert mock_cache.get_entry.call_count == 1
     assert mock_cache.set.call_count == 1
 
 
@@ -97,10 +111,17 @@ async def test_cache_middleware_hit(mock_cache, mock_app):
     """Test cache middleware when cache hit occurs."""
     # Create a proper JSONResponse for the cached value
     cached_response = JSONResponse({"message": "cached"})
-    mock_cache.get = AsyncMock(return_value=cached_response.body.decode())
-
-    middleware = CacheMiddleware(mock_app, mock_cache)
+    mock_cache.get_entry = AsyncMock(return_value=CacheEntry(
+        CachedResponse(
+            cached_response.body, [(b"content-type", b"application/json")],
+        ).to_bytes(),
+        0.0,
+        60.0,
+    ))
+
+    middleware = CacheMiddleware(mock_app, mock_cache, paths=CACHED_PATHS)
     request = MagicMock(spec=Request)
+    request.scope = {}
     request.url.path = "/test"
     request.method = "GET"
 
@@ -112,15 +133,16 @@ async def test_cache_middleware_hit(mock_cache, mock_app):
 
     assert response.status_code == 200
     assert response.body == b'{"message":"cached"}'
-    assert mock_cache.get.call_count == 1
+    assert mock_cache.get_entry.call_count == 1
     assert mock_cache.set.call_count == 0
 
 
 @pytest.mark.asyncio
 async def test_cache_middleware_non_get(mock_cache, mock_app):
     """Test cache middleware with non-GET requests."""
-    middleware = CacheMiddleware(mock_app, mock_cache)
+    middleware = CacheMiddleware(mock_app, mock_cache, paths=CACHED_PATHS)
     request = MagicMock(spec=Request)
+    request.scope = {}
     request.url.path = "/test"
     request.method = "POST"
 
@@ -132,15 +154,16 @@ async def test_cache_middleware_non_get(mock_cache, mock_app):
 
     assert response.status_code == 200
     assert response.body == b'{"message":"success"}'
-    assert mock_cache.get.call_count == 0
+    assert mock_cache.get_entry.call_count == 0
     assert mock_cache.set.call_count == 0
 
 
 @pytest.mark.asyncio
 async def test_cache_middleware_error_response(mock_cache, mock_app):
     """Test cache middleware with error response."""
-    middleware = CacheMiddleware(mock_app, mock_cache)
+    middleware = CacheMiddleware(mock_app, mock_cache, paths=CACHED_PATHS)
     request = MagicMock(spec=Request)
+    request.scope = {}
     request.url.path = "/test"
     request.method = "GET"
 
@@ -152,5 +175,391 @@ async def test_cache_middleware_error_response(mock_cache, mock_app):
 
     assert response.status_code == 404
     assert response.body == b'{"error":"not found"}'
-    assert mock_cache.get.call_count == 1
+    assert mock_cache.get_entry.call_count == 1
+    assert mock_cache.set.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_no_store(mock_cache, mock_app):
+    """Test that responses marked no-store are not cached."""
+    middleware = CacheMiddleware(mock_app, mock_cache, paths=CACHED_PATHS)
+    request = MagicMock(spec=Request)
+    request.scope = {}
+    request.url.path = "/test"
+    request.method = "GET"
+
+    # Mock the call_next function
+    async def mock_call_next(request):
+        return JSONResponse(
+            {"message": "success"},
+            headers={"Cache-Control": "no-store"},
+        )
+
+    response = await middleware.dispatch(request, mock_call_next)
+
+    assert response.status_code == 200
+    assert mock_cache.set.call_count == 0
+
+
+@pytest.fixture
+def counting_app():
+    """Fixture for an app counting how often its route runs."""
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.gate = asyncio.Event()
+    app.state.gate.set()
+
+    @app.get("/news")
+    async def news():
+        app.state.calls += 1
+        calls = app.state.calls
+        await app.state.gate.wait()
+        return {"calls": calls}
+
+    return app
+
+
+async def get_json(asgi_app, path: str) -> dict:
+    """Send a GET request through an ASGI app."""
+    transport = ASGITransport(app=asgi_app)
+    async with AsyncClient(transport=transport,
+                           base_url="http://test") as client:
+        response = await client.get(path)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_caches_streaming_responses(counting_app):
+    """Test that responses of a real app are cached."""
+    middleware = CacheMiddleware(
+        counting_app, Cache(max_size=10, ttl=60), paths=CACHED_PATHS,
+    )
+
+    first = await get_json(middleware, "/news")
+    second = await get_json(middleware, "/news")
+
+    assert first == second == {"calls": 1}
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_stale_while_revalidate(counting_app):
+    """Test that stale entries are served and refreshed in background."""
+    middleware = CacheMiddleware(
+        counting_app,
+        Cache(max_size=10, ttl=60),
+        policies={"/news": StaleWhileRevalidate(soft_ttl=0, hard_ttl=60)},
+    )
+
+    assert await get_json(middleware, "/news") == {"calls": 1}
+    # Stale hits are served immediately and trigger a single refresh
+    counting_app.state.gate.clear()
+    assert await get_json(middleware, "/news") == {"calls": 1}
+    assert await get_json(middleware, "/news") == {"calls": 1}
+    assert len(middleware._tasks) == 1
+    counting_app.state.gate.set()
+    await asyncio.gather(*middleware._tasks)
+
+    assert counting_app.state.calls == 2
+    assert await get_json(middleware, "/news") == {"calls": 2}
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_reads_stale_hits_once(counting_app):
+    """Test that a hit on a revalidated route reads the backend once."""
+    backend = MemoryBackend()
+    backend.get = AsyncMock(side_effect=backend.get)
+    middleware = CacheMiddleware(
+        counting_app,
+        Cache(backend=backend),
+        policies={"/news": StaleWhileRevalidate(soft_ttl=60, hard_ttl=120)},
+    )
+    await get_json(middleware, "/news")
+    # The miss went to the route after a single read
+    assert backend.get.call_count == 1
+    backend.get.reset_mock()
+
+    await get_json(middleware, "/news")
+
+    assert backend.get.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_fresh_entries_not_revalidated(counting_app):
+    """Test that entries younger than the soft TTL are not refreshed."""
+    middleware = CacheMiddleware(
+        counting_app,
+        Cache(max_size=10, ttl=60),
+        policies={"/news": StaleWhileRevalidate(soft_ttl=60, hard_ttl=120)},
+    )
+
+    await get_json(middleware, "/news")
+    await get_json(middleware, "/news")
+
+    assert not middleware._tasks
+    assert counting_app.state.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_replays_next_cursor():
+    """Test that the next-page cursor survives a cache hit."""
+    app = FastAPI()
+
+    @app.get("/news")
+    async def news():
+        return JSONResponse(
+            [], headers={"X-Next-Cursor": "abc", "X-Other": "1"},
+        )
+
+    middleware = CacheMiddleware(
+        app, Cache(max_size=10, ttl=60), paths=CACHED_PATHS,
+    )
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport,
+                           base_url="http://test") as client:
+        await client.get("/news")
+        response = await client.get("/news")
+
+    assert response.headers["x-next-cursor"] == "abc"
+    assert "x-other" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_replays_bytes_verbatim():
+    """Test that hits send the stored body and content type untouched."""
+    app = FastAPI()
+    body = b'{"title": "caf\xc3\xa9",  "n": 1.50}'
+
+    @app.get("/news")
+    async def news():
+        return Response(body, media_type="application/json; charset=utf-8")
+
+    middleware = CacheMiddleware(
+        app, Cache(max_size=10, ttl=60), paths=CACHED_PATHS,
+    )
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport,
+                           base_url="http://test") as client:
+        miss = await client.get("/news")
+        hit = await client.get("/news")
+
+    assert miss.content == hit.content == body
+    assert hit.headers["content-type"] == "application/json; charset=utf-8"
+    assert hit.headers["content-length"] == str(len(body))
+
+
+@pytest.mark.parametrize("headers", [
+    [],
+    [(b"content-type", b"application/json"), (b"x-next-cursor", b"a: b")],
+])
+def test_cached_response_round_trip(headers):
+    """Test encoding cached responses for the cache backends."""
+    cached = CachedResponse(b'{"a":"\r\n\r\n"}', headers)
+
+    assert CachedResponse.from_bytes(cached.to_bytes()) == cached
+
+
+SEARCH_KEY_SPEC = CacheKeySpec(
+    defaults={"language": "en", "page_size": "10", "page": "1"},
+    text_params=("query",),
+)
+
+
+@pytest.mark.parametrize("query_string", [
+    "query=climate&page_size=10",
+    "page_size=10&query=climate",
+    "query=+Climate++&language=en&page=1",
+    "page=1&page_size=10&language=en&query=CLIMATE",
+])
+def test_canonical_cache_key_equivalent_queries(query_string):
+    """Test that equivalent queries map to the same key."""
+    key = canonical_cache_key("/search", query_string, SEARCH_KEY_SPEC)
+
+    assert key == (
+        "/search?language=en&page=1&page_size=10&query=climate"
+    )
+
+
+def test_canonical_cache_key_distinct_queries():
+    """Test that queries differing in meaning keep separate keys."""
+    keys = {
+        canonical_cache_key("/search", query_string, SEARCH_KEY_SPEC)
+        for query_string in [
+            "query=climate", "query=climate&page=2",
+            "query=climate+NOT+policy", "query=climate+not+policy",
+            "query=", "",
+        ]
+    }
+
+    # Blank and missing search text are the same request
+    assert len(keys) == 5
+
+
+def test_canonical_cache_key_without_spec():
+    """Test that routes without a spec still get sorted parameters."""
+    assert canonical_cache_key("/x", "b=2&a=1&a=0") == "/x?a=0&a=1&b=2"
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_shares_equivalent_entries(counting_app):
+    """Test that reordered and default-valued queries hit the cache."""
+    middleware = CacheMiddleware(
+        counting_app,
+        Cache(max_size=10, ttl=60),
+        key_specs={"/news": SEARCH_KEY_SPEC},
+    )
+
+    await get_json(middleware, "/news?query=AI&page_size=10")
+    await get_json(middleware, "/news?page=1&page_size=10&query=+ai")
+
+    assert counting_app.state.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_skips_non_json(mock_cache, mock_app):
+    """Test that file and other non-JSON responses are not cached."""
+    middleware = CacheMiddleware(mock_app, mock_cache, paths=CACHED_PATHS)
+    request = MagicMock(spec=Request)
+    request.scope = {}
+    request.url.path = "/image"
+    request.method = "GET"
+
+    async def mock_call_next(request):
+        return Response(b"\xff\xd8", media_type="image/jpeg")
+
+    response = await middleware.dispatch(request, mock_call_next)
+
+    assert response.body == b"\xff\xd8"
     assert mock_cache.set.call_count == 0
+
+
+TOKENS = {"Bearer alice-token": "alice", "Bearer bob-token": "bob"}
+
+
+def current_user(request: Request) -> str:
+    """Authenticate a request of the test app."""
+    user = TOKENS.get(request.headers.get("authorization"))
+    if user is None:
+        raise HTTPException(status_code=401)
+    return user
+
+
+async def authorize(request: Request) -> bool:
+    """Authorize cache hits of the test app."""
+    return request.headers.get("authorization") in TOKENS
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_never_leaks_across_users():
+    """Test that private routes are not cached and hits require auth."""
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.get("/bookmarks")
+    async def bookmarks(user: str = Depends(current_user)):
+        return {"user": user}
+
+    @app.get("/news")
+    async def news(user: str = Depends(current_user)):
+        app.state.calls += 1
+        return {"calls": app.state.calls}
+
+    middleware = CacheMiddleware(
+        app,
+        Cache(max_size=10, ttl=60),
+        paths=["/news"],
+        authorize=authorize,
+    )
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport,
+                           base_url="http://test") as client:
+
+        async def get(path, token=None):
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            return await client.get(path, headers=headers)
+
+        alice = await get("/bookmarks", "alice-token")
+        bob = await get("/bookmarks", "bob-token")
+        await get("/news", "alice-token")
+        anonymous = await get("/news")
+        forged = await get("/news", "forged-token")
+        shared = await get("/news", "bob-token")
+
+    assert alice.json() == {"user": "alice"}
+    assert bob.json() == {"user": "bob"}
+    assert anonymous.status_code == forged.status_code == 401
+    assert shared.json() == {"calls": 1}
+    assert app.state.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_trusts_authorized_credentials(counting_app):
+    """Test that accepted credentials are not checked again on hits."""
+    checked = []
+
+    async def counting_authorize(request: Request) -> bool:
+        checked.append(request.headers.get("authorization"))
+        return await authorize(request)
+
+    middleware = CacheMiddleware(
+        counting_app,
+        Cache(max_size=10, ttl=60),
+        paths=["/news"],
+        authorize=counting_authorize,
+        authorize_ttl=60,
+    )
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport,
+                           base_url="http://test") as client:
+        for token in ("alice-token", "alice-token", "forged-token",
+                      "forged-token", "alice-token"):
+            await client.get(
+                "/news", headers={"Authorization": f"Bearer {token}"},
+            )
+
+    # The first request missed; rejected credentials are never trusted
+    assert checked == [
+        "Bearer alice-token", "Bearer forged-token", "Bearer forged-token",
+    ]
+    assert counting_app.state.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_keeps_repeated_headers():
+    """Test that a miss passes repeated response headers through."""
+    app = FastAPI()
+
+    @app.get("/news")
+    async def news():
+        response = JSONResponse({"ok": True})
+        response.set_cookie("first", "1")
+        response.set_cookie("second", "2")
+        return response
+
+    middleware = CacheMiddleware(app, Cache(), paths=["/news"])
+    transport = ASGITransport(app=middleware)
+    async with AsyncClient(transport=transport,
+                           base_url="http://test") as client:
+        response = await client.get("/news")
+
+    assert response.headers.get_list("set-cookie") == [
+        "first=1; Path=/; SameSite=lax", "second=2; Path=/; SameSite=lax",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cache_middleware_runs_hit_hooks(counting_app):
+    """Test that hit hooks see the cached response of every hit."""
+    hits = []
+    middleware = CacheMiddleware(
+        counting_app,
+        Cache(max_size=10, ttl=60),
+        paths=["/news"],
+        hit_hooks={"/news": lambda request, cached: hits.append(cached)},
+    )
+
+    await get_json(middleware, "/news")
+    assert hits == []
+    await get_json(middleware, "/news")
+
+    assert [cached.body for cached in hits] == [b'{"calls":1}']
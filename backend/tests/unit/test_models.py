@@ -13,6 +13,7 @@ from app.models.schemas import (
     Bookmark as BookmarkSchema,
     NewsArticle,
     NewsSearchParams,
+    normalize_search_text,
 )
 
 
@@ -151,3 +152,20 @@ def test_news_schemas():
         NewsSearchParams(page=0)  # Should fail validation
     with pytest.raises(ValueError):
         NewsSearchParams(page=0)  # Should fail validation
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("  Climate   Change ", "climate change"),
+    ("Crypto AND (Ethereum OR Litecoin) NOT bitcoin",
+     "crypto AND (ethereum OR litecoin) NOT bitcoin"),
+    ("   ", None),
+    (None, None),
+])
+def test_normalize_search_text(text, expected):
+    """Test that search text is normalized without changing operators."""
+    assert normalize_search_text(text) == expected
+
+
+def test_news_search_params_normalize_query():
+    """Test that search parameters carry the normalized query."""
+    assert NewsSearchParams(query=" Space\tX ").query == "space x"
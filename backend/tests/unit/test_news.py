@@ -1,15 +1,41 @@
 """Tests for news endpoints."""
+import asyncio
+
 import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.news import prefetch_cached_next_page
+from app.core.middleware import CachedResponse
 from app.db.models import User
 from app.services.auth import AuthService
-from app.services.news import NewsService
-from app.models.schemas import NewsArticle
+from app.services.aggregator import ArticlePage, NewsAggregator
+from app.services.article_store import ArticleStore, article_id_for_url
+from app.services.news import NewsQuotaExceededError, NewsService
+from app.services.personalization import FeedRanker
+from app.core.cursor import decode_cursor, encode_cursor
+from app.core.quota import Priority
+from app.services.prefetch import HeadlinePrefetcher, SearchPagePrefetcher
+from app.services.related import RelatedArticlesIndex
+from app.services.registry import (
+    get_article_store,
+    get_feed_ranker,
+    get_headline_prefetcher,
+    get_news_aggregator,
+    get_news_service,
+    get_related_index,
+    get_search_prefetcher,
+    get_trending_engine,
+)
+from app.services.trending import TrendingEngine
+from app.models.schemas import (
+    ArticleContent,
+    NewsArticle,
+    NewsSearchParams,
+)
 
 
 @pytest.fixture
@@ -65,59 +91,256 @@ def mock_news_articles():
 
 
 @pytest.fixture
-def mock_news_service(mock_news_articles):
-    """Create a mock for NewsService."""
-    mock_service = AsyncMock(spec=NewsService)
-    mock_service.search_articles.return_value = mock_news_articles
-    mock_service.get_top_headlines.return_value = mock_news_articles
-    return mock_service
+def mock_aggregator(app: FastAPI, mock_news_articles):
+    """Create a mock for NewsAggregator."""
+    mock_aggregator = AsyncMock(spec=NewsAggregator)
+
+    async def search_page(params, priority=Priority.INTERACTIVE):
+        return ArticlePage(
+            mock_news_articles,
+            len(mock_news_articles) >= params.page_size,
+        )
+
+    mock_aggregator.search_page.side_effect = search_page
+    mock_aggregator.get_top_headlines.return_value = mock_news_articles
+    app.dependency_overrides[get_news_aggregator] = lambda: mock_aggregator
+    search_prefetcher = SearchPagePrefetcher(mock_aggregator)
+    app.dependency_overrides[get_search_prefetcher] = (
+        lambda: search_prefetcher
+    )
+    news_service = AsyncMock(spec=NewsService)
+
+    async def plan_search(params):
+        if params.local is not None:
+            return params
+        return params.model_copy(update={"local": params.query == "local"})
+
+    news_service.plan_search.side_effect = plan_search
+    app.dependency_overrides[get_news_service] = lambda: news_service
+    return mock_aggregator
+
+
+@pytest.fixture
+def prefetcher(app: FastAPI, mock_aggregator):
+    """Create an empty headline prefetcher."""
+    prefetcher = HeadlinePrefetcher(
+        mock_aggregator,
+        categories=["technology"],
+        countries=["us"],
+    )
+    app.dependency_overrides[get_headline_prefetcher] = lambda: prefetcher
+    return prefetcher
 
 
 @pytest.mark.asyncio
 async def test_search_news(
         client: AsyncClient,
         mock_auth_service,
-        mock_news_service,
+        mock_aggregator,
         mock_news_articles):
     """Test searching for news."""
-    with patch("app.api.v1.endpoints.news.NewsService") as mock_service_class:
-        mock_service_class.return_value.__aenter__.return_value = (
-            mock_news_service
-        )
-        response = await client.get(
-            "/api/v1/news/search",
-            params={"query": "test"}
-        )
-        mock_news_service.search_articles.assert_called_once()
-        assert response.status_code == 200
-        data = response.json()
-        assert len(data) == 1
-        assert data[0]["title"] == "Test Title"
+    response = await client.get(
+        "/api/v1/news/search",
+        params={"query": "test"}
+    )
+    mock_aggregator.search_page.assert_called_once()
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["title"] == "Test Title"
+
+
+@pytest.mark.asyncio
+async def test_search_news_next_cursor(
+        client: AsyncClient,
+        mock_auth_service,
+        mock_aggregator):
+    """Test that full pages link to the next page through a cursor."""
+    response = await client.get(
+        "/api/v1/news/search",
+        params={"query": "test", "page_size": 1}
+    )
+
+    assert response.status_code == 200
+    state = decode_cursor(response.headers["x-next-cursor"])
+    assert state["query"] == "test"
+    assert state["page"] == 2
+    assert state["page_size"] == 1
+    assert state["local"] is False
+
+    # The next page was prefetched and is served without a new search,
+    # while the page after it is prefetched in turn
+    for _ in range(10):
+        await asyncio.sleep(0)
+    mock_aggregator.search_page.reset_mock()
+    response = await client.get(
+        "/api/v1/news/search",
+        params={"cursor": response.headers["x-next-cursor"]}
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Test Title"
+    (params, priority), _ = mock_aggregator.search_page.call_args
+    assert mock_aggregator.search_page.call_count == 1
+    assert (params.page, priority) == (3, Priority.BACKGROUND)
+
+
+@pytest.mark.asyncio
+async def test_search_news_cursor_keeps_local_decision(
+        client: AsyncClient,
+        mock_auth_service,
+        mock_aggregator):
+    """Test that every page of a query is searched the same way."""
+    response = await client.get(
+        "/api/v1/news/search",
+        params={"query": "local", "page_size": 1}
+    )
+    cursor = response.headers["x-next-cursor"]
+    assert decode_cursor(cursor)["local"] is True
+
+    # Even a cursor naming another query keeps its recorded decision
+    state = {**decode_cursor(cursor), "query": "other", "local": True}
+    await client.get(
+        "/api/v1/news/search", params={"cursor": encode_cursor(state)},
+    )
+    (params, _), _ = mock_aggregator.search_page.call_args
+    assert (params.query, params.local) == ("other", True)
+
+
+def test_prefetch_cached_next_page():
+    """Test that cached search hits prefetch the page after them."""
+    prefetcher = MagicMock(spec=SearchPagePrefetcher)
+    request = MagicMock()
+    request.app.state.services.search_prefetcher = prefetcher
+    cursor = encode_cursor(
+        NewsSearchParams(query="test", page=2, local=False).model_dump()
+    )
+
+    prefetch_cached_next_page(request, CachedResponse(b"[]", [
+        (b"content-type", b"application/json"),
+        (b"x-next-cursor", cursor.encode()),
+    ]))
+    prefetch_cached_next_page(request, CachedResponse(b"[]", []))
+
+    prefetcher.schedule.assert_called_once_with(
+        NewsSearchParams(query="test", page=2, local=False)
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_news_last_page_has_no_cursor(
+        client: AsyncClient,
+        mock_auth_service,
+        mock_aggregator):
+    """Test that a short page has no next cursor."""
+    response = await client.get(
+        "/api/v1/news/search",
+        params={"query": "test", "page_size": 10}
+    )
+
+    assert response.status_code == 200
+    assert "x-next-cursor" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_search_news_collapsed_page_has_cursor(
+        client: AsyncClient,
+        mock_auth_service,
+        mock_aggregator,
+        mock_news_articles):
+    """Test that a page shortened by collapsing still links onward."""
+    mock_aggregator.search_page.side_effect = None
+    mock_aggregator.search_page.return_value = ArticlePage(
+        mock_news_articles, True,
+    )
+
+    response = await client.get(
+        "/api/v1/news/search",
+        params={"query": "test", "page_size": 10}
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert decode_cursor(response.headers["x-next-cursor"])["page"] == 2
+
+
+@pytest.mark.asyncio
+async def test_search_news_tampered_cursor(
+        client: AsyncClient,
+        mock_auth_service,
+        mock_aggregator):
+    """Test that cursors not signed by the server are rejected."""
+    cursor = encode_cursor({"query": "test", "page": 2}, key="other")
+
+    response = await client.get(
+        "/api/v1/news/search",
+        params={"cursor": cursor}
+    )
+
+    assert response.status_code == 422
+    mock_aggregator.search_page.assert_not_called()
 
 
 @pytest.mark.asyncio
 async def test_get_headlines(
         client: AsyncClient,
         mock_auth_service,
-        mock_news_service,
+        mock_aggregator,
+        prefetcher,
         mock_news_articles):
     """Test getting headlines."""
-    with patch("app.api.v1.endpoints.news.NewsService") as mock_service_class:
-        mock_service_class.return_value.__aenter__.return_value = (
-            mock_news_service
-        )
-        response = await client.get("/api/v1/news/headlines")
-        assert response.status_code == 200
-        data = response.json()
-        assert len(data) == 1
-        assert data[0]["title"] == "Test Title"
-        mock_news_service.get_top_headlines.assert_called_once()
+    response = await client.get("/api/v1/news/headlines")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["title"] == "Test Title"
+    mock_aggregator.get_top_headlines.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_get_headlines_from_snapshot(
+        client: AsyncClient,
+        mock_auth_service,
+        mock_aggregator,
+        prefetcher):
+    """Test that prefetched headlines are served without going upstream."""
+    await prefetcher.refresh()
+    mock_aggregator.get_top_headlines.reset_mock()
+
+    response = await client.get(
+        "/api/v1/news/headlines",
+        params={"category": "technology"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Test Title"
+    mock_aggregator.get_top_headlines.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_news_quota_exceeded(
+        client: AsyncClient,
+        mock_auth_service,
+        mock_aggregator):
+    """Test that an exhausted upstream budget yields a fast 503."""
+    mock_aggregator.search_page.side_effect = NewsQuotaExceededError(
+        "Daily upstream quota exhausted", retry_after=12.3
+    )
+
+    response = await client.get(
+        "/api/v1/news/search",
+        params={"query": "test"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "13"
+    assert "quota" in response.json()["detail"]
 
 
 @pytest.mark.asyncio
 async def test_search_news_invalid_params(
         client: AsyncClient,
-        mock_auth_service):
+        mock_auth_service,
+        mock_aggregator):
     """Test searching for news with invalid parameters."""
     response = await client.get(
         "/api/v1/news/search",
@@ -131,10 +354,179 @@ async def test_search_news_invalid_params(
 @pytest.mark.asyncio
 async def test_get_headlines_invalid_params(
         client: AsyncClient,
-        mock_auth_service):
+        mock_auth_service,
+        mock_aggregator,
+        prefetcher):
     """Test getting headlines with invalid parameters."""
     response = await client.get(
         "/api/v1/news/headlines",
         params={"page_size": 101}
     )
     assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_headlines_batch(
+        client: AsyncClient,
+        mock_auth_service,
+        mock_aggregator,
+        mock_news_articles,
+        prefetcher):
+    """Test that a batch mixes snapshot hits, fetches and failures."""
+    await prefetcher.refresh()
+
+    async def headlines(category=None, country="us", page_size=10,
+                        **kwargs):
+        if category == "sports":
+            raise NewsQuotaExceededError("Quota exhausted", retry_after=4.5)
+        return mock_news_articles
+
+    mock_aggregator.get_top_headlines.reset_mock()
+    mock_aggregator.get_top_headlines.side_effect = headlines
+
+    response = await client.get(
+        "/api/v1/news/headlines/batch",
+        params={"categories": ["technology", "science", "sports"]},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(body["results"]) == ["us:science", "us:technology"]
+    assert body["results"]["us:science"][0]["title"] == "Test Title"
+    assert body["errors"] == {
+        "us:sports": {
+            "status_code": 503,
+            "detail": "Quota exhausted",
+            "retry_after": 5,
+        },
+    }
+    # technology was served from the snapshot
+    assert mock_aggregator.get_top_headlines.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_headlines_batch_too_large(
+        client: AsyncClient,
+        mock_auth_service,
+        mock_aggregator,
+        prefetcher):
+    """Test that oversized batches are rejected."""
+    response = await client.get(
+        "/api/v1/news/headlines/batch",
+        params={
+            "categories": [f"c{i}" for i in range(11)],
+            "countries": ["us", "gb", "de", "fr", "it"],
+        },
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_article_reader_view(
+        app: FastAPI,
+        client: AsyncClient,
+        mock_auth_service,
+        mock_news_articles):
+    """Test that stored articles are served with their body text."""
+    store = AsyncMock(spec=ArticleStore)
+    store.get_content.side_effect = [
+        ArticleContent(**mock_news_articles[0].model_dump(), body="Text"),
+        ArticleContent(**mock_news_articles[0].model_dump()),
+        None,
+    ]
+    app.dependency_overrides[get_article_store] = lambda: store
+
+    extracted = await client.get("/api/v1/news/articles/abc")
+    pending = await client.get("/api/v1/news/articles/abc")
+    missing = await client.get("/api/v1/news/articles/xyz")
+
+    assert extracted.status_code == 200
+    assert extracted.json()["body"] == "Text"
+    assert "cache-control" not in extracted.headers
+    assert pending.json()["body"] is None
+    assert pending.headers["cache-control"] == "no-store"
+    assert missing.status_code == 404
+    store.get_content.assert_called_with("xyz")
+
+
+@pytest.mark.asyncio
+async def test_get_trending(
+        app: FastAPI,
+        client: AsyncClient,
+        mock_auth_service,
+        mock_news_articles):
+    """Test that trending terms of observed articles are returned."""
+    trending = TrendingEngine()
+    trending.observe([
+        article.model_copy(update={"published_at": None})
+        for article in mock_news_articles
+    ])
+    app.dependency_overrides[get_trending_engine] = lambda: trending
+
+    response = await client.get(
+        "/api/v1/news/trending", params={"window": "24h", "limit": 1}
+    )
+    unknown = await client.get(
+        "/api/v1/news/trending", params={"window": "7d"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["window"] == "24h"
+    assert response.json()["terms"] == [{"term": "description", "count": 1}]
+    assert response.json()["entities"] == [
+        {"term": "Test Title", "count": 1},
+    ]
+    assert unknown.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_feed(
+        app: FastAPI,
+        client: AsyncClient,
+        session_factory,
+        mock_auth_service,
+        mock_news_articles):
+    """Test that the feed is ranked per user and never cached."""
+    store = ArticleStore(session_factory)
+    await store.ingest(mock_news_articles)
+    feed_ranker = FeedRanker(store, session_factory)
+    app.dependency_overrides[get_feed_ranker] = lambda: feed_ranker
+
+    response = await client.get(
+        "/api/v1/news/feed", params={"page_size": 5}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-store"
+    assert [a["title"] for a in response.json()] == ["Test Title"]
+    assert feed_ranker.stats()["built"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_related(
+        app: FastAPI,
+        client: AsyncClient,
+        session_factory,
+        mock_auth_service,
+        mock_news_articles):
+    """Test that related articles are returned for stored articles."""
+    store = ArticleStore(session_factory)
+    related = RelatedArticlesIndex(store)
+    store.add_listener(related.add)
+    await store.ingest(mock_news_articles + [
+        mock_news_articles[0].model_copy(
+            update={"url": "https://example.com/follow-up"}
+        ),
+    ])
+    app.dependency_overrides[get_related_index] = lambda: related
+    article_id = article_id_for_url(mock_news_articles[0].url)
+
+    response = await client.get(f"/api/v1/news/{article_id}/related")
+    missing = await client.get("/api/v1/news/missing/related")
+
+    assert response.status_code == 200
+    assert [a["url"] for a in response.json()] == [
+        "https://example.com/follow-up",
+    ]
+    assert missing.status_code == 404
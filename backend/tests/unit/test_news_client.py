@@ -0,0 +1,139 @@
+"""Tests for the async NewsAPI client."""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.news_client import (
+    AsyncNewsApiClient,
+    NewsApiError,
+    build_query_params,
+)
+
+
+def test_build_query_params():
+    """Test mapping of keyword arguments to NewsAPI parameters."""
+    params = build_query_params({
+        "q": "python",
+        "page_size": 20,
+        "from_param": "2024-01-01",
+        "category": None,
+    })
+
+    assert params == {"q": "python", "pageSize": 20, "from": "2024-01-01"}
+
+
+@pytest.mark.asyncio
+async def test_client_sends_api_key_header():
+    """Test that the API key is sent as a header."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["X-Api-Key"])
+        return httpx.Response(200, json={"status": "ok", "articles": []})
+
+    async with AsyncNewsApiClient(
+        api_key="secret",
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        response = await client.get_top_headlines(country="us")
+
+    assert response["articles"] == []
+    assert seen == ["secret"]
+
+
+@pytest.mark.asyncio
+async def test_client_raises_on_error_payload():
+    """Test that NewsAPI error payloads raise NewsApiError."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            429,
+            json={"status": "error", "code": "rateLimited",
+                  "message": "Too many requests"},
+        )
+
+    async with AsyncNewsApiClient(
+        api_key="secret",
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        with pytest.raises(NewsApiError) as exc_info:
+            await client.get_everything(q="test")
+
+    assert exc_info.value.code == "rateLimited"
+    assert exc_info.value.status_code == 429
+    assert not exc_info.value.is_client_error
+    assert "Too many requests" in str(exc_info.value)
+
+
+@pytest.mark.parametrize("status_code, code, client_error", [
+    (400, "parametersMissing", True),
+    (401, "apiKeyInvalid", True),
+    (429, "rateLimited", False),
+    (500, "unexpectedError", False),
+    (None, None, False),
+])
+def test_news_api_error_is_client_error(status_code, code, client_error):
+    """Test which NewsAPI errors are the fault of the request."""
+    error = NewsApiError("error", code, status_code)
+
+    assert error.is_client_error is client_error
+
+
+@pytest.mark.asyncio
+async def test_client_raises_on_non_json_response():
+    """Test that non-JSON error bodies still raise NewsApiError."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(502, text="Bad Gateway")
+
+    async with AsyncNewsApiClient(
+        api_key="secret",
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        with pytest.raises(NewsApiError, match="HTTP 502"):
+            await client.get_everything(q="test")
+
+
+@pytest.mark.asyncio
+async def test_client_bounds_concurrency():
+    """Test that no more than max_concurrency calls run at once."""
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"status": "ok", "articles": []})
+
+    async with AsyncNewsApiClient(
+        api_key="secret",
+        max_concurrency=2,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        await asyncio.gather(*(
+            client.get_everything(q=str(i)) for i in range(6)
+        ))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_client_per_call_timeout():
+    """Test that a per-call timeout is passed to the transport."""
+    timeouts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={"status": "ok", "articles": []})
+
+    async with AsyncNewsApiClient(
+        api_key="secret",
+        timeout=10.0,
+        transport=httpx.MockTransport(handler),
+    ) as client:
+        await client.get_everything(q="a")
+        await client.get_everything(q="b", timeout=1.5)
+
+    assert timeouts == [10.0, 1.5]
@@ -1,12 +1,34 @@
 """Tests for the news service."""
+import asyncio
+
+import httpx
 import pytest
-from unittest.mock import patch, MagicMock
 
+from unittest.mock import MagicMock
+
+from app.services.article_store import ArticleStore, article_id_for_url
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.quota import Priority, UpstreamScheduler
 from app.services.news import (
+    NewsQuotaExceededError,
+    NewsRequestError,
+    NewsServiceError,
+    NewsUnavailableError,
     NewsService,
     NewsSearchParams,
+    convert_api_response_to_articles,
     create_news_api_client,
 )
+from app.services.news_client import AsyncNewsApiClient
+from app.services.search import ArticleSearchEngine
+
+
+def make_client(handler) -> AsyncNewsApiClient:
+    """Create an upstream client served by a mock transport."""
+    return AsyncNewsApiClient(
+        api_key="test-api-key",
+        transport=httpx.MockTransport(handler),
+    )
 
 
 @pytest.fixture
@@ -32,65 +54,78 @@ def mock_news_response():
 @pytest.mark.asyncio
 async def test_search_articles(mock_news_response):
     """Test searching for news articles."""
-    mock_client = MagicMock()
-    mock_client.get_everything.return_value = mock_news_response
-
-    with patch("app.services.news.NewsApiClient", return_value=mock_client):
-        async with NewsService() as news_service:
-            params = NewsSearchParams(
-                query="test",
-                category="technology",
-                page_size=10,
-                page=1,
-            )
-            articles = await news_service.search_articles(params)
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=mock_news_response)
 
-            assert len(articles) == 1
-            article = articles[0]
-            assert article.title == "Test Title"
-            assert article.author == "Test Author"
-            assert article.source == "Test Source"
+    async with NewsService(make_client(handler)) as news_service:
+        params = NewsSearchParams(
+            query="test",
+            category="technology",
+            page_size=10,
+            page=1,
+        )
+        articles = await news_service.search_articles(params)
+
+        assert len(articles) == 1
+        article = articles[0]
+        assert article.title == "Test Title"
+        assert article.author == "Test Author"
+        assert article.source == "Test Source"
+
+    assert requests[0].url.path.endswith("/everything")
+    assert requests[0].url.params["q"] == "test"
+    assert requests[0].url.params["pageSize"] == "10"
 
 
 @pytest.mark.asyncio
 async def test_get_top_headlines(mock_news_response):
     """Test getting top headlines."""
-    mock_client = MagicMock()
-    mock_client.get_top_headlines.return_value = mock_news_response
-
-    with patch("app.services.news.NewsApiClient", return_value=mock_client):
-        async with NewsService() as news_service:
-            articles = await news_service.get_top_headlines(
-                category="technology",
-                country="us",
-                page_size=10,
-            )
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path.endswith("/top-headlines")
+        assert request.url.params["category"] == "technology"
+        return httpx.Response(200, json=mock_news_response)
 
-            assert len(articles) == 1
-            article = articles[0]
-            assert article.title == "Test Title"
-            assert article.author == "Test Author"
-            assert article.source == "Test Source"
+    async with NewsService(make_client(handler)) as news_service:
+        articles = await news_service.get_top_headlines(
+            category="technology",
+            country="us",
+            page_size=10,
+        )
 
+        assert len(articles) == 1
+        article = articles[0]
+        assert article.title == "Test Title"
+        assert article.author == "Test Author"
+        assert article.source == "Test Source"
 
-def test_create_news_api_client():
-    """Test creating a NewsApiClient instance."""
+
+@pytest.mark.asyncio
+async def test_create_news_api_client():
+    """Test creating an AsyncNewsApiClient instance."""
     client = create_news_api_client("test-api-key")
-    assert client is not None
+    assert isinstance(client, AsyncNewsApiClient)
+    await client.aclose()
 
 
 @pytest.mark.asyncio
 async def test_news_service_error_handling():
     """Test error handling in news service."""
-    mock_client = MagicMock()
-    mock_client.get_everything.side_effect = Exception("API Error")
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            401,
+            json={"status": "error", "code": "apiKeyInvalid",
+                  "message": "API Error"},
+        )
 
-    with patch("app.services.news.NewsApiClient", return_value=mock_client):
-        async with NewsService() as news_service:
-            params = NewsSearchParams(query="test")
-            with pytest.raises(Exception) as exc_info:
-                await news_service.search_articles(params)
-            assert "Error fetching news" in str(exc_info.value)
+    async with NewsService(make_client(handler)) as news_service:
+        params = NewsSearchParams(query="test")
+        with pytest.raises(Exception) as exc_info:
+            await news_service.search_articles(params)
+        assert "Error fetching news" in str(exc_info.value)
+        assert "API Error" in str(exc_info.value)
 
 
 @pytest.mark.asyncio
@@ -98,3 +133,299 @@ async def test_news_service_context_manager():
     """Test news service context manager."""
     async with NewsService() as news_service:
         assert isinstance(news_service, NewsService)
+
+
+def test_convert_maps_newsapi_fields(mock_news_response):
+    """Test that NewsAPI field names are mapped onto the schema."""
+    articles = convert_api_response_to_articles(
+        mock_news_response, category="science"
+    )
+
+    article = articles[0]
+    assert article.id == article_id_for_url(article.url)
+    assert article.published_at.year == 2024
+    assert article.image_url == "https://example.com/image.jpg"
+    assert article.category == "science"
+
+
+@pytest.mark.asyncio
+async def test_fetched_articles_are_stored(mock_news_response):
+    """Test that fetched articles are handed to the article store."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=mock_news_response)
+
+    store = MagicMock(spec=ArticleStore)
+    async with NewsService(
+        make_client(handler), article_store=store
+    ) as news_service:
+        articles = await news_service.search_articles(
+            NewsSearchParams(query="test", language="de")
+        )
+
+    store.submit.assert_called_once_with(articles, "de")
+
+
+@pytest.mark.asyncio
+async def test_search_answered_locally():
+    """Test that covered searches never go upstream."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("upstream must not be called")
+
+    local_articles = [MagicMock()]
+    engine = MagicMock(spec=ArticleSearchEngine)
+    engine.covers.return_value = True
+    engine.search.return_value = local_articles
+
+    async with NewsService(
+        make_client(handler), search_engine=engine
+    ) as news_service:
+        articles = await news_service.search_articles(
+            NewsSearchParams(query="test")
+        )
+        planned = await news_service.plan_search(
+            NewsSearchParams(query="test")
+        )
+
+    assert articles is local_articles
+    assert planned.local is True
+
+
+@pytest.mark.asyncio
+async def test_planned_search_is_not_decided_again(mock_news_response):
+    """Test that later pages keep the decision of the first page."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=mock_news_response)
+
+    engine = MagicMock(spec=ArticleSearchEngine)
+    engine.covers.return_value = True
+    engine.search.return_value = [MagicMock()]
+
+    async with NewsService(
+        make_client(handler), search_engine=engine
+    ) as news_service:
+        articles = await news_service.search_articles(
+            NewsSearchParams(query="test", page=2, local=False)
+        )
+
+    assert articles[0].title == "Test Title"
+    engine.covers.assert_not_called()
+    engine.search.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_upstream(mock_news_response):
+    """Test that uncovered or failing local searches go upstream."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=mock_news_response)
+
+    engine = MagicMock(spec=ArticleSearchEngine)
+    engine.covers.side_effect = [False, RuntimeError("no such table"), True]
+    engine.search.side_effect = RuntimeError("no such table")
+
+    async with NewsService(
+        make_client(handler), search_engine=engine
+    ) as news_service:
+        for _ in range(3):
+            articles = await news_service.search_articles(
+                NewsSearchParams(query="test")
+            )
+            assert articles[0].title == "Test Title"
+
+
+@pytest.mark.asyncio
+async def test_identical_upstream_calls_are_coalesced(mock_news_response):
+    """Test that concurrent identical searches share one upstream call."""
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=mock_news_response)
+
+    async with NewsService(make_client(handler)) as news_service:
+        results = await asyncio.gather(
+            news_service.search_articles(NewsSearchParams(query="test")),
+            news_service.search_articles(NewsSearchParams(query=" test ")),
+            news_service.search_articles(NewsSearchParams(query="other")),
+        )
+        metrics = news_service.metrics()
+
+    assert calls == 2
+    assert results[0] is results[1]
+    assert metrics["singleflight"]["collapsed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_quota_exhaustion_fails_fast(mock_news_response):
+    """Test that calls beyond the budget fail without going upstream."""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json=mock_news_response)
+
+    scheduler = UpstreamScheduler(daily_budget=1, interactive_reserve=0)
+    async with NewsService(
+        make_client(handler), scheduler=scheduler
+    ) as news_service:
+        await news_service.get_top_headlines(country="us")
+        with pytest.raises(NewsQuotaExceededError) as exc_info:
+            await news_service.get_top_headlines(
+                country="gb", priority=Priority.BACKGROUND
+            )
+        metrics = news_service.metrics()
+
+    assert calls == 1
+    assert exc_info.value.retry_after > 0
+    assert metrics["quota"]["rejected"]["background"] == 1
+
+
+@pytest.mark.asyncio
+async def test_last_good_result_served_when_upstream_fails(
+    mock_news_response,
+):
+    """Test that a failing upstream serves the last good result."""
+    responses = [httpx.Response(200, json=mock_news_response),
+                 httpx.Response(500, text="boom")]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    async with NewsService(make_client(handler)) as news_service:
+        fresh = await news_service.get_top_headlines(country="us")
+        stale = await news_service.get_top_headlines(country="us")
+        metrics = news_service.metrics()
+
+    assert stale == fresh
+    assert metrics["fallbacks_served"] == 1
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_falls_back_to_stored_articles():
+    """Test that an open circuit skips upstream and serves stored data."""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503, text="unavailable")
+
+    stored = [MagicMock()]
+    store = MagicMock(spec=ArticleStore)
+    store.recent.return_value = stored
+    engine = MagicMock(spec=ArticleSearchEngine)
+    engine.covers.return_value = False
+    engine.search.return_value = []
+
+    async with NewsService(
+        make_client(handler),
+        article_store=store,
+        search_engine=engine,
+        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+    ) as news_service:
+        headlines = await news_service.get_top_headlines(
+            category="science", country="us", page_size=5
+        )
+        with pytest.raises(NewsUnavailableError) as exc_info:
+            await news_service.search_articles(
+                NewsSearchParams(query="test")
+            )
+        metrics = news_service.metrics()
+
+    assert calls == 1
+    assert headlines is stored
+    store.recent.assert_called_once_with(category="science", limit=5)
+    assert exc_info.value.retry_after > 0
+    assert metrics["circuit_breaker"]["state"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_failure_without_fallback_raises():
+    """Test that errors surface when there is nothing stale to serve."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500, text="boom")
+
+    async with NewsService(make_client(handler)) as news_service:
+        with pytest.raises(NewsServiceError):
+            await news_service.get_top_headlines(country="us")
+
+
+def test_convert_normalizes_before_batch_validation():
+    """Test that sources are flattened and unknown fields dropped."""
+    response = {
+        "articles": [
+            {"source": "Plain Source", "title": "A", "content": "Body",
+             "url": "https://example.com/a"},
+            {"source": {"id": None, "name": "Named"}, "title": "B",
+             "url": "https://example.com/b"},
+        ],
+    }
+
+    articles = convert_api_response_to_articles(response)
+
+    assert [a.source for a in articles] == ["Plain Source", "Named"]
+    assert not hasattr(articles[0], "content")
+
+
+@pytest.mark.asyncio
+async def test_client_errors_do_not_open_the_circuit(mock_news_response):
+    """Test that rejected requests are raised without tripping it."""
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path.endswith("/everything"):
+            return httpx.Response(400, json={
+                "status": "error", "code": "parametersMissing",
+                "message": "Required parameters are missing.",
+            })
+        return httpx.Response(200, json=mock_news_response)
+
+    async with NewsService(
+        make_client(handler),
+        breaker=CircuitBreaker(failure_threshold=2),
+    ) as news_service:
+        for _ in range(3):
+            with pytest.raises(NewsRequestError):
+                await news_service.search_articles(
+                    NewsSearchParams(query="test")
+                )
+        headlines = await news_service.get_top_headlines(country="us")
+        metrics = news_service.metrics()
+
+    assert len(headlines) == 1
+    assert len(calls) == 4
+    assert metrics["circuit_breaker"]["state"] == "closed"
+    assert metrics["fallbacks_served"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limiting_opens_the_circuit():
+    """Test that rate limiting counts as an upstream failure."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429, json={
+            "status": "error", "code": "rateLimited", "message": "Slow down",
+        })
+
+    async with NewsService(
+        make_client(handler),
+        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+    ) as news_service:
+        with pytest.raises(NewsServiceError):
+            await news_service.get_top_headlines(country="us")
+        with pytest.raises(NewsUnavailableError):
+            await news_service.get_top_headlines(country="us")
+
+
+@pytest.mark.asyncio
+async def test_search_without_query_skips_newsapi():
+    """Test that NewsAPI is not asked searches it cannot answer."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("NewsAPI must not be called")
+
+    async with NewsService(make_client(handler)) as news_service:
+        assert await news_service.search_articles(
+            NewsSearchParams(query="   ", category="science")
+        ) == []
@@ -0,0 +1,166 @@
+"""Tests for the personalized feed ranking."""
+import numpy as np
+import pytest
+from sqlalchemy import delete
+
+from app.db.models import Bookmark, User
+from app.services.article_store import ArticleStore
+from app.services.personalization import (
+    EMPTY_VECTOR,
+    FeedRanker,
+    UserProfile,
+    add_vectors,
+    article_vector,
+    score_articles,
+)
+
+
+async def add_user(session_factory) -> int:
+    """Store a test user and get its id."""
+    async with session_factory() as session:
+        user = User(email="reader@example.com", firebase_uid="reader")
+        session.add(user)
+        await session.commit()
+        return user.id
+
+
+async def add_bookmark(session_factory, user_id: int, title: str) -> int:
+    """Store a bookmark of the user and get its id."""
+    async with session_factory() as session:
+        bookmark = Bookmark(
+            user_id=user_id,
+            article_id=title,
+            title=title,
+            url=f"https://example.com/bookmarks/{title}",
+            source="Test Source",
+        )
+        session.add(bookmark)
+        await session.commit()
+        return bookmark.id
+
+
+def test_article_vector_has_unit_length(make_article):
+    """Test that article vectors are sorted and normalized."""
+    indices, weights = article_vector(
+        make_article(0, title="Rocket launch delayed by storms"),
+    )
+
+    assert list(indices) == sorted(set(indices))
+    assert np.isclose(np.dot(weights, weights), 1.0)
+
+
+def test_add_vectors_cancels_out(make_article):
+    """Test that subtracting a vector restores the previous sum."""
+    first = article_vector(make_article(0, title="Rocket launch delayed"))
+    second = article_vector(make_article(1, title="Rocket engines tested"))
+
+    total = add_vectors(add_vectors(EMPTY_VECTOR, first), second)
+    restored = add_vectors(total, second, sign=-1.0)
+
+    assert np.array_equal(restored[0], first[0])
+    assert np.allclose(restored[1], first[1])
+
+
+def test_score_articles_prefers_shared_terms(make_article):
+    """Test that articles sharing profile terms score higher."""
+    profile = article_vector(
+        make_article(0, title="Rocket launch from Florida"),
+    )
+    articles = [
+        make_article(1, title="Election results announced"),
+        make_article(2, title="Second rocket launch planned"),
+        make_article(3, title="Markets close higher"),
+    ]
+
+    scores = score_articles(profile, [article_vector(a) for a in articles])
+
+    assert scores.argmax() == 1
+    assert scores[1] > 0
+    assert list(score_articles(EMPTY_VECTOR, [profile])) == [0.0]
+
+
+def test_profile_add_and_remove(make_article):
+    """Test that a profile follows its bookmarks."""
+    profile = UserProfile()
+    article = make_article(0, title="Rocket launch", id="rocket")
+
+    profile.add(1, article)
+    profile.add(1, article)
+    assert profile.bookmark_ids == {1}
+    assert profile.bookmarked == {"rocket", article.url}
+
+    profile.remove(1)
+    assert profile.bookmark_ids == set()
+    assert len(profile.vector[0]) == 0
+
+
+@pytest.mark.asyncio
+async def test_feed_ranks_by_bookmarks(session_factory, make_article):
+    """Test that the feed ranks matching articles first."""
+    store = ArticleStore(session_factory)
+    await store.ingest([
+        make_article(1, title="Rocket launch scheduled for Friday"),
+        make_article(2, title="Parliament passes budget"),
+        make_article(3, title="Football club signs striker"),
+    ])
+    user_id = await add_user(session_factory)
+    ranker = FeedRanker(store, session_factory)
+
+    unranked = await ranker.feed(user_id, limit=3)
+    await add_bookmark(session_factory, user_id, "Rocket engine test")
+    ranked = await ranker.feed(user_id, limit=3)
+
+    assert [a.title for a in unranked][0] == "Football club signs striker"
+    assert len(ranked) == 3
+    assert ranked[0].title == "Rocket launch scheduled for Friday"
+    assert ranker.stats()["built"] == 1
+    assert ranker.stats()["added"] == 1
+
+
+@pytest.mark.asyncio
+async def test_feed_updates_profile_incrementally(
+        session_factory, make_article):
+    """Test that only changed bookmarks are applied to a profile."""
+    store = ArticleStore(session_factory)
+    await store.ingest([make_article(1, title="Rocket launch scheduled")])
+    user_id = await add_user(session_factory)
+    ranker = FeedRanker(store, session_factory)
+    first = await add_bookmark(session_factory, user_id, "Rocket news")
+    await add_bookmark(session_factory, user_id, "Budget news")
+    await ranker.feed(user_id)
+
+    async with session_factory() as session:
+        await session.execute(delete(Bookmark).where(Bookmark.id == first))
+        await session.commit()
+    await add_bookmark(session_factory, user_id, "Striker news")
+    profile = await ranker.profile(user_id)
+
+    assert len(profile.bookmark_ids) == 2
+    assert ranker.stats() == {
+        "built": 1, "added": 3, "removed": 1, "profiles": 1, "vectors": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_feed_skips_bookmarked_articles(session_factory, make_article):
+    """Test that bookmarked articles are left out of the feed."""
+    store = ArticleStore(session_factory)
+    await store.ingest([
+        make_article(1, title="Rocket launch"),
+        make_article(2, title="Rocket landing"),
+    ])
+    user_id = await add_user(session_factory)
+    async with session_factory() as session:
+        session.add(Bookmark(
+            user_id=user_id,
+            article_id="saved",
+            title="Rocket landing",
+            url="https://example.com/articles/2",
+            source="Test Source",
+        ))
+        await session.commit()
+    ranker = FeedRanker(store, session_factory)
+
+    feed = await ranker.feed(user_id)
+
+    assert [a.title for a in feed] == ["Rocket launch"]
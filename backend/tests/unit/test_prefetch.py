@@ -0,0 +1,153 @@
+"""Tests for the headline prefetcher."""
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.quota import Priority
+from app.models.schemas import NewsSearchParams
+from app.services.aggregator import ArticlePage, NewsAggregator
+from app.services.news import NewsServiceError
+from app.services.prefetch import HeadlinePrefetcher, SearchPagePrefetcher
+
+
+@pytest.fixture
+def aggregator(make_article):
+    """Create a mock news aggregator."""
+    articles = [make_article(i) for i in range(5)]
+    aggregator = AsyncMock(spec=NewsAggregator)
+    aggregator.get_top_headlines.return_value = articles
+    aggregator.search_page.return_value = ArticlePage(articles, True)
+    return aggregator
+
+
+@pytest.fixture
+def prefetcher(aggregator):
+    """Create a prefetcher fixture."""
+    return HeadlinePrefetcher(
+        aggregator,
+        categories=["business", "sports"],
+        countries=["us", "gb"],
+        interval=3600,
+        page_size=5,
+    )
+
+
+def test_combinations(prefetcher):
+    """Test that every category and country is covered."""
+    combinations = prefetcher.combinations()
+
+    assert len(combinations) == 6
+    assert (None, "us") in combinations
+    assert ("sports", "gb") in combinations
+
+
+def test_lookup_before_refresh(prefetcher):
+    """Test that unknown combinations are reported as misses."""
+    assert prefetcher.lookup("business", "us", 5) is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_fills_snapshot(prefetcher, aggregator):
+    """Test that a refresh fetches every combination."""
+    await prefetcher.refresh()
+
+    assert aggregator.get_top_headlines.call_count == 6
+    articles = prefetcher.lookup("business", "us", 3)
+    assert [a.title for a in articles] == ["Title 0", "Title 1", "Title 2"]
+
+
+@pytest.mark.asyncio
+async def test_lookup_larger_than_snapshot(prefetcher):
+    """Test that a full snapshot cannot satisfy a larger page size."""
+    await prefetcher.refresh()
+
+    assert prefetcher.lookup("business", "us", 10) is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_keeps_previous_snapshot_on_error(
+        prefetcher, aggregator):
+    """Test that a failed refresh keeps the last good snapshot."""
+    await prefetcher.refresh()
+    aggregator.get_top_headlines.side_effect = NewsServiceError("down")
+
+    await prefetcher.refresh()
+
+    assert len(prefetcher.lookup(None, "gb", 5)) == 5
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_falls_through(aggregator):
+    """Test that snapshots older than the max age are not served."""
+    now = [0.0]
+    prefetcher = HeadlinePrefetcher(
+        aggregator, categories=[], countries=["us"], interval=60,
+        page_size=5, clock=lambda: now[0],
+    )
+    await prefetcher.refresh()
+    aggregator.get_top_headlines.side_effect = NewsServiceError("down")
+
+    now[0] = 120
+    await prefetcher.refresh()
+    assert prefetcher.lookup(None, "us", 5) is not None
+    now[0] = 121
+    assert prefetcher.lookup(None, "us", 5) is None
+
+
+def test_daily_calls(prefetcher):
+    """Test the upstream calls refreshes make per day."""
+    assert prefetcher.daily_calls() == 6 * 24
+
+
+@pytest.mark.asyncio
+async def test_start_and_stop(prefetcher, aggregator):
+    """Test that the background task refreshes and stops cleanly."""
+    prefetcher.start()
+    for _ in range(100):
+        if prefetcher.lookup("sports", "us", 5) is not None:
+            break
+        await asyncio.sleep(0)
+    await prefetcher.stop()
+
+    assert aggregator.get_top_headlines.call_count == 6
+    assert prefetcher.lookup("sports", "us", 5) is not None
+
+
+@pytest.fixture
+def search_prefetcher(aggregator):
+    """Create a search page prefetcher fixture."""
+    return SearchPagePrefetcher(aggregator, max_page=3, max_in_flight=1)
+
+
+@pytest.mark.asyncio
+async def test_search_prefetch_then_lookup(search_prefetcher, aggregator):
+    """Test that a scheduled page is fetched in the background lane."""
+    params = NewsSearchParams(query="ai", page=2, page_size=5)
+    assert search_prefetcher.lookup(params) is None
+
+    search_prefetcher.schedule(params)
+    search_prefetcher.schedule(params)
+    await asyncio.gather(*search_prefetcher._pending.values())
+
+    aggregator.search_page.assert_called_once_with(
+        params, Priority.BACKGROUND,
+    )
+    page = search_prefetcher.lookup(params)
+    assert len(page.articles) == 5
+    assert page.has_next
+    assert search_prefetcher.stats() == {
+        "hits": 1, "scheduled": 1, "skipped": 0, "in_flight": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_prefetch_caps(search_prefetcher, aggregator):
+    """Test that deep pages and excess concurrent prefetches are skipped."""
+    search_prefetcher.schedule(NewsSearchParams(query="ai", page=4))
+    search_prefetcher.schedule(NewsSearchParams(query="ai", page=2))
+    search_prefetcher.schedule(NewsSearchParams(query="ml", page=2))
+    await search_prefetcher.stop()
+
+    assert search_prefetcher.stats()["scheduled"] == 1
+    assert search_prefetcher.stats()["skipped"] == 2
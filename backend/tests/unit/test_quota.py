@@ -0,0 +1,95 @@
+"""Tests for the upstream quota scheduler."""
+import asyncio
+
+import pytest
+
+from app.core.quota import Priority, QuotaExceededError, UpstreamScheduler
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 1_700_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_burst_then_rate_limited():
+    """Test that calls beyond the burst fail fast when waits are too long."""
+    clock = FakeClock()
+    scheduler = UpstreamScheduler(
+        rate_per_second=1, burst=2, interactive_max_wait=0.5, clock=clock,
+    )
+
+    await scheduler.acquire()
+    await scheduler.acquire()
+    with pytest.raises(QuotaExceededError) as exc_info:
+        await scheduler.acquire()
+
+    assert exc_info.value.retry_after == pytest.approx(1.0)
+    clock.now += 1
+    await scheduler.acquire()
+    assert scheduler.stats()["used_today"] == 3
+
+
+@pytest.mark.asyncio
+async def test_daily_budget_reserves_interactive_share():
+    """Test that background calls cannot use the interactive reserve."""
+    clock = FakeClock()
+    scheduler = UpstreamScheduler(
+        rate_per_second=100, burst=100, daily_budget=10,
+        interactive_reserve=0.3, clock=clock,
+    )
+
+    for _ in range(7):
+        await scheduler.acquire(Priority.BACKGROUND)
+    with pytest.raises(QuotaExceededError):
+        await scheduler.acquire(Priority.BACKGROUND)
+    for _ in range(3):
+        await scheduler.acquire(Priority.INTERACTIVE)
+    with pytest.raises(QuotaExceededError) as exc_info:
+        await scheduler.acquire(Priority.INTERACTIVE)
+
+    assert "Daily" in str(exc_info.value)
+    assert exc_info.value.retry_after > 0
+    assert scheduler.stats()["rejected"] == {
+        "interactive": 1, "background": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_daily_budget_resets_next_day():
+    """Test that the daily budget resets at UTC midnight."""
+    clock = FakeClock()
+    scheduler = UpstreamScheduler(
+        rate_per_second=100, burst=100, daily_budget=1, clock=clock,
+    )
+
+    await scheduler.acquire()
+    with pytest.raises(QuotaExceededError):
+        await scheduler.acquire()
+    clock.now += 86400
+
+    await scheduler.acquire()
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_go_first():
+    """Test that background calls yield to waiting interactive calls."""
+    scheduler = UpstreamScheduler(rate_per_second=50, burst=1)
+    await scheduler.acquire()
+    order = []
+
+    async def call(priority):
+        await scheduler.acquire(priority)
+        order.append(priority)
+
+    background = asyncio.ensure_future(call(Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.ensure_future(call(Priority.INTERACTIVE))
+    await asyncio.gather(background, interactive)
+
+    assert order == [Priority.INTERACTIVE, Priority.BACKGROUND]
@@ -0,0 +1,69 @@
+"""Tests for the compact article records."""
+from datetime import datetime, UTC
+
+from app.models.records import (
+    NO_TIMESTAMP,
+    ArticleRecord,
+    to_articles,
+    to_records,
+    to_timestamp,
+)
+from app.models.schemas import ARTICLE_LIST_ADAPTER
+
+
+def full_fields(index: int) -> dict:
+    """Get the optional fields of a test article.
+
+    Repeated strings are built anew for every article, so sharing them
+    is up to the records.
+    """
+    return {
+        "id": f"id-{index}",
+        "source": "".join(["Test ", "Source"]),
+        "category": "".join(["tech", "nology"]),
+        "author": "Jane Doe",
+        "image_url": "https://example.com/image.jpg",
+        "published_at": "2024-01-01T12:30:00Z",
+        "alternate_source_count": 2,
+    }
+
+
+def test_round_trip_serializes_identically(make_article):
+    """Test that records convert back to the same JSON."""
+    articles = [
+        make_article(0, **full_fields(0)),
+        make_article(1, **full_fields(1) | {"published_at": None}),
+    ]
+
+    restored = to_articles(to_records(articles))
+
+    assert restored == articles
+    assert (
+        ARTICLE_LIST_ADAPTER.dump_json(restored)
+        == ARTICLE_LIST_ADAPTER.dump_json(articles)
+    )
+
+
+def test_repeated_strings_are_shared(make_article):
+    """Test that source, category and author are stored once."""
+    first, second = to_records([
+        make_article(0, **full_fields(0)),
+        make_article(1, **full_fields(1)),
+    ])
+
+    assert first.source is second.source
+    assert first.category is second.category
+    assert first.author is second.author
+    assert not hasattr(first, "__dict__")
+
+
+def test_timestamps_are_integers(make_article):
+    """Test that publication times are whole seconds, naive as UTC."""
+    record = ArticleRecord.from_article(make_article(0, **full_fields(0)))
+
+    assert record.published_at == 1704112200
+    assert to_timestamp(datetime(2024, 1, 1, 12, 30)) == 1704112200
+    assert to_timestamp(None) == NO_TIMESTAMP
+    assert record.to_article().published_at == datetime(
+        2024, 1, 1, 12, 30, tzinfo=UTC,
+    )
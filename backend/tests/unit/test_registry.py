@@ -0,0 +1,56 @@
+"""Tests for the service registry."""
+import pytest
+from fastapi import FastAPI
+from unittest.mock import MagicMock
+
+from app.core.cache import Cache
+from app.services.news import NewsService
+from app.services.registry import (
+    ServiceRegistry,
+    get_news_aggregator,
+    get_news_service,
+    get_registry,
+)
+
+
+@pytest.fixture
+def registry():
+    """Create a service registry fixture."""
+    return ServiceRegistry(cache=Cache(max_size=10, ttl=60))
+
+
+def make_request(app: FastAPI) -> MagicMock:
+    """Create a request bound to the given application."""
+    request = MagicMock()
+    request.app = app
+    return request
+
+
+@pytest.mark.asyncio
+async def test_lifespan_builds_and_closes_services(registry):
+    """Test that the lifespan builds services once and closes them."""
+    app = FastAPI()
+
+    async with registry.lifespan(app):
+        request = make_request(app)
+        first = get_news_service(request)
+        second = get_news_service(request)
+
+        assert isinstance(first, NewsService)
+        assert first is second
+        assert first.client is registry.news_client
+        assert get_registry(request) is registry
+        aggregator = get_news_aggregator(request)
+        assert aggregator.sources[0].news_service is first
+        client = registry.news_client
+
+    assert client._http.is_closed
+    assert registry.news_service is None
+
+
+def test_get_registry_without_lifespan():
+    """Test that dependencies fail clearly outside the lifespan."""
+    request = make_request(FastAPI())
+
+    with pytest.raises(RuntimeError):
+        get_registry(request)
@@ -0,0 +1,82 @@
+"""Tests for the related articles index."""
+import pytest
+
+from app.services.article_store import ArticleStore, article_id_for_url
+from app.services.related import RelatedArticlesIndex
+
+TOPICS = [
+    "rocket launch orbit satellite spacecraft booster",
+    "election ballot voters candidate polling campaign",
+    "striker football league goal transfer stadium",
+    "inflation interest rates central bank markets",
+]
+
+
+@pytest.fixture
+def topic_articles(make_article):
+    """Create a factory of articles cycling through the topics."""
+    def make(count: int) -> list:
+        return [
+            make_article(i, title=f"{TOPICS[i % len(TOPICS)]} report{i}")
+            for i in range(count)
+        ]
+
+    return make
+
+
+def url_id(index: int) -> str:
+    """Get the id of a test article."""
+    return article_id_for_url(f"https://example.com/articles/{index}")
+
+
+def test_nearest_finds_same_topic(topic_articles):
+    """Test that neighbors are ranked by similarity on the shortlist."""
+    index = RelatedArticlesIndex(None, shortlist=8)
+    index.add(topic_articles(40))
+    numbers = {url_id(i): i for i in range(40)}
+
+    neighbors = index.nearest(url_id(0), 5)
+
+    assert len(neighbors) == 5
+    assert all(numbers[neighbor] % 4 == 0 for neighbor, _ in neighbors)
+    similarities = [similarity for _, similarity in neighbors]
+    assert similarities == sorted(similarities, reverse=True)
+    assert url_id(0) not in dict(neighbors)
+
+
+def test_index_is_bounded(topic_articles):
+    """Test that the oldest articles are overwritten beyond max_size."""
+    index = RelatedArticlesIndex(None, max_size=10)
+    index.add(topic_articles(15))
+    index.add(topic_articles(15))
+
+    assert len(index) == 10
+    assert index.stats()["indexed"] == 10
+    with pytest.raises(KeyError):
+        index.nearest(url_id(0), 3)
+    assert len(index.nearest(url_id(14), 3)) == 3
+
+
+@pytest.mark.asyncio
+async def test_related_reads_the_article_store(
+        session_factory, make_article, topic_articles):
+    """Test that stored articles are indexed on ingestion or on demand."""
+    store = ArticleStore(session_factory)
+    await store.ingest(topic_articles(8))
+    index = RelatedArticlesIndex(store)
+    store.add_listener(index.add)
+    await store.ingest([make_article(8, title=TOPICS[0])])
+
+    on_demand = await index.related(url_id(1), limit=3)
+    assert len(index) == 2
+    assert [a.url for a in on_demand] == ["https://example.com/articles/8"]
+
+    await index.warm()
+    related = await index.related(url_id(8), limit=2)
+
+    assert len(index) == 9
+    assert {a.url for a in related} == {
+        "https://example.com/articles/0",
+        "https://example.com/articles/4",
+    }
+    assert await index.related("missing") is None
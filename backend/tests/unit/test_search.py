@@ -0,0 +1,151 @@
+"""Tests for the local full-text search engine."""
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.models.schemas import NewsSearchParams
+from app.services.article_store import ArticleStore
+from app.services.search import ArticleSearchEngine, build_match_query
+
+
+@pytest.fixture
+async def engine_with_corpus(session_factory, make_article):
+    """Create a search engine over a small corpus."""
+    store = ArticleStore(session_factory)
+    await store.ingest([
+        make_article(
+            1, title="Python release",
+            description="A new version is out",
+        ),
+        make_article(
+            2, title="Markets rally",
+            description="Investors like python tooling",
+        ),
+        make_article(
+            3, title="Football final",
+            description="The final ended in a draw",
+        ),
+    ], language="en")
+    await store.ingest([
+        make_article(
+            4, title="Python en français",
+            description="Une nouvelle version",
+        ),
+    ], language="fr")
+    await store.ingest([
+        make_article(
+            5, title="Python everywhere",
+            description="Language agnostic",
+        ),
+    ])
+    return ArticleSearchEngine(session_factory)
+
+
+def test_build_match_query_quotes_words():
+    """Test that user input cannot inject FTS5 syntax."""
+    assert build_match_query('c++ AND "x" OR (y') == (
+        '"c" "AND" "x" "OR" "y"'
+    )
+    assert build_match_query("  ") is None
+    assert build_match_query(None) is None
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_title_matches_first(engine_with_corpus):
+    """Test BM25 ranking with title weighting and language filtering."""
+    articles = await engine_with_corpus.search(
+        NewsSearchParams(query="python", language="en")
+    )
+
+    titles = [a.title for a in articles]
+    assert set(titles) == {
+        "Python release", "Python everywhere", "Markets rally",
+    }
+    assert titles[-1] == "Markets rally"
+
+
+@pytest.mark.asyncio
+async def test_search_filters_language(engine_with_corpus):
+    """Test that other languages are excluded."""
+    articles = await engine_with_corpus.search(
+        NewsSearchParams(query="python", language="fr")
+    )
+
+    assert {a.title for a in articles} == {
+        "Python en français", "Python everywhere",
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_paginates(engine_with_corpus):
+    """Test page/page_size pagination."""
+    first = await engine_with_corpus.search(
+        NewsSearchParams(query="python", page_size=2, page=1)
+    )
+    second = await engine_with_corpus.search(
+        NewsSearchParams(query="python", page_size=2, page=2)
+    )
+
+    assert len(first) == 2
+    assert len(second) == 1
+    assert not {a.id for a in first} & {a.id for a in second}
+
+
+@pytest.mark.asyncio
+async def test_covers_requires_full_page(session_factory, make_article):
+    """Test that queries that cannot fill a page are not covered."""
+    now = datetime.now(UTC)
+    await ArticleStore(session_factory).ingest([
+        make_article(i, title=f"Python {i}", published_at=now)
+        for i in range(3)
+    ])
+    engine = ArticleSearchEngine(session_factory)
+
+    assert await engine.covers(NewsSearchParams(query="python", page_size=3))
+    # The page asked for does not matter, only whether one can be filled
+    assert await engine.covers(
+        NewsSearchParams(query="python", page_size=3, page=2)
+    )
+    assert not await engine.covers(
+        NewsSearchParams(query="python", page_size=4)
+    )
+    assert not await engine.covers(NewsSearchParams(query=None))
+
+
+@pytest.mark.asyncio
+async def test_covers_requires_recent_matches(session_factory, make_article):
+    """Test that queries whose matches aged go upstream again."""
+    now = datetime.now(UTC)
+    await ArticleStore(session_factory).ingest([
+        make_article(1, title="Python old", published_at=now - timedelta(
+            hours=7,
+        )),
+        make_article(2, title="Python older", published_at=now - timedelta(
+            days=2,
+        )),
+    ])
+    engine = ArticleSearchEngine(session_factory, max_age=6 * 3600)
+    params = NewsSearchParams(query="python", page_size=2)
+
+    assert not await engine.covers(params)
+    engine.max_age = 8 * 3600
+    assert await engine.covers(params)
+
+
+@pytest.mark.asyncio
+async def test_index_follows_deletes_and_rebuild(
+        engine_with_corpus, session_factory):
+    """Test that the triggers and rebuild keep the index in sync."""
+    async with session_factory() as session:
+        await session.execute(text(
+            "DELETE FROM articles WHERE title = 'Football final'"
+        ))
+        await session.commit()
+    await engine_with_corpus.rebuild()
+
+    articles = await engine_with_corpus.search(
+        NewsSearchParams(query="football")
+    )
+
+    assert articles == []
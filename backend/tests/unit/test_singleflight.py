@@ -0,0 +1,82 @@
+"""Tests for single-flight call coalescing."""
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_identical_calls_are_collapsed():
+    """Test that concurrent calls with one key run once."""
+    group = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["result"]
+
+    results = await asyncio.gather(*(group.do("key", fetch) for _ in range(5)))
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert group.stats() == {"calls": 1, "collapsed": 4, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    """Test that different keys are not collapsed."""
+    group = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(
+        group.do("a", lambda: fetch(1)),
+        group.do("b", lambda: fetch(2)),
+    )
+
+    assert results == [1, 2]
+    assert group.stats()["collapsed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_cached():
+    """Test that every waiter sees the error and later calls retry."""
+    group = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    results = await asyncio.gather(
+        group.do("key", fail), group.do("key", fail),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def succeed():
+        return "ok"
+
+    assert await group.do("key", succeed) == "ok"
+    assert group.stats()["calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    """Test that cancelling one waiter leaves the call running."""
+    group = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(group.do("key", fetch))
+    second = asyncio.ensure_future(group.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
@@ -0,0 +1,114 @@
+"""Tests for the news source adapters."""
+import httpx
+import pytest
+from unittest.mock import MagicMock
+
+from app.models.schemas import NewsSearchParams
+from app.services.article_store import ArticleStore
+from app.services.sources import RssSource
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_source(handler, clock=None) -> RssSource:
+    """Create an RSS source served by a mock transport."""
+    return RssSource(
+        {"https://example.com/rss": "world",
+         "https://example.org/atom": None},
+        ttl=60,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        clock=clock or FakeClock(),
+    )
+
+
+@pytest.fixture
+def serve_feeds(rss_feed, atom_feed):
+    """Create a handler serving the test feeds."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "example.com":
+            return httpx.Response(200, content=rss_feed)
+        return httpx.Response(200, content=atom_feed)
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_rss_search_and_headlines(serve_feeds):
+    """Test that feed items are searched and listed newest first."""
+    source = make_source(serve_feeds)
+
+    headlines = await source.get_top_headlines()
+    world = await source.get_top_headlines(category="world")
+    found = await source.search_articles(NewsSearchParams(query="ATOM"))
+
+    assert [a.title for a in headlines] == ["Atom story", "First story"]
+    assert [a.title for a in world] == ["First story"]
+    assert [a.title for a in found] == ["Atom story"]
+    await source.client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rss_feeds_reused_until_ttl(serve_feeds):
+    """Test that feeds are refetched only after the ttl."""
+    clock = FakeClock()
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return serve_feeds(request)
+
+    source = make_source(handler, clock)
+    await source.get_top_headlines()
+    await source.get_top_headlines()
+    assert len(requests) == 2
+
+    clock.now += 60
+    await source.get_top_headlines()
+    assert len(requests) == 4
+    await source.client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rss_failed_feed_keeps_previous_items(serve_feeds):
+    """Test that a failing feed keeps serving its last items."""
+    clock = FakeClock()
+    healthy = True
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if healthy:
+            return serve_feeds(request)
+        return httpx.Response(500)
+
+    source = make_source(handler, clock)
+    await source.get_top_headlines()
+    healthy = False
+    clock.now += 60
+
+    headlines = await source.get_top_headlines()
+
+    assert len(headlines) == 2
+    await source.client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rss_refetch_keeps_old_items_and_adds_new(serve_feeds):
+    """Test that refetched feeds only add items newer than before."""
+    clock = FakeClock()
+    source = make_source(serve_feeds, clock)
+    source.article_store = MagicMock(spec=ArticleStore)
+    first = await source.get_top_headlines()
+
+    clock.now += 60
+    second = await source.get_top_headlines()
+
+    assert second == first
+    # Only the first fetch found items newer than the watermark
+    assert source.article_store.submit.call_count == 2
+    await source.client.aclose()
@@ -0,0 +1,137 @@
+"""Tests for the trending topics engine."""
+from datetime import UTC, datetime
+
+import pytest
+
+from app.models.schemas import NewsArticle
+from app.services.trending import (
+    HeavyHitters,
+    SlidingCountMinSketch,
+    TrendingEngine,
+    extract_terms,
+)
+
+START = 1_700_000_000.0
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = START) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_extract_terms():
+    """Test that stopwords are dropped and capitalized runs kept."""
+    article = NewsArticle(
+        title="The Federal Reserve's rate decision shakes Wall Street",
+        description="Markets react to the decision.",
+        url="https://example.com/fed",
+        source="Example",
+    )
+
+    terms, entities = extract_terms(article)
+
+    assert terms == {
+        "federal", "reserve", "rate", "decision", "shakes", "wall",
+        "street", "markets", "react",
+    }
+    assert entities == {"Federal Reserve", "Wall Street"}
+
+
+def test_sketch_counts_never_underestimate():
+    """Test that estimates are exact without collisions and never low."""
+    sketch = SlidingCountMinSketch(window=60, slots=6, width=64, depth=4)
+    sketch.advance(START)
+    for i in range(500):
+        sketch.add(sketch.cells(f"term{i % 50}"), START)
+    for _ in range(30):
+        sketch.add(sketch.cells("hot"), START)
+
+    assert sketch.estimate("hot") >= 30
+    assert all(sketch.estimate(f"term{i}") >= 10 for i in range(50))
+    assert sketch.estimate("hot") < 50
+
+
+def test_sketch_slots_expire():
+    """Test that counts leave the window with their slot."""
+    sketch = SlidingCountMinSketch(window=60, slots=6)
+    sketch.advance(START)
+    sketch.add(sketch.cells("early"), START)
+    sketch.advance(START + 30)
+    sketch.add(sketch.cells("late"), START + 30)
+
+    assert sketch.advance(START + 65)
+    assert sketch.estimate("early") == 0
+    assert sketch.estimate("late") == 1
+    # Timestamps outside the window are ignored
+    assert sketch.add(sketch.cells("stale"), START) is None
+    assert sketch.estimate("stale") == 0
+
+
+def test_heavy_hitters_keep_strongest():
+    """Test that weak candidates make room for stronger ones."""
+    hitters = HeavyHitters(capacity=2)
+    hitters.offer("a", 5)
+    hitters.offer("b", 1)
+    hitters.offer("c", 1)
+    hitters.offer("b", 3)
+    hitters.offer("d", 4)
+
+    assert hitters.top(5) == [("a", 5), ("d", 4)]
+
+
+def test_engine_top_terms_per_window(make_article):
+    """Test that windows rank terms of recent articles only."""
+    clock = FakeClock()
+    engine = TrendingEngine(capacity=20, clock=clock)
+    engine.observe([
+        make_article(
+            i, title=f"Election results in Ohio {i}", published_at=None,
+        )
+        for i in range(3)
+    ])
+    clock.now += 2 * 3600
+    engine.observe([
+        make_article(
+            10 + i, title=f"Storm hits Florida coast {i}", published_at=None,
+        )
+        for i in range(2)
+    ])
+
+    hourly = engine.top("1h", limit=3)
+    daily = engine.top("24h", limit=2)
+
+    assert [t.term for t in hourly.terms] == ["coast", "florida", "hits"]
+    assert {t.term: t.count for t in hourly.entities} == {
+        "Storm": 2, "Florida": 2,
+    }
+    assert [(t.term, t.count) for t in daily.terms] == [
+        ("election", 3), ("ohio", 3),
+    ]
+    assert engine.stats()["observed"] == 5
+
+
+def test_engine_counts_at_publication_time(make_article):
+    """Test that old articles only count in windows still covering them."""
+    clock = FakeClock()
+    engine = TrendingEngine(clock=clock)
+    published = datetime.fromtimestamp(START - 5 * 3600, UTC)
+
+    engine.observe([
+        make_article(title="Backfilled story", published_at=published),
+    ])
+
+    assert engine.top("1h").terms == []
+    assert [t.term for t in engine.top("24h").terms] == [
+        "backfilled", "story",
+    ]
+
+
+def test_engine_unknown_window():
+    """Test that unknown windows are rejected."""
+    with pytest.raises(KeyError):
+        TrendingEngine().top("7d")
@@ -3,6 +3,8 @@ import streamlit as st
 from typing import Dict, Any, Callable, Optional
 from datetime import datetime
 
+from src.utils.config import API_BASE_URL
+
 
 def format_date(date_str: Optional[str]) -> str:
     """Format date string.
@@ -69,13 +71,31 @@ def _render_article_content(article: Dict[str, Any]) -> None:
         st.markdown(meta_text)
 
     with col2:
-        if article.get('image_url'):
+        image = image_source(article)
+        if image:
             st.image(
-                article['image_url'],
+                image,
                 use_column_width=True
             )
 
 
+def image_source(article: Dict[str, Any]) -> Optional[str]:
+    """Get the URL the article image is displayed from.
+
+    The card-size thumbnail proxied by the API is preferred over the
+    full-size image on the publisher host.
+
+    Args:
+        article: News article data.
+
+    Returns:
+        Optional[str]: Image URL, or None if the article has no image.
+    """
+    if article.get('thumbnail_url'):
+        return f"{API_BASE_URL}{article['thumbnail_url']}"
+    return article.get('image_url')
+
+
 def _build_meta_text(article: Dict[str, Any]) -> str:
     """Build the meta text for the article.
 
@@ -87,6 +107,11 @@ def _build_meta_text(article: Dict[str, Any]) -> str:
     """
     meta_text = f"Source: **{article['source']}**"
 
+    alternates = article.get('alternate_source_count')
+    if alternates:
+        plural = "s" if alternates > 1 else ""
+        meta_text += f" (+{alternates} more source{plural})"
+
     if article.get('published_at'):
         meta_text += f" | {format_date(article['published_at'])}"
 
@@ -11,9 +11,9 @@ from src.utils.auth import (
     is_authenticated,
     fetch_user_info,
 )
-from src.utils.api import get_headlines
+from src.utils.api import get_headlines_batch
 from src.components.article_card import article_card
-from src.utils.config import API_BASE_URL
+from src.utils.config import API_BASE_URL, NEWS_CATEGORIES
 # Configure page settings
 st.set_page_config(
     page_title="News Aggregator",
@@ -74,15 +74,31 @@ async def handle_user_auth(firebase_user: Dict[str, Any]) -> str:
                 f"Failed to connect to backend: {str(e)}")
 
 
-async def load_headlines():
-    """Load and display headlines."""
-    category = st.session_state.get("selected_category", "all")
-    headlines = await get_headlines(category)
+async def load_headlines(country: str = "us"):
+    """Load and display headlines.
+
+    The headlines of every category, or of the selected one, are
+    fetched in a single batch request.
 
-    if headlines:
+    Args:
+        country: Country code of the headlines.
+    """
+    category = st.session_state.get("selected_category", "all")
+    categories = NEWS_CATEGORIES if category == "all" else [category]
+    batch = await get_headlines_batch(categories, countries=[country])
+    results = batch.get("results", {})
+
+    shown = False
+    for name in categories:
+        headlines = results.get(f"{country}:{name}")
+        if not headlines:
+            continue
+        if len(categories) > 1:
+            st.subheader(name.capitalize())
         for headline in headlines:
             article_card(headline)
-    else:
+        shown = True
+    if not shown:
         st.info("No headlines available for the selected category.")
 
 
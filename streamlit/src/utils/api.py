@@ -71,6 +71,50 @@ async def get_headlines(
         raise NewsApiError(f"Failed to fetch headlines: {response.text}")
 
 
+async def get_headlines_batch(
+    categories: List[str],
+    countries: Optional[List[str]] = None,
+    page_size: int = 10
+) -> Dict[str, Any]:
+    """Get top headlines of several categories in one request.
+
+    Args:
+        categories: News categories.
+        countries: Country codes, defaults to the API default.
+        page_size: Number of articles per category and country.
+
+    Returns:
+        Dict[str, Any]: Headlines under "results" and failures under
+        "errors", both keyed by "country:category".
+
+    Raises:
+        Exception: If the request fails.
+    """
+    token = get_auth_token()
+    if not token:
+        raise AuthenticationError(AUTH_ERROR)
+
+    params = {
+        "categories": categories,
+        "page_size": page_size
+    }
+
+    if countries:
+        params["countries"] = countries
+
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient() as client:
+        response = await client.get(
+            f"{API_BASE_URL}/api/v1/news/headlines/batch",
+            headers=headers,
+            params=params
+        )
+
+        if response.status_code == 200:
+            return response.json()
+        raise NewsApiError(f"Failed to fetch headlines: {response.text}")
+
+
 async def search_news(
     query: Optional[str] = None,
     category: Optional[str] = None,
@@ -131,6 +131,30 @@ async def test_get_headlines_with_category(monkeypatch):
     assert result == fake_data
 
 
+@pytest.mark.asyncio
+async def test_get_headlines_batch(monkeypatch):
+    monkeypatch.setattr(api, "get_auth_token", lambda: "tok789")
+
+    fake_data = {"results": {"us:sports": [{"title": "C"}]}, "errors": {}}
+    dummy = DummyClient(
+        expected_method="get",
+        expected_url=(
+            "https://test.example.com"
+            "/api/v1/news/headlines/batch"
+        ),
+        expected_headers={"Authorization": "Bearer tok789"},
+        expected_params={
+            "categories": ["sports", "science"],
+            "page_size": 10,
+        },
+        response=DummyResponse(200, json_data=fake_data),
+    )
+    monkeypatch.setattr(api.httpx, "AsyncClient", lambda: dummy)
+
+    result = await api.get_headlines_batch(["sports", "science"])
+    assert result == fake_data
+
+
 @pytest.mark.asyncio
 async def test_search_news_error_status(monkeypatch):
     monkeypatch.setattr(api, "get_auth_token", lambda: "t")
@@ -1,6 +1,11 @@
 import pytest
 import streamlit as st
-from src.components.article_card import format_date, article_card
+from src.components.article_card import (
+    article_card,
+    format_date,
+    image_source,
+)
+from src.utils.config import API_BASE_URL
 
 
 class MockContainer:
@@ -60,6 +65,20 @@ def test_format_date_none():
     assert formatted == "Unknown date"
 
 
+def test_image_source_prefers_thumbnail():
+    """Test that the proxied thumbnail is used when available."""
+    article = {
+        "image_url": "https://example.com/image.jpg",
+        "thumbnail_url": "/api/v1/images/abc?url=x",
+    }
+
+    assert image_source(article) == f"{API_BASE_URL}/api/v1/images/abc?url=x"
+    assert image_source({"image_url": "https://example.com/image.jpg"}) == (
+        "https://example.com/image.jpg"
+    )
+    assert image_source({}) is None
+
+
 def test_article_card_basic():
     """Test rendering a basic article card."""
     article = {
@@ -2,6 +2,7 @@ import pytest
 import streamlit as st
 from unittest.mock import AsyncMock, patch
 from src.home import handle_user_auth, load_headlines, main
+from src.utils.config import NEWS_CATEGORIES
 
 
 class MockContainer:
@@ -185,12 +186,36 @@ async def test_load_headlines_with_headlines(mock_session_state):
     ]
 
     with patch(
-        "src.home.get_headlines",
+        "src.home.get_headlines_batch",
         new_callable=AsyncMock
-    ) as mock_get_headlines:
-        mock_get_headlines.return_value = mock_headlines
+    ) as mock_get_headlines_batch, patch(
+        "src.home.article_card"
+    ) as mock_article_card:
+        mock_get_headlines_batch.return_value = {
+            "results": {"us:sports": mock_headlines, "us:science": []},
+            "errors": {},
+        }
+        await load_headlines()
+        mock_get_headlines_batch.assert_called_once_with(
+            NEWS_CATEGORIES, countries=["us"]
+        )
+        assert mock_article_card.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_load_headlines_selected_category(mock_session_state):
+    """Test loading the headlines of the selected category only."""
+    mock_session_state["selected_category"] = "sports"
+
+    with patch(
+        "src.home.get_headlines_batch",
+        new_callable=AsyncMock
+    ) as mock_get_headlines_batch:
+        mock_get_headlines_batch.return_value = {"results": {}, "errors": {}}
         await load_headlines()
-        mock_get_headlines.assert_called_once_with("all")
+        mock_get_headlines_batch.assert_called_once_with(
+            ["sports"], countries=["us"]
+        )
 
 
 @pytest.mark.asyncio
@@ -199,12 +224,12 @@ async def test_load_headlines_no_headlines(mock_session_state):
     mock_session_state["selected_category"] = "all"
 
     with patch(
-        "src.home.get_headlines",
+        "src.home.get_headlines_batch",
         new_callable=AsyncMock
-    ) as mock_get_headlines:
-        mock_get_headlines.return_value = []
+    ) as mock_get_headlines_batch:
+        mock_get_headlines_batch.return_value = {"results": {}, "errors": {}}
         await load_headlines()
-        mock_get_headlines.assert_called_once_with("all")
+        mock_get_headlines_batch.assert_called_once()
 
 
 def test_main_authenticated(mock_session_state):